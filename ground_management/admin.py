@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Ground, Slot, CustomUser, Booking, Payment
+from .models import (
+    Ground, Slot, CustomUser, Booking, Payment, DailyRevenue, DailyBookingStats, LifecycleSweep, Counter, ArchivedSlot, ArchivedBooking, ArchivedPayment
+)
 
 @admin.register(Ground)
 class GroundAdmin(admin.ModelAdmin):
@@ -31,4 +33,48 @@ class PaymentAdmin(admin.ModelAdmin):
     list_display = ('booking', 'payment_date', 'amount', 'payment_method', 'payment_status')
     list_filter = ('payment_status', 'payment_method', 'payment_date')
     search_fields = ('booking__user__username',)
-    date_hierarchy = 'payment_date'
\ No newline at end of file
+    date_hierarchy = 'payment_date'
+
+@admin.register(DailyRevenue)
+class DailyRevenueAdmin(admin.ModelAdmin):
+    list_display = ('ground', 'date', 'payment_method', 'amount', 'payment_count')
+    list_filter = ('payment_method', 'date')
+    search_fields = ('ground__name',)
+    date_hierarchy = 'date'
+
+@admin.register(DailyBookingStats)
+class DailyBookingStatsAdmin(admin.ModelAdmin):
+    list_display = ('date', 'lead_days', 'bookings', 'cancelled')
+    date_hierarchy = 'date'
+
+@admin.register(LifecycleSweep)
+class LifecycleSweepAdmin(admin.ModelAdmin):
+    list_display = ('ran_at', 'from_date', 'through_date', 'bookings_completed', 'bookings_cancelled', 'slots_closed')
+    date_hierarchy = 'through_date'
+
+@admin.register(Counter)
+class CounterAdmin(admin.ModelAdmin):
+    list_display = ('name', 'value', 'reconciled_at')
+    # Values change with the rows they count; fix drift with reconcile_counters
+    readonly_fields = ('value', 'reconciled_at')
+
+@admin.register(ArchivedSlot)
+class ArchivedSlotAdmin(admin.ModelAdmin):
+    list_display = ('ground', 'date', 'start_time', 'end_time', 'price_per_slot', 'availability_status')
+    list_filter = ('ground', 'availability_status')
+    search_fields = ('ground__name',)
+    date_hierarchy = 'date'
+
+@admin.register(ArchivedBooking)
+class ArchivedBookingAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'slot', 'booking_date', 'status')
+    list_filter = ('status',)
+    search_fields = ('user__username', 'slot__ground__name')
+    date_hierarchy = 'booking_date'
+
+@admin.register(ArchivedPayment)
+class ArchivedPaymentAdmin(admin.ModelAdmin):
+    list_display = ('booking', 'payment_date', 'amount', 'payment_method', 'payment_status')
+    list_filter = ('payment_status', 'payment_method')
+    search_fields = ('booking__user__username',)
+    date_hierarchy = 'payment_date'
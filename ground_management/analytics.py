@@ -0,0 +1,267 @@
+"""
+Revenue and booking analytics.
+
+Daily time series over a date window, resampled to weeks or months:
+revenue and payments by payment day, and bookings, cancellations and lead
+times (days booked in advance) by slot day, with trailing moving averages.
+
+Nothing here reads row by row. Revenue comes from the ``DailyRevenue``
+rollup, summed per day. Bookings of swept days come from the
+``DailyBookingStats`` rollup, which the lifecycle sweeper writes once a
+day's statuses are final. Bookings of days not swept yet are grouped in
+SQL by slot day and booking day. Each grouped read is loaded into NumPy
+arrays indexed by day, and every total, rate, average and percentile is an
+array operation. The cost therefore follows the number of days in the
+window, not the number of bookings.
+
+``rebuild_booking_stats`` (``manage.py rebuild_booking_stats``) recomputes
+the rollup, e.g. after changing the status of a past booking by hand.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .archive import reaches_archive
+from .models import ArchivedBooking, Booking, DailyBookingStats, DailyRevenue, LifecycleSweep
+
+DEFAULT_WINDOW_DAYS = 365
+
+# Days of rollup rebuilt per transaction
+STATS_CHUNK_DAYS = 31
+
+MOVING_AVERAGE_DAYS = (7, 28)
+
+LEAD_PERCENTILES = {'median': 0.5, 'p90': 0.9}
+
+
+def _day_array(dates):
+    return np.array(dates, dtype='datetime64[D]')
+
+
+def _columns(rows, count):
+    # Grouped rows as one sequence per column
+    return list(zip(*rows)) or [()] * count
+
+
+# Reading bookings
+def _grouped_bookings(first, last):
+    # Booking counts per slot day and booking day, from both tables if the window reaches the archive
+    models = [Booking, ArchivedBooking] if reaches_archive(first) else [Booking]
+    counts = [
+        model.objects.filter(slot__date__gte=first, slot__date__lte=last).values(
+            'slot__date', booking_day=TruncDate('booking_date')
+        ).annotate(
+            bookings=Count('id'),
+            cancelled=Count('id', filter=Q(status='Cancelled')),
+        ).values_list('slot__date', 'booking_day', 'bookings', 'cancelled').order_by()
+        for model in models
+    ]
+    return list(counts[0].union(*counts[1:], all=True))
+
+
+def booking_stats(first, last):
+    """Bookings of the slot days first..last counted by (day, lead days).
+
+    Returns arrays: days, lead days, bookings and cancelled bookings.
+    """
+    slot_days, booking_days, bookings, cancelled = _columns(_grouped_bookings(first, last), 4)
+    slot_days = _day_array(slot_days)
+    leads = (slot_days - _day_array(booking_days)).astype(int)
+    # Rows from both tables can share a key
+    keys, inverse = np.unique(
+        np.stack([slot_days.astype(int), leads], axis=1).reshape(-1, 2), axis=0, return_inverse=True
+    )
+    inverse = inverse.ravel()
+    return (
+        keys[:, 0].astype('datetime64[D]'),
+        keys[:, 1],
+        np.bincount(inverse, weights=bookings, minlength=len(keys)).astype(int),
+        np.bincount(inverse, weights=cancelled, minlength=len(keys)).astype(int),
+    )
+
+
+def swept_through():
+    """Last slot day whose bookings are final, or None before the first sweep."""
+    return LifecycleSweep.objects.values_list('through_date', flat=True).first()
+
+
+def store_booking_stats(first, last):
+    """Replace the rollup rows of the slot days first..last; return how many were written."""
+    days, leads, bookings, cancelled = booking_stats(first, last)
+    with transaction.atomic():
+        DailyBookingStats.objects.filter(date__gte=first, date__lte=last).delete()
+        rows = DailyBookingStats.objects.bulk_create(
+            DailyBookingStats(date=day, lead_days=lead, bookings=total, cancelled=cancels)
+            for day, lead, total, cancels in zip(days.tolist(), leads.tolist(), bookings.tolist(), cancelled.tolist())
+        )
+    return len(rows)
+
+
+def rebuild_booking_stats(start_date=None, end_date=None, chunk_days=STATS_CHUNK_DAYS):
+    """Recompute the rollup for swept days, optionally limited to a date range.
+
+    Returns the number of rollup rows written.
+    """
+    through = swept_through()
+    if through is None:
+        return 0
+    end_date = min(end_date or through, through)
+    if start_date is None:
+        first_days = [
+            model.objects.order_by('slot__date').values_list('slot__date', flat=True).first()
+            for model in (Booking, ArchivedBooking)
+        ]
+        first_days = [day for day in first_days if day]
+        if not first_days:
+            DailyBookingStats.objects.all().delete()
+            return 0
+        start_date = min(first_days)
+
+    written = 0
+    day = start_date
+    while day <= end_date:
+        last = min(day + timedelta(days=chunk_days - 1), end_date)
+        written += store_booking_stats(day, last)
+        day = last + timedelta(days=1)
+    return written
+
+
+def _booking_columns(start_date, end_date):
+    # Rollup rows for swept days and live counts for the rest, as one set of arrays
+    through = swept_through()
+    parts = []
+    if through and start_date <= through:
+        rows = DailyBookingStats.objects.filter(
+            date__gte=start_date, date__lte=min(end_date, through)
+        ).values_list('date', 'lead_days', 'bookings', 'cancelled').order_by()
+        days, leads, bookings, cancelled = _columns(list(rows), 4)
+        parts.append((
+            _day_array(days), np.array(leads, dtype=int), np.array(bookings, dtype=int), np.array(cancelled, dtype=int)
+        ))
+    live_start = max(start_date, through + timedelta(days=1)) if through else start_date
+    if live_start <= end_date:
+        parts.append(booking_stats(live_start, end_date))
+    return tuple(np.concatenate(column) for column in zip(*parts))
+
+
+# Array helpers
+def _period_starts(days, group_by):
+    # First day of each day's period (weeks start on Monday)
+    if group_by == 'day':
+        return days
+    if group_by == 'week':
+        # 1970-01-01 was a Thursday
+        return days - ((days.astype(int) + 3) % 7)
+    return days.astype('datetime64[M]').astype('datetime64[D]')
+
+
+def _resample(values, starts):
+    # Sum consecutive days sharing a period start
+    return np.add.reduceat(values, np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]]))
+
+
+def _moving_average(values, window):
+    # Trailing mean over up to window days
+    sums = np.cumsum(np.r_[0.0, values])
+    ends = np.arange(1, len(values) + 1)
+    begins = np.maximum(ends - window, 0)
+    return (sums[ends] - sums[begins]) / (ends - begins)
+
+
+def _ratio(numerator, denominator, scale=1):
+    # numerator / denominator, or 0 where nothing was counted
+    return np.divide(numerator * scale, denominator, out=np.zeros(len(numerator)), where=denominator > 0)
+
+
+def _weighted_percentile(values, weights, fraction):
+    cumulative = np.cumsum(weights)
+    if not len(cumulative) or cumulative[-1] == 0:
+        return None
+    return int(values[np.searchsorted(cumulative, fraction * cumulative[-1])])
+
+
+def _rounded(values):
+    return np.round(values.astype(float), 2).tolist()
+
+
+# Summary
+def analytics_summary(start_date=None, end_date=None, group_by='month'):
+    """Return daily and per-period revenue and booking series for a window.
+
+    The window defaults to the DEFAULT_WINDOW_DAYS days ending today.
+    Everything returned is plain lists and numbers, ready for JSON.
+    """
+    end_date = end_date or max(timezone.localdate(), start_date or timezone.localdate())
+    start_date = start_date or end_date - timedelta(days=DEFAULT_WINDOW_DAYS - 1)
+    first = np.datetime64(start_date, 'D')
+    days = np.arange(first, np.datetime64(end_date, 'D') + 1)
+
+    # Revenue by payment day
+    revenue = np.zeros(len(days))
+    payments = np.zeros(len(days))
+    rows = DailyRevenue.objects.filter(date__gte=start_date, date__lte=end_date).values('date').annotate(
+        amount=Sum('amount'), payments=Sum('payment_count')
+    ).values_list('date', 'amount', 'payments').order_by()
+    revenue_days, amounts, counts = _columns(list(rows), 3)
+    index = (_day_array(revenue_days) - first).astype(int)
+    revenue[index] = np.array(amounts, dtype=float)
+    payments[index] = np.array(counts, dtype=float)
+
+    # Bookings by slot day, counted by lead time
+    booking_days, leads, bookings, cancelled = _booking_columns(start_date, end_date)
+    index = (booking_days - first).astype(int)
+    kept = bookings - cancelled
+    daily_bookings = np.bincount(index, weights=bookings, minlength=len(days))
+    daily_cancelled = np.bincount(index, weights=cancelled, minlength=len(days))
+    daily_kept = np.bincount(index, weights=kept, minlength=len(days))
+    daily_lead = np.bincount(index, weights=leads * kept, minlength=len(days))
+
+    lead_values, lead_index = np.unique(leads, return_inverse=True)
+    lead_counts = np.bincount(lead_index.ravel(), weights=kept, minlength=len(lead_values)).astype(int)
+
+    starts = _period_starts(days, group_by)
+    period_bookings = _resample(daily_bookings, starts)
+    period_cancelled = _resample(daily_cancelled, starts)
+    total_bookings = int(daily_bookings.sum())
+    total_cancelled = int(daily_cancelled.sum())
+    total_kept = daily_kept.sum()
+
+    return {
+        'start_date': start_date,
+        'end_date': end_date,
+        'group_by': group_by,
+        'totals': {
+            'revenue': round(float(revenue.sum()), 2),
+            'payments': int(payments.sum()),
+            'bookings': total_bookings,
+            'cancelled': total_cancelled,
+            'cancellation_rate': round(total_cancelled * 100 / total_bookings, 2) if total_bookings else 0,
+        },
+        'lead_time': {
+            'mean': round(float(daily_lead.sum() / total_kept), 2) if total_kept else None,
+            **{name: _weighted_percentile(lead_values, lead_counts, fraction) for name, fraction in LEAD_PERCENTILES.items()},
+            'days': lead_values.tolist(),
+            'bookings': lead_counts.tolist(),
+        },
+        'periods': {
+            'start': np.datetime_as_string(np.unique(starts)).tolist(),
+            'revenue': _rounded(_resample(revenue, starts)),
+            'payments': _resample(payments, starts).astype(int).tolist(),
+            'bookings': period_bookings.astype(int).tolist(),
+            'cancelled': period_cancelled.astype(int).tolist(),
+            'cancellation_rate': _rounded(_ratio(period_cancelled, period_bookings, 100)),
+            'mean_lead_days': _rounded(_ratio(_resample(daily_lead, starts), _resample(daily_kept, starts))),
+        },
+        'daily': {
+            'date': np.datetime_as_string(days).tolist(),
+            'revenue': _rounded(revenue),
+            'bookings': daily_bookings.astype(int).tolist(),
+            **{f'revenue_{window}d': _rounded(_moving_average(revenue, window)) for window in MOVING_AVERAGE_DAYS},
+            **{f'bookings_{window}d': _rounded(_moving_average(daily_bookings, window)) for window in MOVING_AVERAGE_DAYS},
+        },
+    }
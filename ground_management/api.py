@@ -0,0 +1,230 @@
+"""
+Read-only REST API for grounds, slots, free booking windows and the signed-in
+user's bookings.
+
+Lists are keyset-paginated (``after`` / ``before`` cursors, ``page_size``) and
+every endpoint accepts ``fields=a,b,c`` to trim the response.
+
+Responses carry a strong ETag and a Last-Modified header derived from the
+change version of what they show (``versions``): the set of grounds, one
+ground and its slots, or one user's bookings. Versions are read from the cache,
+so a conditional request that still matches is answered 304 before any row is
+loaded.
+"""
+
+import hashlib
+from datetime import timedelta
+
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+
+from . import bitmaps, versions
+from .forms import DateRangeForm, FreeWindowForm
+from .models import AVAILABILITY_STATUSES, Booking, Ground, Slot
+from .pagination import InvalidCursor, keyset_paginate
+from .serializers import BookingSerializer, GroundSerializer, SlotSerializer
+
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 200
+
+# Default slot window when no dates are given
+SLOT_WINDOW_DAYS = 7
+
+SLOT_KEYSET = ['date', 'start_time', 'id']
+
+INVALID_CURSOR = {'cursor': 'Invalid or expired cursor.'}
+
+
+# Conditional request helpers
+def _etag(request, scope, pk=None, *extra):
+    # Same version and same query means the same bytes, so the tag is strong
+    query = sorted((key, sorted(values)) for key, values in request.GET.lists())
+    digest = hashlib.sha1(repr((query, extra)).encode()).hexdigest()[:16]
+    return f'{scope}-{pk or 0}-{versions.current(scope, pk)}-{digest}'
+
+
+def _last_modified(scope, pk=None):
+    return versions.as_datetime(versions.current(scope, pk))
+
+
+def _grounds_etag(request):
+    return _etag(request, 'grounds')
+
+
+def _grounds_modified(request):
+    return _last_modified('grounds')
+
+
+def ground_etag(request, ground_id):
+    # The default slot window moves with the date, so it is part of the tag
+    return _etag(request, 'ground', ground_id, timezone.now().date())
+
+
+def ground_modified(request, ground_id):
+    return _last_modified('ground', ground_id)
+
+
+def _bookings_etag(request):
+    if not request.user.is_authenticated:
+        return None
+    return _etag(request, 'bookings', request.user.id)
+
+
+def _bookings_modified(request):
+    if not request.user.is_authenticated:
+        return None
+    return _last_modified('bookings', request.user.id)
+
+
+# Request parsing helpers
+def _selected_fields(request):
+    fields = request.GET.get('fields', '')
+    return [name.strip() for name in fields.split(',') if name.strip()] or None
+
+
+def _page_size(request):
+    try:
+        page_size = int(request.GET.get('page_size', API_PAGE_SIZE))
+    except ValueError:
+        raise ValidationError({'page_size': 'Enter a whole number.'})
+    if not 1 <= page_size <= API_MAX_PAGE_SIZE:
+        raise ValidationError({'page_size': f'Must be between 1 and {API_MAX_PAGE_SIZE}.'})
+    return page_size
+
+
+def _page_url(request, cursor_name, cursor):
+    if not cursor:
+        return None
+    params = request.GET.copy()
+    params.pop('after', None)
+    params.pop('before', None)
+    params[cursor_name] = cursor
+    return request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+
+
+def page_arguments(request):
+    """Return keyset_paginate() keyword arguments from the query string."""
+    return {
+        'after': request.GET.get('after'),
+        'before': request.GET.get('before'),
+        'page_size': _page_size(request),
+    }
+
+
+def page_body(request, page, serializer_class):
+    serializer = serializer_class(page.rows, many=True, fields=_selected_fields(request))
+    return {
+        'next': _page_url(request, 'after', page.next_cursor),
+        'previous': _page_url(request, 'before', page.previous_cursor),
+        'results': serializer.data,
+    }
+
+
+def _paginated_response(request, queryset, keyset, serializer_class, descending=False):
+    try:
+        page = keyset_paginate(queryset, keyset, descending=descending, **page_arguments(request))
+    except InvalidCursor:
+        raise ValidationError(INVALID_CURSOR)
+    return Response(page_body(request, page, serializer_class))
+
+
+def ground_slots_queryset(request, ground_id):
+    """Slots of a ground filtered by the request's date range and status."""
+    form = DateRangeForm(request.GET)
+    if not form.is_valid():
+        raise ValidationError(form.errors)
+    start_date = form.cleaned_data['start_date'] or timezone.now().date()
+    end_date = form.cleaned_data['end_date'] or start_date + timedelta(days=SLOT_WINDOW_DAYS - 1)
+
+    slots = Slot.objects.filter(ground_id=ground_id, date__gte=start_date, date__lte=end_date)
+    status = request.GET.get('status')
+    if status:
+        if status not in dict(AVAILABILITY_STATUSES):
+            raise ValidationError({'status': f'Unknown status "{status}".'})
+        slots = slots.filter(availability_status=status)
+    return slots
+
+
+# Endpoints
+@condition(etag_func=_grounds_etag, last_modified_func=_grounds_modified)
+@cache_control(no_cache=True)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def api_ground_list(request):
+    grounds = Ground.objects.all()
+    sport_type = request.GET.get('sport_type')
+    if sport_type:
+        grounds = grounds.filter(sport_type=sport_type)
+    return _paginated_response(request, grounds, ['name', 'id'], GroundSerializer)
+
+
+@condition(etag_func=ground_etag, last_modified_func=ground_modified)
+@cache_control(no_cache=True)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def api_ground_detail(request, ground_id):
+    ground = get_object_or_404(Ground, pk=ground_id)
+    return Response(GroundSerializer(ground, fields=_selected_fields(request)).data)
+
+
+@condition(etag_func=ground_etag, last_modified_func=ground_modified)
+@cache_control(no_cache=True)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def api_ground_slots(request, ground_id):
+    if not Ground.objects.filter(pk=ground_id).exists():
+        raise NotFound('Ground not found.')
+
+    slots = ground_slots_queryset(request, ground_id)
+    return _paginated_response(request, slots, SLOT_KEYSET, SlotSerializer)
+
+
+@condition(etag_func=_bookings_etag, last_modified_func=_bookings_modified)
+@cache_control(private=True, no_cache=True)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_booking_list(request):
+    bookings = Booking.objects.filter(user=request.user).select_related('slot__ground', 'payment')
+    return _paginated_response(
+        request, bookings, ['booking_date', 'id'], BookingSerializer, descending=True
+    )
+
+
+@cache_control(no_cache=True)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def api_free_windows(request):
+    """Stretches of at least ``minutes`` bookable time, from the availability bitmaps."""
+    form = FreeWindowForm(request.GET)
+    if not form.is_valid():
+        raise ValidationError(form.errors)
+    data = form.cleaned_data
+    start_date = data['start_date'] or timezone.now().date()
+    end_date = data['end_date'] or start_date + timedelta(days=SLOT_WINDOW_DAYS - 1)
+
+    windows = bitmaps.free_windows(
+        data['minutes'],
+        start_date,
+        end_date,
+        grounds=data['ground'] or None,
+        earliest=data['earliest'],
+        latest=data['latest'],
+    )
+    return Response({
+        'results': [
+            {
+                'ground': window.ground_id,
+                'date': window.date,
+                'start_time': window.start_time,
+                'end_time': window.end_time,
+                'minutes': window.minutes,
+            }
+            for window in windows
+        ]
+    })
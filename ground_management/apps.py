@@ -3,4 +3,12 @@ from django.apps import AppConfig
 
 class GroundManagementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'ground_management'
\ No newline at end of file
+    name = 'ground_management'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .timing import install_query_timer
+
+        connection_created.connect(install_query_timer)
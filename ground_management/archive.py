@@ -0,0 +1,147 @@
+"""
+Archival of past slots, bookings and payments.
+
+``archive_history`` moves slots dated before the retention cutoff
+(``ARCHIVE_RETENTION_DAYS`` ago), with their bookings and payments, into
+``ArchivedSlot``, ``ArchivedBooking`` and ``ArchivedPayment``, keeping their
+ids. One chunk of slots is moved per transaction, with INSERT ... SELECT and
+plain DELETE statements, so the rows never pass through Python and no signals
+fire. The revenue rollup keeps archived payments; no cache covers past days.
+
+Booking pages, availability and the API read only the hot tables. Reports
+and a user's past bookings also read the archive, but only when their window
+starts before the cutoff (``reaches_archive``). Nothing newer than the cutoff
+is ever archived, as long as the retention period is not raised later.
+"""
+
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import versions
+from .models import (
+    FINISHED_BOOKING_STATUSES, ArchivedBooking, ArchivedPayment, ArchivedSlot, AvailabilityBitmap, Booking, Payment,
+    Slot
+)
+
+ARCHIVE_BATCH_SIZE = 2000
+
+# Hot table and archive table, in the order rows are copied; deletes go in reverse
+ARCHIVED_MODELS = [
+    (Slot, ArchivedSlot),
+    (Booking, ArchivedBooking),
+    (Payment, ArchivedPayment),
+]
+
+
+@dataclass
+class ArchiveResult:
+    slots: int = 0
+    bookings: int = 0
+    payments: int = 0
+
+
+def archive_cutoff(today=None):
+    """First date that stays in the hot tables."""
+    today = today or timezone.localdate()
+    return today - timedelta(days=settings.ARCHIVE_RETENTION_DAYS)
+
+
+def reaches_archive(start_date):
+    """Whether a window starting on start_date (None: no start) can include archived rows."""
+    return start_date is None or start_date < archive_cutoff()
+
+
+def _where(model, placeholders):
+    # Each table's rows that belong to the batch of slot ids
+    booking_table = connection.ops.quote_name(Booking._meta.db_table)
+    return {
+        Slot: f'id IN ({placeholders})',
+        Booking: f'slot_id IN ({placeholders})',
+        Payment: f'booking_id IN (SELECT id FROM {booking_table} WHERE slot_id IN ({placeholders}))',
+    }[model]
+
+
+def _move_batch(slot_ids):
+    quote = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(slot_ids))
+    moved = []
+    with connection.cursor() as cursor:
+        for model, archive_model in ARCHIVED_MODELS:
+            # The archive models declare the same columns as the hot ones
+            columns = ', '.join(quote(field.column) for field in archive_model._meta.concrete_fields)
+            cursor.execute(
+                f'INSERT INTO {quote(archive_model._meta.db_table)} ({columns}) '
+                f'SELECT {columns} FROM {quote(model._meta.db_table)} WHERE {_where(model, placeholders)}',
+                slot_ids
+            )
+            moved.append(cursor.rowcount)
+        for model, _ in reversed(ARCHIVED_MODELS):
+            cursor.execute(
+                f'DELETE FROM {quote(model._meta.db_table)} WHERE {_where(model, placeholders)}',
+                slot_ids
+            )
+    return moved
+
+
+def archivable(cutoff=None):
+    """Counts of the rows archive_history would move, without moving them."""
+    cutoff = cutoff or archive_cutoff()
+    return ArchiveResult(
+        slots=Slot.objects.filter(date__lt=cutoff).count(),
+        bookings=Booking.objects.filter(slot__date__lt=cutoff).count(),
+        payments=Payment.objects.filter(booking__slot__date__lt=cutoff).count(),
+    )
+
+
+def archive_history(cutoff=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """Move slots dated before cutoff, and their bookings and payments, to the archive.
+
+    Each batch of slots is moved in its own transaction, so the command can be
+    stopped and rerun. Returns an ArchiveResult of the rows moved.
+    """
+    cutoff = cutoff or archive_cutoff()
+    result = ArchiveResult()
+    while True:
+        with transaction.atomic():
+            batch = list(
+                Slot.objects.select_for_update().filter(date__lt=cutoff).order_by()
+                .values_list('id', 'ground_id')[:batch_size]
+            )
+            if not batch:
+                break
+            slot_ids = [slot_id for slot_id, _ in batch]
+            user_ids = set(Booking.objects.filter(slot_id__in=slot_ids).values_list('user_id', flat=True))
+            slots, bookings, payments = _move_batch(slot_ids)
+
+            # API responses for these users and grounds change
+            for user_id in user_ids:
+                versions.touch('bookings', user_id)
+            for ground_id in {ground_id for _, ground_id in batch}:
+                versions.touch('ground', ground_id)
+        result.slots += slots
+        result.bookings += bookings
+        result.payments += payments
+
+    # Past days cannot be booked, so their free-window bitmaps go too
+    AvailabilityBitmap.objects.filter(date__lt=cutoff).delete()
+    return result
+
+
+# Reading across both
+def past_bookings(user):
+    """A user's finished bookings, newest slot first, hot and archived."""
+    bookings = list(
+        Booking.objects.select_related('slot__ground').filter(user=user, status__in=FINISHED_BOOKING_STATUSES)
+    )
+    bookings += ArchivedBooking.objects.select_related('slot__ground').filter(user=user)
+    bookings.sort(key=lambda booking: (booking.slot.date, booking.slot.start_time), reverse=True)
+    return bookings
+
+
+def booking_count(**filters):
+    """Number of bookings matching filters, hot and archived."""
+    return Booking.objects.filter(**filters).count() + ArchivedBooking.objects.filter(**filters).count()
@@ -0,0 +1,169 @@
+"""
+Async versions of the public read paths, served by the ASGI entry point.
+
+``sports_ground_management/asgi.py`` routes home, ground_list, ground_detail,
+the slot availability API, the live availability stream and the exports here
+(see ``asgi_urls.py``); WSGI keeps the synchronous views. Queries go through
+Django's async ORM and async cache API so a slow query does not pin a worker
+thread for the whole request.
+
+Templates read ``request.user`` and session-backed messages lazily, which
+would query the database synchronously on the event loop, so the user (and
+with it the session) is loaded up front with ``request.auser()``.
+"""
+
+from datetime import datetime, timedelta
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404, render
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
+from rest_framework.exceptions import ValidationError
+
+from . import api, availability, facets, live
+from .exports import astream_export, export_response
+from .forms import BookingExportForm
+from .models import Ground
+from .pagination import InvalidCursor, akeyset_paginate
+from .search import search_grounds
+from .serializers import SlotSerializer
+from .views import is_admin
+
+# Same bytes as DRF's JSONRenderer, so ETags match the WSGI responses
+JSON_DUMPS_PARAMS = {'separators': (',', ':'), 'ensure_ascii': False}
+
+
+async def _load_user(request):
+    request.user = await request.auser()
+
+
+def _bad_request(exc):
+    # Same body DRF renders for a ValidationError
+    return JsonResponse(exc.detail, status=400, safe=False, json_dumps_params=JSON_DUMPS_PARAMS)
+
+
+# Public views
+async def home(request):
+    await _load_user(request)
+    return render(request, 'ground_management/home.html', {
+        'featured_grounds': await facets.afeatured_grounds()
+    })
+
+async def ground_list(request):
+    await _load_user(request)
+    query = request.GET.get('q', '').strip()
+    sport_type = request.GET.get('sport_type', '')
+    location = request.GET.get('location', '')
+
+    if query:
+        # Search runs raw SQL on a cursor, which has no async API
+        grounds = await sync_to_async(search_grounds)(query, sport_type=sport_type, location=location)
+    else:
+        grounds = Ground.objects.all()
+
+        if sport_type:
+            grounds = grounds.filter(sport_type=sport_type)
+
+        if location:
+            grounds = grounds.filter(location=location)
+
+        grounds = [ground async for ground in grounds]
+
+    ground_facets = await facets.aground_facets()
+
+    return render(request, 'ground_management/ground_list.html', {
+        'grounds': grounds,
+        'sport_types': ground_facets['sport_types'],
+        'locations': ground_facets['locations'],
+        'selected_sport': sport_type,
+        'selected_location': location,
+        'query': query
+    })
+
+async def ground_detail(request, ground_id):
+    await _load_user(request)
+    ground = await aget_object_or_404(Ground, pk=ground_id)
+
+    today = timezone.now().date()
+    date_list = [today + timedelta(days=i) for i in range(7)]
+
+    selected_date = request.GET.get('date', today.strftime('%Y-%m-%d'))
+    try:
+        selected_date = datetime.strptime(selected_date, '%Y-%m-%d').date()
+    except ValueError:
+        selected_date = today
+
+    return render(request, 'ground_management/ground_detail.html', {
+        'ground': ground,
+        'date_list': date_list,
+        'selected_date': selected_date,
+        'available_slots': await availability.aavailable_slots(ground.id, selected_date)
+    })
+
+@require_GET
+async def slot_stream(request, ground_id):
+    """Server-Sent Events: a snapshot of the day's open slots, then each change."""
+    if not await Ground.objects.filter(pk=ground_id).aexists():
+        raise Http404('Ground not found.')
+    try:
+        day = datetime.strptime(request.GET.get('date', ''), '%Y-%m-%d').date()
+    except ValueError:
+        day = timezone.now().date()
+
+    return StreamingHttpResponse(
+        _slot_events(ground_id, day),
+        content_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+async def _slot_events(ground_id, day):
+    # Subscribe before reading the snapshot so no change can fall in between;
+    # deltas are idempotent, so one already in the snapshot does no harm
+    subscription = live.subscribe(ground_id, day)
+    try:
+        yield live.retry(live.RECONNECT_MS)
+        yield live.snapshot(await availability.aavailable_slots(ground_id, day))
+        while True:
+            event = await subscription.get(timeout=live.HEARTBEAT_SECONDS)
+            if event is None:
+                yield ': keep-alive\n\n'
+            elif event is live.RESYNC:
+                yield live.snapshot(await availability.aavailable_slots(ground_id, day))
+            else:
+                yield live.sse('slot', event)
+    finally:
+        subscription.close()
+
+# REST API
+@require_GET
+@condition(etag_func=api.ground_etag, last_modified_func=api.ground_modified)
+@cache_control(no_cache=True)
+async def api_ground_slots(request, ground_id):
+    if not await Ground.objects.filter(pk=ground_id).aexists():
+        return JsonResponse({'detail': 'Ground not found.'}, status=404)
+
+    try:
+        slots = api.ground_slots_queryset(request, ground_id)
+        page = await akeyset_paginate(slots, api.SLOT_KEYSET, descending=False, **api.page_arguments(request))
+        body = api.page_body(request, page, SlotSerializer)
+    except InvalidCursor:
+        return _bad_request(ValidationError(api.INVALID_CURSOR))
+    except ValidationError as exc:
+        return _bad_request(exc)
+
+    return JsonResponse(body, json_dumps_params=JSON_DUMPS_PARAMS)
+
+# Exports
+@login_required
+@user_passes_test(is_admin)
+async def admin_export(request, dataset):
+    """Stream bookings or payments as CSV or JSON Lines without holding a worker thread."""
+    form = BookingExportForm(request.GET)
+    # The ground filter is looked up with the sync ORM
+    if not await sync_to_async(form.is_valid)():
+        return JsonResponse({'errors': form.errors}, status=400)
+    export_format = form.cleaned_data['format'] or 'csv'
+    return export_response(astream_export(dataset, export_format, form), dataset, export_format)
@@ -0,0 +1,158 @@
+"""
+Availability cache.
+
+The list of bookable slots for a (ground, date) is cached, because it only
+changes when a slot is booked, cancelled or edited. Cache keys embed two
+version numbers, one per ground and one per (ground, date). Writers bump the
+versions after their transaction commits instead of deleting entries, so a
+reader that loaded rows just before a commit can only write them under a key
+nobody looks up any more. Stale availability is never served after a change.
+Every invalidation also moves the ground's change version (``versions``),
+which the API uses for ETags.
+
+The backend is the cache alias named by ``AVAILABILITY_CACHE_ALIAS``
+(``'default'``, local memory unless ``CACHES`` says otherwise).
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from . import versions
+from .models import Slot
+
+
+class CacheStats:
+    """Per-process hit/miss counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.invalidations = 0
+
+    def record(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def as_dict(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+stats = CacheStats()
+
+
+def _cache():
+    return caches[getattr(settings, 'AVAILABILITY_CACHE_ALIAS', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'AVAILABILITY_CACHE_TIMEOUT', 300)
+
+
+def _ground_version_key(ground_id):
+    return f'availability:v:{ground_id}'
+
+
+def _day_version_key(ground_id, day):
+    return f'availability:v:{ground_id}:{day.isoformat()}'
+
+
+def _versions(cache, ground_id, day):
+    keys = [_ground_version_key(ground_id), _day_version_key(ground_id, day)]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Start from a clock-based epoch so an evicted counter never
+            # comes back at a value an old entry was stored under
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+async def _aversions(cache, ground_id, day):
+    keys = [_ground_version_key(ground_id), _day_version_key(ground_id, day)]
+    versions = await cache.aget_many(keys)
+    for key in keys:
+        if key not in versions:
+            await cache.aadd(key, time.time_ns(), timeout=None)
+            versions[key] = await cache.aget(key)
+    return [versions[key] for key in keys]
+
+
+def _slots_key(ground_id, day, ground_version, day_version):
+    return f'availability:{ground_id}:{ground_version}:{day.isoformat()}:{day_version}'
+
+
+def _slots_query(ground_id, day):
+    return Slot.objects.select_related('ground').filter(
+        ground_id=ground_id,
+        date=day,
+        availability_status='Available'
+    ).order_by('start_time')
+
+
+def _bump(key):
+    cache = _cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+    stats.record('invalidations')
+
+
+def available_slots(ground_id, day):
+    """Return the available slots of a ground on a date, ordered by start time."""
+    cache = _cache()
+    key = _slots_key(ground_id, day, *_versions(cache, ground_id, day))
+
+    slots = cache.get(key)
+    if slots is not None:
+        stats.record('hits')
+        return slots
+
+    stats.record('misses')
+    slots = list(_slots_query(ground_id, day))
+    cache.set(key, slots, _timeout())
+    return slots
+
+
+async def aavailable_slots(ground_id, day):
+    """Async version of available_slots()."""
+    cache = _cache()
+    key = _slots_key(ground_id, day, *await _aversions(cache, ground_id, day))
+
+    slots = await cache.aget(key)
+    if slots is not None:
+        stats.record('hits')
+        return slots
+
+    stats.record('misses')
+    slots = [slot async for slot in _slots_query(ground_id, day)]
+    await cache.aset(key, slots, _timeout())
+    return slots
+
+
+def invalidate_day(ground_id, day):
+    """Drop cached availability for one ground and date once the transaction commits."""
+    transaction.on_commit(lambda: _bump(_day_version_key(ground_id, day)))
+    versions.touch('ground', ground_id)
+
+
+def invalidate_ground(ground_id):
+    """Drop cached availability for every date of a ground (bulk changes)."""
+    transaction.on_commit(lambda: _bump(_ground_version_key(ground_id)))
+    versions.touch('ground', ground_id)
@@ -0,0 +1,206 @@
+"""
+Per-ground, per-day availability bitmaps.
+
+``AvailabilityBitmap`` stores the bookable time of one ground on one day as a
+96-bit integer: bit i is set when the 15 minutes starting at i * 15 minutes
+past midnight lie inside an Available slot. A free-window search over a week
+of grounds then reads one 12-byte row per ground and day and finds runs of set
+bits with integer arithmetic, instead of loading and comparing every slot.
+
+Bitmaps are derived from ``Slot`` rows. The booking paths and the slot
+signals call ``refresh_days`` inside the writing transaction; bulk writers
+(schedules, generate_data) call ``rebuild_bitmaps`` for the range they
+touched, as does the ``rebuild_availability_bitmaps`` command.
+"""
+
+from dataclasses import dataclass
+from datetime import time
+from itertools import groupby
+
+from django.db import transaction
+
+from .models import AvailabilityBitmap, Slot
+
+MINUTES_PER_BIT = 15
+BITS_PER_DAY = 24 * 60 // MINUTES_PER_BIT
+BYTES_PER_DAY = BITS_PER_DAY // 8
+
+
+@dataclass(frozen=True)
+class FreeWindow:
+    """A maximal stretch of bookable time on one ground and day."""
+    ground_id: int
+    date: object
+    start_time: time
+    end_time: time
+
+    @property
+    def minutes(self):
+        return (self.end_time.hour * 60 + self.end_time.minute) - (self.start_time.hour * 60 + self.start_time.minute)
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute + (value.second > 0 or value.microsecond > 0)
+
+
+def _time(bit):
+    minutes = bit * MINUTES_PER_BIT
+    return time(minutes // 60, minutes % 60)
+
+
+def time_mask(start_time, end_time):
+    """Bits for the 15-minute blocks lying wholly inside [start_time, end_time)."""
+    first = -(-_minutes(start_time) // MINUTES_PER_BIT)
+    last = (end_time.hour * 60 + end_time.minute) // MINUTES_PER_BIT
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def day_bits(slots):
+    """Combine (start_time, end_time, availability_status) rows into a bitmap."""
+    bits = 0
+    for start_time, end_time, status in slots:
+        if status == 'Available':
+            bits |= time_mask(start_time, end_time)
+    return bits
+
+
+def encode(bits):
+    return bits.to_bytes(BYTES_PER_DAY, 'little')
+
+
+def decode(value):
+    return int.from_bytes(bytes(value), 'little') if value else 0
+
+
+def runs_of(bits, length):
+    """Keep only the set bits that start a run of at least length set bits."""
+    shift = 1
+    while shift < length:
+        step = min(shift, length - shift)
+        bits &= bits >> step
+        shift += step
+    return bits
+
+
+def free_runs(bits):
+    """Yield (first_bit, bit_count) for each run of set bits, lowest first."""
+    while bits:
+        first = (bits & -bits).bit_length() - 1
+        rest = bits >> first
+        count = (rest ^ (rest + 1)).bit_length() - 1
+        yield first, count
+        bits &= ~(((1 << count) - 1) << first)
+
+
+def _lock_days(days):
+    """Lock the bitmap rows of days, in (ground, date) order, creating missing ones."""
+    rows = AvailabilityBitmap.objects.select_for_update().filter(
+        ground_id__in={ground_id for ground_id, _ in days},
+        date__in={day for _, day in days}
+    ).order_by('ground_id', 'date').values_list('ground_id', 'date')
+    missing = days - set(rows)
+    if missing:
+        # A concurrent insert of the same day waits for this one, then locks it below
+        AvailabilityBitmap.objects.bulk_create(
+            [AvailabilityBitmap(ground_id=ground_id, date=day, free=encode(0)) for ground_id, day in sorted(missing)],
+            ignore_conflicts=True,
+        )
+        list(rows)
+
+
+def refresh_days(days):
+    """Recompute the bitmaps of (ground_id, date) pairs from their slots.
+
+    Writers of the same day queue on its bitmap row, locked before the slots
+    are read, so each one reads the slots as the previous writer committed
+    them. The slot rows themselves are not locked: the caller already holds
+    the one it changed, and locking the rest of the day would deadlock with
+    a concurrent writer holding another.
+    """
+    days = set(days)
+    if not days:
+        return
+    with transaction.atomic():
+        _lock_days(days)
+        rows = Slot.objects.filter(
+            ground_id__in={ground_id for ground_id, _ in days},
+            date__in={day for _, day in days}
+        ).values_list('ground_id', 'date', 'start_time', 'end_time', 'availability_status')
+        bits = dict.fromkeys(days, 0)
+        for ground_id, day, start_time, end_time, status in rows:
+            if (ground_id, day) in bits and status == 'Available':
+                bits[ground_id, day] |= time_mask(start_time, end_time)
+
+        AvailabilityBitmap.objects.bulk_create(
+            [AvailabilityBitmap(ground_id=ground_id, date=day, free=encode(value)) for (ground_id, day), value in bits.items()],
+            update_conflicts=True,
+            unique_fields=['ground', 'date'],
+            update_fields=['free'],
+        )
+
+
+def rebuild_bitmaps(ground_ids=None, start_date=None, end_date=None, batch_size=5000):
+    """Recompute all bitmaps, optionally limited to grounds and a date range.
+
+    Streams slots in (ground, date) order, so memory stays flat however many
+    slots there are. Returns the number of bitmap rows written.
+    """
+    bitmaps = AvailabilityBitmap.objects.all()
+    slots = Slot.objects.all()
+    if ground_ids is not None:
+        bitmaps = bitmaps.filter(ground_id__in=ground_ids)
+        slots = slots.filter(ground_id__in=ground_ids)
+    if start_date:
+        bitmaps = bitmaps.filter(date__gte=start_date)
+        slots = slots.filter(date__gte=start_date)
+    if end_date:
+        bitmaps = bitmaps.filter(date__lte=end_date)
+        slots = slots.filter(date__lte=end_date)
+
+    rows = slots.order_by('ground_id', 'date').values_list(
+        'ground_id', 'date', 'start_time', 'end_time', 'availability_status'
+    ).iterator(chunk_size=batch_size)
+
+    written = 0
+    with transaction.atomic():
+        bitmaps.delete()
+        batch = []
+        for (ground_id, day), day_slots in groupby(rows, key=lambda row: row[:2]):
+            bits = day_bits(row[2:] for row in day_slots)
+            if bits:
+                batch.append(AvailabilityBitmap(ground_id=ground_id, date=day, free=encode(bits)))
+            if len(batch) >= batch_size:
+                AvailabilityBitmap.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        AvailabilityBitmap.objects.bulk_create(batch)
+        written += len(batch)
+    return written
+
+
+def free_windows(minutes, start_date, end_date, grounds=None, earliest=None, latest=None):
+    """Return FreeWindows of at least minutes of contiguous bookable time.
+
+    Searches every day from start_date to end_date on the given grounds (all
+    grounds if None), only between earliest and latest (times of day). Each
+    window is a maximal run of free time, clipped to that range, ordered by
+    date, ground and start time. Runs one query.
+    """
+    length = max(1, -(-minutes // MINUTES_PER_BIT))
+    window = time_mask(earliest or time(0), latest or time(23, 59))
+
+    rows = AvailabilityBitmap.objects.filter(date__gte=start_date, date__lte=end_date)
+    if grounds is not None:
+        rows = rows.filter(ground__in=grounds)
+
+    windows = []
+    for ground_id, day, free in rows.order_by('date', 'ground_id').values_list('ground_id', 'date', 'free'):
+        bits = decode(free) & window
+        if not runs_of(bits, length):
+            continue
+        for first, count in free_runs(bits):
+            if count >= length:
+                windows.append(FreeWindow(ground_id, day, _time(first), _time(first + count)))
+    return windows
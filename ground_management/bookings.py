@@ -0,0 +1,164 @@
+"""
+Slot claiming and release.
+
+A slot is claimed with a single conditional UPDATE (``... WHERE
+availability_status = 'Available'``) inside the same transaction that creates
+the booking. The database serialises concurrent updates of the row, so when
+several users race for one slot exactly one UPDATE matches and every other
+claim fails cleanly instead of double-booking.
+
+A new booking is a Pending hold that lapses ``BOOKING_HOLD_MINUTES`` later.
+Payment confirms it with another conditional UPDATE (``... WHERE status =
+'Pending' AND expires_at > now``); ``expire_holds`` cancels lapsed holds and
+releases their slots a batch at a time, found through the partial index on
+pending holds' ``expires_at``. Row locks on the booking make the two exclusive.
+
+These paths update slots with ``QuerySet.update()``, which sends no model
+signals, so they refresh the availability bitmap, invalidate the availability
+cache and publish the live availability delta themselves.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import availability, bitmaps, live, versions
+from .models import ACTIVE_BOOKING_STATUSES, Booking, Slot
+
+HOLD_EXPIRY_BATCH_SIZE = 1000
+
+
+class SlotUnavailable(Exception):
+    """Raised when a slot was taken (or closed) before it could be claimed."""
+
+
+class HoldExpired(Exception):
+    """Raised when a pending hold lapsed before it could be confirmed."""
+
+
+class BookingNotActive(Exception):
+    """Raised when releasing a booking that is cancelled, finished or a lapsed hold."""
+
+
+def hold_deadline(now=None):
+    return (now or timezone.now()) + timedelta(minutes=settings.BOOKING_HOLD_MINUTES)
+
+
+def claim_slot(user, slot, status='Pending'):
+    """Atomically mark slot as booked and create the booking for user.
+
+    A Pending booking is a hold that expires after BOOKING_HOLD_MINUTES.
+    """
+    slot_id = getattr(slot, 'pk', slot)
+    with transaction.atomic():
+        claimed = Slot.objects.filter(
+            pk=slot_id,
+            availability_status='Available'
+        ).update(availability_status='Booked')
+        if not claimed:
+            raise SlotUnavailable(f'Slot {slot_id} is no longer available.')
+        
+        if not isinstance(slot, Slot):
+            slot = Slot.objects.get(pk=slot_id)
+        bitmaps.refresh_days([(slot.ground_id, slot.date)])
+        availability.invalidate_day(slot.ground_id, slot.date)
+        live.publish_slot(slot, 'Booked')
+        
+        return Booking.objects.create(
+            user=user,
+            slot_id=slot_id,
+            status=status,
+            expires_at=hold_deadline() if status == 'Pending' else None
+        )
+
+
+def confirm_booking(booking):
+    """Turn booking's pending hold into a confirmed booking.
+
+    Call inside the transaction that records the payment. Bookings that are
+    not pending are left as they are; raises HoldExpired if the hold lapsed.
+    """
+    if booking.status != 'Pending':
+        return
+    confirmed = Booking.objects.filter(pk=booking.pk, status='Pending').exclude(
+        expires_at__lte=timezone.now()
+    ).update(status='Confirmed', expires_at=None)
+    if not confirmed:
+        raise HoldExpired(f'The hold on booking {booking.pk} has expired.')
+    booking.status = 'Confirmed'
+    booking.expires_at = None
+    versions.touch('bookings', booking.user_id)
+
+
+def active_bookings(now=None):
+    """Bookings still holding their slot: confirmed, or pending and not lapsed."""
+    return Booking.objects.filter(status__in=ACTIVE_BOOKING_STATUSES).exclude(
+        status='Pending', expires_at__lte=now or timezone.now()
+    )
+
+
+def is_active(booking, now=None):
+    if booking.status not in ACTIVE_BOOKING_STATUSES:
+        return False
+    return not (booking.status == 'Pending' and booking.expires_at and booking.expires_at <= (now or timezone.now()))
+
+
+def release_booking(booking, status='Cancelled'):
+    """Set booking's status and hand its slot back to the available pool.
+
+    Only an active booking is released, with a conditional UPDATE: once a
+    booking was cancelled or its hold lapsed, the slot may belong to someone
+    else. Raises BookingNotActive otherwise.
+    """
+    with transaction.atomic():
+        if not active_bookings().filter(pk=booking.pk).update(status=status):
+            raise BookingNotActive(f'Booking {booking.pk} is no longer active.')
+        booking.status = status
+        versions.touch('bookings', booking.user_id)
+        released = Slot.objects.filter(
+            pk=booking.slot_id,
+            availability_status='Booked'
+        ).update(availability_status='Available')
+        if released:
+            bitmaps.refresh_days([(booking.slot.ground_id, booking.slot.date)])
+            availability.invalidate_day(booking.slot.ground_id, booking.slot.date)
+            live.publish_slot(booking.slot, 'Available')
+
+
+def expire_holds(now=None, batch_size=HOLD_EXPIRY_BATCH_SIZE):
+    """Cancel pending holds that lapsed by now and release their slots.
+
+    Holds are handled a batch at a time with set-based updates; those being
+    confirmed right now are skipped (on PostgreSQL) and stay confirmed.
+    Returns the number of holds cancelled.
+    """
+    now = now or timezone.now()
+    expired = 0
+    while True:
+        with transaction.atomic():
+            holds = list(
+                Booking.objects.select_for_update(skip_locked=True).filter(
+                    status='Pending', expires_at__lte=now
+                ).order_by('expires_at').values_list('id', 'slot_id', 'user_id')[:batch_size]
+            )
+            if not holds:
+                break
+            Booking.objects.filter(pk__in=[hold_id for hold_id, _, _ in holds]).update(status='Cancelled')
+            slot_ids = [slot_id for _, slot_id, _ in holds]
+            Slot.objects.filter(pk__in=slot_ids, availability_status='Booked').update(availability_status='Available')
+
+            released = list(Slot.objects.filter(pk__in=slot_ids, availability_status='Available'))
+            days = {(slot.ground_id, slot.date) for slot in released}
+            bitmaps.refresh_days(days)
+            for ground_id, day in days:
+                availability.invalidate_day(ground_id, day)
+            for slot in released:
+                live.publish_slot(slot, 'Available')
+            for user_id in {user_id for _, _, user_id in holds}:
+                versions.touch('bookings', user_id)
+        expired += len(holds)
+        if len(holds) < batch_size:
+            break
+    return expired
@@ -0,0 +1,82 @@
+"""
+Maintained counters.
+
+The admin dashboard shows how many grounds, slots, bookings and players exist
+and the revenue taken. Counting those tables on every load scans the largest
+of them, so each total is kept in a ``Counter`` row instead. Writers add
+their change with one conditional UPDATE, inside their own transaction when
+they have one: model signals cover saves and deletes, and the bulk writers
+(imports, schedules) call ``add`` themselves. ``read`` fetches any number of
+counters in one query.
+
+A counter can still drift, e.g. after raw SQL, a ``QuerySet.update()`` that
+changes what is counted or a bulk load such as ``generate_data``.
+``reconcile`` (``manage.py reconcile_counters``) recounts from the tables and
+reports the drift it fixed. A counter that has no row yet is reconciled the
+first time it is read; until then ``add`` leaves it alone.
+
+Totals cover the archive, so archiving moves rows without changing them.
+"""
+
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import ArchivedBooking, ArchivedPayment, ArchivedSlot, Booking, Counter, Ground, Payment, Slot
+
+
+def _paid_total():
+    return sum(
+        (
+            model.objects.filter(payment_status='Paid').aggregate(total=Sum('amount'))['total'] or Decimal(0)
+            for model in (Payment, ArchivedPayment)
+        ),
+        Decimal(0)
+    )
+
+
+# Counter name: (type of its value, how to count it from the tables)
+COUNTERS = {
+    'grounds': (int, lambda: Ground.objects.count()),
+    'slots': (int, lambda: Slot.objects.count() + ArchivedSlot.objects.count()),
+    'bookings': (int, lambda: Booking.objects.count() + ArchivedBooking.objects.count()),
+    'players': (int, lambda: User.objects.filter(is_staff=False).count()),
+    'revenue': (Decimal, _paid_total),
+}
+
+
+def add(name, delta):
+    """Add delta to a counter."""
+    if delta:
+        Counter.objects.filter(name=name).update(value=F('value') + delta)
+
+
+def read(*names):
+    """Return {name: value} for the named counters (all of them by default)."""
+    names = names or tuple(COUNTERS)
+    values = {counter.name: counter.value for counter in Counter.objects.filter(name__in=names)}
+    missing = [name for name in names if name not in values]
+    if missing:
+        values.update((name, new) for name, (old, new) in reconcile(missing).items())
+    return {name: COUNTERS[name][0](values[name]) for name in names}
+
+
+def reconcile(names=None):
+    """Recount counters from the tables and store the results.
+
+    Returns {name: (stored value or None, counted value)}.
+    """
+    results = {}
+    for name in names or COUNTERS:
+        with transaction.atomic():
+            # Writers wait on the locked row, so none is counted twice or missed
+            counter, created = Counter.objects.select_for_update().get_or_create(name=name)
+            counted = COUNTERS[name][1]()
+            results[name] = (None if created else counter.value, counted)
+            counter.value = counted
+            counter.reconciled_at = timezone.now()
+            counter.save()
+    return results
@@ -0,0 +1,212 @@
+"""
+Streaming exports of bookings and payments as CSV or JSON Lines.
+
+Each row is flattened with its user, slot, ground and payment (or booking)
+columns, read in one joined query with ``values_list`` so no model instances
+are built, and fetched in chunks (a server-side cursor on PostgreSQL). Rows
+are encoded a chunk at a time; the header goes out before the query runs,
+so a download starts at once and memory stays flat however many rows there
+are. Archived rows come first when the date filter reaches the archive.
+
+``stream_export`` is for WSGI and management commands and ``astream_export``
+for ASGI, where Django would read a synchronous iterator to the end before
+sending the first byte.
+"""
+
+import csv
+import io
+from datetime import date, datetime, time
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .archive import reaches_archive
+from .models import ArchivedBooking, ArchivedPayment, Booking, Payment
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+USER_COLUMNS = [
+    ('user_id', 'user_id'),
+    ('username', 'user__username'),
+    ('email', 'user__email'),
+]
+
+SLOT_COLUMNS = [
+    ('ground_id', 'slot__ground_id'),
+    ('ground', 'slot__ground__name'),
+    ('location', 'slot__ground__location'),
+    ('sport_type', 'slot__ground__sport_type'),
+    ('slot_id', 'slot_id'),
+    ('slot_date', 'slot__date'),
+    ('start_time', 'slot__start_time'),
+    ('end_time', 'slot__end_time'),
+    ('price_per_slot', 'slot__price_per_slot'),
+]
+
+
+def _through(prefix, columns):
+    return [(name, prefix + path) for name, path in columns]
+
+
+# Hot and archive models, the prefix that reaches the booking, for
+# BookingFilterForm.apply(), and exported columns as (header, lookup path)
+DATASETS = {
+    'bookings': (Booking, ArchivedBooking, '', [
+        ('booking_id', 'id'),
+        ('booking_date', 'booking_date'),
+        ('status', 'status'),
+        *USER_COLUMNS,
+        *SLOT_COLUMNS,
+        ('payment_id', 'payment__id'),
+        ('payment_date', 'payment__payment_date'),
+        ('amount', 'payment__amount'),
+        ('payment_method', 'payment__payment_method'),
+        ('payment_status', 'payment__payment_status'),
+    ]),
+    'payments': (Payment, ArchivedPayment, 'booking__', [
+        ('payment_id', 'id'),
+        ('payment_date', 'payment_date'),
+        ('amount', 'amount'),
+        ('payment_method', 'payment_method'),
+        ('payment_status', 'payment_status'),
+        ('booking_id', 'booking_id'),
+        ('booking_date', 'booking__booking_date'),
+        ('booking_status', 'booking__status'),
+        *_through('booking__', USER_COLUMNS),
+        *_through('booking__', SLOT_COLUMNS),
+    ]),
+}
+
+
+def export_querysets(dataset, filter_form=None):
+    """Querysets of the dataset's rows as tuples in DATASETS column order.
+
+    The archived rows' queryset comes first, if the filter's date window
+    reaches the archive; each is ordered oldest first. filter_form is a
+    validated BookingFilterForm.
+    """
+    model, archive_model, prefix, columns = DATASETS[dataset]
+    start_date = filter_form.cleaned_data['start_date'] if filter_form is not None else None
+    models = [archive_model, model] if reaches_archive(start_date) else [model]
+    querysets = []
+    for source in models:
+        rows = source.objects.all()
+        if filter_form is not None:
+            rows = filter_form.apply(rows, prefix)
+        # Primary key order needs no sort, unlike the models' date orderings
+        querysets.append(rows.order_by('pk').values_list(*[path for _, path in columns]))
+    return querysets
+
+
+def export_response(streaming_content, dataset, export_format):
+    """A download of stream_export() or astream_export() output."""
+    filename = f'{dataset}-{timezone.now():%Y%m%d-%H%M%S}.{export_format}'
+    return StreamingHttpResponse(
+        streaming_content,
+        content_type=f'{EXPORT_FORMATS[export_format]}; charset=utf-8',
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'Cache-Control': 'private, no-store',
+            # Let proxies pass chunks on as they come
+            'X-Accel-Buffering': 'no',
+        }
+    )
+
+
+# Encoding
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@'):
+        # Keep spreadsheets from evaluating user-entered text as a formula
+        return "'" + value
+    return value
+
+
+class _CSVEncoder:
+    def __init__(self, headers):
+        self.headers = headers
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+    def _flush(self):
+        text = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return text
+
+    def header(self):
+        self.writer.writerow(self.headers)
+        return self._flush()
+
+    def rows(self, rows):
+        self.writer.writerows([_csv_value(value) for value in row] for row in rows)
+        return self._flush()
+
+
+class _JSONLinesEncoder:
+    def __init__(self, headers):
+        self.headers = headers
+        self.encoder = DjangoJSONEncoder(separators=(',', ':'), ensure_ascii=False)
+
+    def header(self):
+        # JSON Lines has no header row
+        return ''
+
+    def rows(self, rows):
+        return ''.join(self.encoder.encode(dict(zip(self.headers, row))) + '\n' for row in rows)
+
+
+ENCODERS = {
+    'csv': _CSVEncoder,
+    'jsonl': _JSONLinesEncoder,
+}
+
+
+def _encoder(dataset, export_format):
+    *_, columns = DATASETS[dataset]
+    return ENCODERS[export_format]([name for name, _ in columns])
+
+
+def stream_export(dataset, export_format, filter_form=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the export as text, one chunk of rows at a time."""
+    encoder = _encoder(dataset, export_format)
+    header = encoder.header()
+    if header:
+        yield header
+    chunk = []
+    for rows in export_querysets(dataset, filter_form):
+        for row in rows.iterator(chunk_size=chunk_size):
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield encoder.rows(chunk)
+                chunk = []
+    if chunk:
+        yield encoder.rows(chunk)
+
+
+async def astream_export(dataset, export_format, filter_form=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Async version of stream_export().
+
+    Each chunk is read and encoded by stream_export() on the request's sync
+    thread, where its database cursor lives.
+    """
+    chunks = stream_export(dataset, export_format, filter_form, chunk_size)
+    try:
+        while True:
+            chunk = await sync_to_async(next)(chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        # Close the cursor on the thread that opened it, even if the client left
+        await sync_to_async(chunks.close)()
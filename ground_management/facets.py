@@ -0,0 +1,99 @@
+"""
+Ground metadata cache.
+
+The filter dropdowns on ``ground_list`` (sport types and locations, with
+counts) and the featured grounds on ``home`` only change when an admin edits a
+ground, so they are computed once and cached. Saving or deleting a ground moves
+the ``grounds`` change version (see ``versions``) after the transaction
+commits, which retires every cached entry at once.
+"""
+
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count
+
+from . import versions
+from .models import Ground
+
+FEATURED_COUNT = 3
+
+
+def _cache():
+    return caches[getattr(settings, 'GROUND_CACHE_ALIAS', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'GROUND_CACHE_TIMEOUT', 3600)
+
+
+def _cached(name, compute):
+    cache = _cache()
+    key = f'grounds:{name}:{versions.current("grounds")}'
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, _timeout())
+    return value
+
+
+async def _acached(name, compute):
+    cache = _cache()
+    key = f'grounds:{name}:{await versions.acurrent("grounds")}'
+    value = await cache.aget(key)
+    if value is None:
+        value = await compute()
+        await cache.aset(key, value, _timeout())
+    return value
+
+
+def _facet_rows():
+    return Ground.objects.values_list('sport_type', 'location').annotate(count=Count('id')).order_by()
+
+
+def _fold_facets(rows):
+    # One grouped query; both facets are folded from the (sport, location) pairs
+    sport_types = Counter()
+    locations = Counter()
+    for sport_type, location, count in rows:
+        sport_types[sport_type] += count
+        locations[location] += count
+    return {
+        'sport_types': sorted(sport_types.items()),
+        'locations': sorted(locations.items()),
+        'total': sum(sport_types.values()),
+    }
+
+
+def _featured_query():
+    return Ground.objects.order_by('-rating', 'pk')[:FEATURED_COUNT]
+
+
+def ground_facets():
+    """Return sport types and locations as sorted (value, ground count) pairs."""
+    return _cached('facets', lambda: _fold_facets(_facet_rows()))
+
+
+def featured_grounds():
+    """Return the highest rated grounds for the home page."""
+    return _cached('featured', lambda: list(_featured_query()))
+
+
+async def aground_facets():
+    """Async version of ground_facets()."""
+    async def compute():
+        return _fold_facets([row async for row in _facet_rows()])
+    return await _acached('facets', compute)
+
+
+async def afeatured_grounds():
+    """Async version of featured_grounds()."""
+    async def compute():
+        return [ground async for ground in _featured_query()]
+    return await _acached('featured', compute)
+
+
+def invalidate():
+    """Retire cached facets and featured grounds once the transaction commits."""
+    versions.touch('grounds')
@@ -1,8 +1,15 @@
 from django import forms
-from .models import Ground, Slot, CustomUser, Booking, Payment, BOOKING_STATUSES
+from . import availability
+from .exports import EXPORT_FORMATS
+from .overlaps import clashing_slot
+from .payments import new_idempotency_key
+from .models import Ground, Slot, CustomUser, Booking, Payment, BOOKING_STATUSES, PAYMENT_STATUSES
+from .revenue import GROUP_BY_CHOICES
+from .schedules import WEEKDAY_CHOICES, Schedule, parse_price_rules, parse_time_ranges
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm
 from django.core.exceptions import ValidationError
+from django.core.validators import FileExtensionValidator
 from datetime import datetime, timedelta
 
 class GroundForm(forms.ModelForm):
@@ -30,6 +37,9 @@ class SlotForm(forms.ModelForm):
             'end_time': forms.TimeInput(attrs={'type': 'time'}),
         }
     
+    # Imports check overlaps for a whole batch of rows at once instead
+    check_overlaps = True
+    
     def clean(self):
         cleaned_data = super().clean()
         start_time = cleaned_data.get('start_time')
@@ -43,9 +53,56 @@ class SlotForm(forms.ModelForm):
         # Check if date is not in the past
         if date and date < datetime.now().date():
             raise ValidationError('Cannot create slots for past dates.')
+        
+        # Check that the slot does not overlap another slot of the ground
+        ground = cleaned_data.get('ground')
+        if self.check_overlaps and ground and date and start_time and end_time:
+            clash = clashing_slot(ground.pk, date, start_time, end_time, exclude_pk=self.instance.pk)
+            if clash:
+                raise ValidationError(
+                    f'Overlaps the existing slot {clash.start_time:%H:%M}-{clash.end_time:%H:%M} on this ground.'
+                )
             
         return cleaned_data
 
+class GroundImportForm(GroundForm):
+    """GroundForm for one row of an imported file; images are not imported."""
+    class Meta(GroundForm.Meta):
+        fields = ['name', 'location', 'sport_type', 'rating', 'description']
+
+class SlotImportForm(SlotForm):
+    """SlotForm for one row of an imported file.
+
+    The importer looks up the grounds of a whole batch in one query and passes
+    them in as ``grounds`` (keyed by id and by name), and checks the batch for
+    overlaps in one query, so validating a row makes no queries.
+    """
+    ground = forms.CharField()
+    
+    class Meta(SlotForm.Meta):
+        # The ground is set in clean_ground, which keeps the model from
+        # querying for it and for unique_ground_slot (an overlap anyway)
+        fields = ['date', 'start_time', 'end_time', 'price_per_slot', 'availability_status']
+    
+    check_overlaps = False
+    
+    def __init__(self, *args, grounds=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.grounds = grounds or {}
+    
+    def clean_ground(self):
+        value = self.cleaned_data['ground']
+        ground = self.grounds.get(value)
+        if ground is None:
+            raise ValidationError(f'Unknown ground "{value}".')
+        if ground is AMBIGUOUS_GROUND:
+            raise ValidationError(f'Several grounds are called "{value}"; use the ground id.')
+        self.instance.ground = ground
+        return ground
+
+# Marks a ground name shared by several grounds in SlotImportForm lookups
+AMBIGUOUS_GROUND = object()
+
 class CustomUserForm(forms.ModelForm):
     class Meta:
         model = CustomUser
@@ -85,7 +142,8 @@ class ExtendedUserCreationForm(UserCreationForm):
 class BookingForm(forms.ModelForm):
     class Meta:
         model = Booking
-        fields = ['slot', 'status']
+        # Bookings start as pending holds; payment confirms them
+        fields = ['slot']
         widgets = {
             'slot': forms.Select(attrs={'class': 'form-select'}),
         }
@@ -96,14 +154,23 @@ class BookingForm(forms.ModelForm):
         date = kwargs.pop('date', None)
         super().__init__(*args, **kwargs)
         
-        if ground_id and date:
-            self.fields['slot'].queryset = Slot.objects.filter(
-                ground_id=ground_id, 
-                date=date,
-                availability_status='Available'
-            )
+        slots = Slot.objects.select_related('ground').filter(availability_status='Available')
+        if ground_id:
+            slots = slots.filter(ground_id=ground_id)
+        if date:
+            slots = slots.filter(date=date)
+        self.fields['slot'].queryset = slots
+        if ground_id and date and not self.is_bound:
+            # Only the choices are rendered, so use the cached availability
+            self.fields['slot'].choices = [('', self.fields['slot'].empty_label)] + [
+                (slot.pk, str(slot)) for slot in availability.available_slots(ground_id, date)
+            ]
+        self.fields['slot'].error_messages['invalid_choice'] = 'This slot is no longer available. Please choose another slot.'
 
 class PaymentForm(forms.ModelForm):
+    # One per rendered form, so submitting it twice makes one payment intent
+    idempotency_key = forms.CharField(widget=forms.HiddenInput, max_length=64)
+    
     class Meta:
         model = Payment
         fields = ['payment_method', 'amount']
@@ -115,6 +182,7 @@ class PaymentForm(forms.ModelForm):
         # Set amount based on the booking slot price
         booking = kwargs.pop('booking', None)
         super().__init__(*args, **kwargs)
+        self.fields['idempotency_key'].initial = new_idempotency_key()
         
         if booking:
             self.fields['amount'].initial = booking.slot.price_per_slot
@@ -135,4 +203,154 @@ class BookingStatusUpdateForm(forms.ModelForm):
         fields = ['status']
         widgets = {
             'status': forms.Select(attrs={'class': 'form-select'}),
-        }
\ No newline at end of file
+        }
+
+class DateRangeForm(forms.Form):
+    start_date = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    end_date = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        start_date = cleaned_data.get('start_date')
+        end_date = cleaned_data.get('end_date')
+        
+        if start_date and end_date and start_date > end_date:
+            raise ValidationError('Start date must be on or before end date.')
+        
+        return cleaned_data
+
+class RevenueReportForm(DateRangeForm):
+    group_by = forms.ChoiceField(choices=GROUP_BY_CHOICES, required=False, initial='month')
+
+class BookingFilterForm(DateRangeForm):
+    status = forms.ChoiceField(choices=[('', 'All Statuses')] + BOOKING_STATUSES, required=False)
+    ground = forms.ModelChoiceField(queryset=Ground.objects.all(), required=False, empty_label='All Grounds')
+    payment_status = forms.ChoiceField(
+        choices=[('', 'All Payments'), ('None', 'No Payment')] + PAYMENT_STATUSES,
+        required=False
+    )
+    
+    def apply(self, bookings, prefix=''):
+        """Filter a queryset of bookings, or of rows related to them through prefix."""
+        filters = self.cleaned_data
+        
+        if filters['status']:
+            bookings = bookings.filter(**{f'{prefix}status': filters['status']})
+        if filters['ground']:
+            bookings = bookings.filter(**{f'{prefix}slot__ground': filters['ground']})
+        if filters['start_date']:
+            bookings = bookings.filter(**{f'{prefix}slot__date__gte': filters['start_date']})
+        if filters['end_date']:
+            bookings = bookings.filter(**{f'{prefix}slot__date__lte': filters['end_date']})
+        if filters['payment_status'] == 'None':
+            bookings = bookings.filter(**{f'{prefix}payment__isnull': True})
+        elif filters['payment_status']:
+            bookings = bookings.filter(**{f'{prefix}payment__payment_status': filters['payment_status']})
+        return bookings
+
+class BookingExportForm(BookingFilterForm):
+    format = forms.ChoiceField(choices=[(name, name) for name in EXPORT_FORMATS], required=False)
+
+class FreeWindowForm(DateRangeForm):
+    # Longest date range one search may cover
+    MAX_DAYS = 31
+
+    minutes = forms.IntegerField(min_value=15, max_value=24 * 60)
+    ground = forms.ModelMultipleChoiceField(queryset=Ground.objects.all(), required=False)
+    earliest = forms.TimeField(required=False)
+    latest = forms.TimeField(required=False)
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        start_date = cleaned_data.get('start_date')
+        end_date = cleaned_data.get('end_date')
+        earliest = cleaned_data.get('earliest')
+        latest = cleaned_data.get('latest')
+        
+        if start_date and end_date and (end_date - start_date).days >= self.MAX_DAYS:
+            raise ValidationError(f'Search at most {self.MAX_DAYS} days at a time.')
+        
+        if earliest and latest and earliest >= latest:
+            raise ValidationError('Earliest time must be before latest time.')
+        
+        return cleaned_data
+
+class ImportForm(forms.Form):
+    kind = forms.ChoiceField(choices=[('grounds', 'Grounds'), ('slots', 'Slots')], label='Import')
+    file = forms.FileField(
+        validators=[FileExtensionValidator(['csv', 'xlsx'])],
+        help_text='CSV or XLSX with a header row naming the columns.'
+    )
+    dry_run = forms.BooleanField(
+        required=False,
+        initial=True,
+        label='Dry run',
+        help_text='Validate every row and report errors without importing anything.'
+    )
+
+class SlotScheduleForm(forms.Form):
+    grounds = forms.ModelMultipleChoiceField(
+        queryset=Ground.objects.all(),
+        widget=forms.SelectMultiple(attrs={'size': 8})
+    )
+    start_date = forms.DateField(widget=forms.DateInput(attrs={'type': 'date'}))
+    end_date = forms.DateField(widget=forms.DateInput(attrs={'type': 'date'}))
+    weekdays = forms.MultipleChoiceField(
+        choices=WEEKDAY_CHOICES,
+        initial=[value for value, _ in WEEKDAY_CHOICES],
+        widget=forms.CheckboxSelectMultiple
+    )
+    time_ranges = forms.CharField(
+        initial='06:00-22:00',
+        help_text='Opening hours as HH:MM-HH:MM, comma separated, e.g. 06:00-10:00, 16:00-22:00'
+    )
+    slot_minutes = forms.IntegerField(min_value=15, max_value=720, initial=120, label='Slot length (minutes)')
+    price_per_slot = forms.DecimalField(max_digits=10, decimal_places=2, min_value=0)
+    price_rules = forms.CharField(
+        required=False,
+        widget=forms.Textarea(attrs={'rows': 3}),
+        help_text='Optional, one per line: [days] HH:MM-HH:MM = price, e.g. "18:00-22:00 = 1200" or "Sat,Sun 06:00-22:00 = 1500". The first matching rule wins.'
+    )
+    
+    MAX_DAYS = 366
+    
+    def clean_time_ranges(self):
+        try:
+            return parse_time_ranges(self.cleaned_data['time_ranges'])
+        except ValueError as e:
+            raise ValidationError(str(e))
+    
+    def clean_price_rules(self):
+        try:
+            return parse_price_rules(self.cleaned_data.get('price_rules') or '')
+        except ValueError as e:
+            raise ValidationError(str(e))
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        start_date = cleaned_data.get('start_date')
+        end_date = cleaned_data.get('end_date')
+        
+        if start_date and start_date < datetime.now().date():
+            raise ValidationError('Cannot create slots for past dates.')
+        
+        if start_date and end_date:
+            if start_date > end_date:
+                raise ValidationError('Start date must be on or before end date.')
+            if (end_date - start_date).days >= self.MAX_DAYS:
+                raise ValidationError(f'A schedule can cover at most {self.MAX_DAYS} days.')
+        
+        return cleaned_data
+    
+    def schedule(self):
+        data = self.cleaned_data
+        return Schedule(
+            grounds=list(data['grounds']),
+            start_date=data['start_date'],
+            end_date=data['end_date'],
+            weekdays={int(day) for day in data['weekdays']},
+            time_ranges=data['time_ranges'],
+            slot_minutes=data['slot_minutes'],
+            price_per_slot=data['price_per_slot'],
+            price_rules=data['price_rules']
+        )
\ No newline at end of file
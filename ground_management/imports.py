@@ -0,0 +1,245 @@
+"""
+Bulk import of grounds and slots from CSV or XLSX files.
+
+Files are read one row at a time (``csv`` over the file, openpyxl in
+read-only mode for XLSX), validated with ``GroundImportForm`` and
+``SlotImportForm`` (the rules of ``GroundForm`` and ``SlotForm``) and inserted
+with ``bulk_create``, one transaction per batch, so memory stays flat however
+long the file is. Invalid rows are reported by line number and skipped; the
+others are imported.
+
+A dry run does exactly the same work inside one transaction and rolls it back,
+so it also reports rows that clash with rows earlier in the file.
+"""
+
+import csv
+import io
+import os
+import zipfile
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Q
+
+from . import availability, bitmaps, counters, facets
+from .forms import AMBIGUOUS_GROUND, GroundImportForm, SlotImportForm
+from .models import Ground, Slot
+from .overlaps import check_slots
+
+IMPORT_BATCH_SIZE = 2000
+
+# Errors kept for the report; the rest are only counted
+MAX_REPORTED_ERRORS = 500
+
+COLUMNS = {
+    'grounds': (['name', 'location', 'sport_type'], ['rating', 'description']),
+    'slots': (['ground', 'date', 'start_time', 'end_time', 'price_per_slot'], ['availability_status']),
+}
+
+
+class ImportFileError(ValueError):
+    """The file as a whole cannot be imported (format, header)."""
+
+
+@dataclass
+class ImportResult:
+    kind: str
+    dry_run: bool = False
+    rows: int = 0
+    created: int = 0
+    error_count: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+
+# Reading
+def _header(row, kind):
+    names = [str(name or '').strip().lower().replace(' ', '_') for name in row]
+    required, optional = COLUMNS[kind]
+    missing = [name for name in required if name not in names]
+    if missing:
+        raise ImportFileError(f'Missing columns: {", ".join(missing)}.')
+    unknown = [name for name in names if name and name not in required + optional]
+    if unknown:
+        raise ImportFileError(f'Unknown columns: {", ".join(unknown)}.')
+    return names
+
+
+def _csv_rows(file):
+    # utf-8-sig drops the byte order mark spreadsheet programs write
+    reader = csv.reader(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        # Spreadsheets store every number as a float; 3.0 is ground 3
+        return int(value)
+    if isinstance(value, datetime) and value.time() == datetime.min.time():
+        return value.date()
+    return value
+
+
+def _xlsx_rows(file):
+    try:
+        import openpyxl
+    except ImportError as exc:
+        raise ImportFileError('Reading XLSX files needs the "openpyxl" package.') from exc
+    from openpyxl.utils.exceptions import InvalidFileException
+    try:
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile, KeyError) as exc:
+        raise ImportFileError(f'The file is not a valid XLSX workbook: {exc}')
+    try:
+        for line, row in enumerate(workbook.active.iter_rows(values_only=True), 1):
+            yield line, [_cell(value) for value in row]
+    finally:
+        workbook.close()
+
+
+def read_rows(file, name, kind):
+    """Yield (line number, row dict) for each non-blank row of a CSV or XLSX file.
+
+    file is a binary file object; name only decides the format.
+    """
+    extension = os.path.splitext(name)[1].lower()
+    if extension == '.csv':
+        rows = _csv_rows(file)
+    elif extension == '.xlsx':
+        rows = _xlsx_rows(file)
+    else:
+        raise ImportFileError('Upload a .csv or .xlsx file.')
+
+    try:
+        _, header = next(rows)
+    except StopIteration:
+        raise ImportFileError('The file is empty.')
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise ImportFileError(f'The file cannot be read: {exc}')
+    names = _header(header, kind)
+    try:
+        for line, row in rows:
+            if any(value not in ('', None) for value in row):
+                yield line, {name: value for name, value in zip(names, row) if name}
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise ImportFileError(f'The file cannot be read: {exc}')
+
+
+# Validation and insertion
+def _batches(rows, batch_size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _error_text(form):
+    return '; '.join(
+        ' '.join(messages) if name == '__all__' else f'{name}: {" ".join(messages)}'
+        for name, messages in form.errors.items()
+    )
+
+
+def _ground_lookup(values):
+    """Grounds referenced by id or by name, keyed by both, in one query."""
+    values = {str(value).strip() for value in values} - {''}
+    grounds = list(Ground.objects.filter(
+        Q(pk__in=[int(value) for value in values if value.isdigit()]) | Q(name__in=values)
+    ).only('pk', 'name').order_by())
+    lookup = {}
+    for ground in grounds:
+        if ground.name in values:
+            lookup[ground.name] = AMBIGUOUS_GROUND if ground.name in lookup else ground
+    # An id wins over a ground named like one
+    lookup.update({str(ground.pk): ground for ground in grounds if str(ground.pk) in values})
+    return lookup
+
+
+def _import_grounds(rows, result, batch_size):
+    for batch in _batches(rows, batch_size):
+        grounds = []
+        for line, row in batch:
+            result.rows += 1
+            form = GroundImportForm(row)
+            if form.is_valid():
+                grounds.append(form.save(commit=False))
+            else:
+                result.add_error(line, _error_text(form))
+        with transaction.atomic():
+            Ground.objects.bulk_create(grounds)
+            if grounds:
+                # bulk_create sends no signals
+                facets.invalidate()
+                counters.add('grounds', len(grounds))
+        result.created += len(grounds)
+
+
+def _import_slots(rows, result, batch_size):
+    for batch in _batches(rows, batch_size):
+        grounds = _ground_lookup(row.get('ground', '') for _, row in batch)
+        errors = []
+        valid = []
+        for line, row in batch:
+            result.rows += 1
+            if not row.get('availability_status'):
+                row['availability_status'] = 'Available'
+            form = SlotImportForm(row, grounds=grounds)
+            if form.is_valid():
+                valid.append((line, form.save(commit=False)))
+            else:
+                errors.append((line, _error_text(form)))
+
+        # check_slots needs slots in ground, date and start order; the stored
+        # slots it compares against include the batches already inserted
+        valid.sort(key=lambda item: (item[1].ground_id, item[1].date, item[1].start_time))
+        with transaction.atomic():
+            accepted = []
+            checked = check_slots([slot for _, slot in valid], batch_size)
+            for (line, _), (slot, clash) in zip(valid, checked):
+                if clash is None:
+                    accepted.append(slot)
+                else:
+                    errors.append((line, f'Overlaps the slot {clash[0]:%H:%M}-{clash[1]:%H:%M} on this ground.'))
+            Slot.objects.bulk_create(accepted)
+            # bulk_create sends no signals, so update derived availability explicitly
+            bitmaps.refresh_days((slot.ground_id, slot.date) for slot in accepted)
+            for ground_id in {slot.ground_id for slot in accepted}:
+                availability.invalidate_ground(ground_id)
+            counters.add('slots', len(accepted))
+        result.created += len(accepted)
+        for line, message in sorted(errors):
+            result.add_error(line, message)
+
+
+IMPORTERS = {
+    'grounds': _import_grounds,
+    'slots': _import_slots,
+}
+
+
+def import_file(kind, file, name, dry_run=False, batch_size=IMPORT_BATCH_SIZE):
+    """Import 'grounds' or 'slots' from a CSV or XLSX file and return an ImportResult.
+
+    Each batch of rows is committed on its own, so an error part way through
+    a real import leaves the earlier batches in place. Raises ImportFileError
+    when the file cannot be read or its header is wrong.
+    """
+    result = ImportResult(kind=kind, dry_run=dry_run)
+    rows = read_rows(file, name, kind)
+    with transaction.atomic() if dry_run else nullcontext():
+        IMPORTERS[kind](rows, result, batch_size)
+        if dry_run:
+            transaction.set_rollback(True)
+    return result
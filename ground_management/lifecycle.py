@@ -0,0 +1,87 @@
+"""
+Lifecycle sweeper for past slots and bookings.
+
+Once a day has passed, its confirmed bookings become Completed, its pending
+(never paid) bookings Cancelled and its still Available slots Closed. Pages
+can then tell upcoming bookings from past ones by status alone
+(``ACTIVE_BOOKING_STATUSES``) instead of joining to the slot date.
+
+``sweep`` does this with one set-based UPDATE per table for each chunk of
+days, oldest first, each chunk in its own transaction. It starts the day
+after the last recorded ``LifecycleSweep`` and records what it changed.
+Bulk updates skip model signals, so caches are invalidated here. Each
+chunk also writes the booking analytics rollup for its days.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from . import analytics, availability, versions
+from .models import ACTIVE_BOOKING_STATUSES, AvailabilityBitmap, Booking, LifecycleSweep, Slot
+
+SWEEP_CHUNK_DAYS = 7
+
+
+def _first_unswept_day(through):
+    last = LifecycleSweep.objects.values_list('through_date', flat=True).first()
+    if last:
+        return last + timedelta(days=1)
+    # First run: the earliest day with anything left to sweep
+    days = [
+        Slot.objects.filter(availability_status='Available', date__lte=through).aggregate(day=Min('date'))['day'],
+        Booking.objects.filter(
+            status__in=ACTIVE_BOOKING_STATUSES, slot__date__lte=through
+        ).aggregate(day=Min('slot__date'))['day'],
+    ]
+    days = [day for day in days if day]
+    return min(days) if days else None
+
+
+def _sweep_days(first, last):
+    bookings = Booking.objects.filter(slot__date__gte=first, slot__date__lte=last)
+    user_ids = set(bookings.filter(status__in=ACTIVE_BOOKING_STATUSES).values_list('user_id', flat=True))
+    completed = bookings.filter(status='Confirmed').update(status='Completed')
+    cancelled = bookings.filter(status='Pending').update(status='Cancelled')
+
+    slots = Slot.objects.filter(date__gte=first, date__lte=last, availability_status='Available')
+    ground_ids = set(slots.order_by().values_list('ground_id', flat=True).distinct())
+    closed = slots.update(availability_status='Closed')
+    # Past days cannot be booked, so their free-window bitmaps go
+    AvailabilityBitmap.objects.filter(date__gte=first, date__lte=last).delete()
+    # Their bookings are final now, so analytics can read them from the rollup
+    analytics.store_booking_stats(first, last)
+
+    for ground_id in ground_ids:
+        availability.invalidate_ground(ground_id)
+    for user_id in user_ids:
+        versions.touch('bookings', user_id)
+    return completed, cancelled, closed
+
+
+def sweep(today=None, since=None, chunk_days=SWEEP_CHUNK_DAYS):
+    """Finish the bookings and slots of every unswept day before today.
+
+    since overrides the first day to sweep. Returns the LifecycleSweep
+    recorded, or None if every past day was already swept.
+    """
+    today = today or timezone.localdate()
+    through = today - timedelta(days=1)
+    first = since or _first_unswept_day(through) or through
+    if first > through:
+        return None
+
+    record = LifecycleSweep(from_date=first, through_date=through)
+    day = first
+    while day <= through:
+        last = min(day + timedelta(days=chunk_days - 1), through)
+        with transaction.atomic():
+            completed, cancelled, closed = _sweep_days(day, last)
+        record.bookings_completed += completed
+        record.bookings_cancelled += cancelled
+        record.slots_closed += closed
+        day = last + timedelta(days=1)
+    record.save()
+    return record
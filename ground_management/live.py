@@ -0,0 +1,272 @@
+"""
+Live slot availability.
+
+Every write path that changes a slot's status (booking, cancellation, admin
+slot edits) publishes a delta on the channel of the slot's (ground, date)
+once its transaction commits. The SSE stream in ``async_views`` subscribes to
+one channel and forwards the deltas to the browser.
+
+Deltas are state, not transitions (``{"slot": 7, "status": "Booked", ...}``),
+so applying one twice is harmless and a subscriber that falls behind can
+simply be sent a fresh snapshot.
+
+The broker is the class named by ``LIVE_BROKER``. ``InMemoryBroker`` fans out
+within one process, which is enough for a single ASGI worker. With several
+workers use ``RedisBroker`` (needs the ``redis`` package and
+``LIVE_REDIS_URL``) so a booking handled by one worker reaches subscribers
+connected to another.
+"""
+
+import asyncio
+import json
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.functional import SimpleLazyObject
+from django.utils.module_loading import import_string
+
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_SECONDS = 15
+
+# Milliseconds a browser waits before reconnecting a dropped stream
+RECONNECT_MS = 3000
+
+# Reconnect delay when the server cannot hold the stream open (WSGI)
+POLL_RECONNECT_MS = 10000
+
+# Queued deltas per subscriber before it is told to resynchronise instead
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Marker put on an overflowing subscriber's queue
+RESYNC = object()
+
+# Seconds RedisBroker waits before reconnecting a dropped listener
+REDIS_RETRY_SECONDS = 1
+
+
+def channel_name(ground_id, day):
+    return f'slots:{ground_id}:{day.isoformat()}'
+
+
+def slot_event(slot, status=None):
+    """The delta describing slot's current state (or status, e.g. 'Removed')."""
+    return {
+        'slot': slot.pk,
+        'status': status or slot.availability_status,
+        'start_time': slot.start_time.isoformat(),
+        'end_time': slot.end_time.isoformat(),
+        'price': str(slot.price_per_slot),
+    }
+
+
+def sse(event, data):
+    """Format one Server-Sent Events message."""
+    return f'event: {event}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'
+
+
+def retry(milliseconds):
+    return f'retry: {milliseconds}\n\n'
+
+
+def snapshot(slots):
+    return sse('snapshot', [slot_event(slot) for slot in slots])
+
+
+class Subscription:
+    """One listener's queue, bound to the event loop that created it."""
+
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def deliver(self, event):
+        """Queue an event; must run on the subscription's loop."""
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Drop the backlog; the reader sends a fresh snapshot instead
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+    async def get(self, timeout=None):
+        """Return the next event, RESYNC, or None after timeout seconds."""
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if event is RESYNC:
+            self.overflowed = False
+        return event
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class Broker(ABC):
+    """Fan-out of channel events to subscriptions; see InMemoryBroker."""
+
+    @abstractmethod
+    def publish(self, channel, event):
+        """Send event to every subscriber of channel. Safe from any thread."""
+
+    @abstractmethod
+    def subscribe(self, channel):
+        """Return a Subscription; call from a coroutine and close() it when done."""
+
+    @abstractmethod
+    def unsubscribe(self, subscription):
+        """Stop delivering to subscription."""
+
+
+class InMemoryBroker(Broker):
+    """Broker for subscribers in this process.
+
+    Subscribers are grouped by event loop, so one publish costs one
+    thread-safe wakeup per loop no matter how many subscribers listen.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._channels = defaultdict(lambda: defaultdict(set))
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._channels[channel][subscription.loop].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            loops = self._channels.get(subscription.channel)
+            if not loops:
+                return
+            listeners = loops.get(subscription.loop)
+            if listeners is not None:
+                listeners.discard(subscription)
+                if not listeners:
+                    del loops[subscription.loop]
+            if not loops:
+                del self._channels[subscription.channel]
+
+    def publish(self, channel, event):
+        self.publish_local(channel, event)
+
+    def publish_local(self, channel, event):
+        with self._lock:
+            targets = [
+                (loop, list(listeners))
+                for loop, listeners in self._channels.get(channel, {}).items()
+            ]
+        for loop, listeners in targets:
+            try:
+                loop.call_soon_threadsafe(_deliver_all, listeners, event)
+            except RuntimeError:
+                # The loop has shut down; its subscriptions go with it
+                pass
+
+    def subscriber_count(self, channel=None):
+        with self._lock:
+            channels = [self._channels.get(channel, {})] if channel else self._channels.values()
+            return sum(len(listeners) for loops in channels for listeners in loops.values())
+
+
+def _deliver_all(listeners, event):
+    for subscription in listeners:
+        subscription.deliver(event)
+
+
+class RedisBroker(InMemoryBroker):
+    """Broker that relays events between processes through Redis pub/sub.
+
+    Each process keeps its own subscribers in memory and runs one Redis
+    listener per event loop, started by the first subscription.
+    """
+
+    PREFIX = 'live:'
+
+    def __init__(self):
+        super().__init__()
+        try:
+            import redis
+        except ImportError as exc:
+            from django.core.exceptions import ImproperlyConfigured
+            raise ImproperlyConfigured('RedisBroker needs the "redis" package.') from exc
+        self._url = getattr(settings, 'LIVE_REDIS_URL', 'redis://localhost:6379/0')
+        self._redis = redis.Redis.from_url(self._url)
+        self._listeners = {}
+
+    def publish(self, channel, event):
+        self._redis.publish(self.PREFIX + channel, json.dumps(event))
+
+    def subscribe(self, channel):
+        subscription = super().subscribe(channel)
+        with self._lock:
+            if subscription.loop not in self._listeners:
+                self._listeners[subscription.loop] = subscription.loop.create_task(self._listen())
+        return subscription
+
+    async def _listen(self):
+        import redis.asyncio
+        from redis.exceptions import ConnectionError
+
+        loop = asyncio.get_running_loop()
+        reconnecting = False
+        while True:
+            try:
+                client = redis.asyncio.Redis.from_url(self._url)
+                pubsub = client.pubsub()
+                await pubsub.psubscribe(self.PREFIX + '*')
+                if reconnecting:
+                    # Deltas may have been missed while disconnected
+                    self._resync(loop)
+                async for message in pubsub.listen():
+                    if message['type'] != 'pmessage':
+                        continue
+                    channel = message['channel'].decode()[len(self.PREFIX):]
+                    self.publish_local(channel, json.loads(message['data']))
+            except ConnectionError:
+                reconnecting = True
+                await asyncio.sleep(REDIS_RETRY_SECONDS)
+
+    def _resync(self, loop):
+        with self._lock:
+            listeners = [
+                subscription
+                for loops in self._channels.values()
+                for subscription in loops.get(loop, ())
+            ]
+        for subscription in listeners:
+            subscription.deliver(RESYNC)
+
+
+def _load_broker():
+    return import_string(getattr(settings, 'LIVE_BROKER', 'ground_management.live.InMemoryBroker'))()
+
+
+broker = SimpleLazyObject(_load_broker)
+
+
+def subscribe(ground_id, day):
+    return broker.subscribe(channel_name(ground_id, day))
+
+
+def publish_slot(slot, status=None, ground_id=None, day=None):
+    """Publish slot's state once the current transaction commits.
+
+    ground_id and day default to the slot's own; pass the old ones to tell a
+    channel that a moved slot has left it. A broker that fails (e.g. Redis is
+    down) is logged and does not fail the write that already committed.
+    """
+    channel = channel_name(ground_id or slot.ground_id, day or slot.date)
+    event = slot_event(slot, status)
+    transaction.on_commit(lambda: broker.publish(channel, event), robust=True)
@@ -0,0 +1,33 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from ground_management.archive import ARCHIVE_BATCH_SIZE, archivable, archive_cutoff, archive_history
+
+
+class Command(BaseCommand):
+    help = (
+        'Move slots older than ARCHIVE_RETENTION_DAYS, with their bookings and payments, '
+        'into the archive tables'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cutoff', type=date.fromisoformat,
+            help='Archive slots dated before this day (YYYY-MM-DD) instead of the retention cutoff'
+        )
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE, help='Slots moved per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Count the rows without moving them')
+
+    def handle(self, *args, **options):
+        cutoff = options['cutoff'] or archive_cutoff()
+        if options['dry_run']:
+            result = archivable(cutoff)
+            verb = 'would be archived'
+        else:
+            result = archive_history(cutoff, options['batch_size'])
+            verb = 'archived'
+        self.stdout.write(self.style.SUCCESS(
+            f'Before {cutoff}: {result.slots} slots, {result.bookings} bookings '
+            f'and {result.payments} payments {verb}.'
+        ))
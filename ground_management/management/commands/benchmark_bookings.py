@@ -0,0 +1,102 @@
+import threading
+import time
+from datetime import time as dtime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from ground_management import counters
+from ground_management.bookings import SlotUnavailable, claim_slot
+from ground_management.models import Booking, Ground, Slot
+from ground_management.schedules import Schedule, create_schedule_slots
+
+USERNAME_PREFIX = 'benchmark-booker-'
+
+
+def _worker(attempts, start, won):
+    """Make a share of the claims on one connection, as a server thread would."""
+    start.wait()
+    try:
+        for user, slot_id in attempts:
+            try:
+                claim_slot(user, slot_id)
+                won.append(slot_id)
+            except SlotUnavailable:
+                pass
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure booking throughput on the configured database: many threads '
+        'claim the slots of a throwaway ground at once, several per slot.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7, help='Days of 30-minute slots, 06:00-22:00 (32 a day)')
+        parser.add_argument('--attempts-per-slot', type=int, default=3, help='Competing claims per slot')
+        parser.add_argument('--workers', type=int, default=16, help='Threads claiming at once')
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark ground and users afterwards')
+
+    def handle(self, *args, **options):
+        if min(options['days'], options['attempts_per_slot'], options['workers']) < 1:
+            raise CommandError('--days, --attempts-per-slot and --workers must be at least 1.')
+
+        ground = Ground.objects.create(name='Benchmark Arena', location='Benchmark', sport_type='Football')
+        start_date = timezone.localdate() + timedelta(days=1)
+        create_schedule_slots(Schedule(
+            grounds=[ground],
+            start_date=start_date,
+            end_date=start_date + timedelta(days=options['days'] - 1),
+            weekdays=set(range(7)),
+            time_ranges=[(dtime(6), dtime(22))],
+            slot_minutes=30,
+            price_per_slot=Decimal('500'),
+        ))
+        slot_ids = list(Slot.objects.filter(ground=ground).values_list('pk', flat=True))
+
+        # Unhashed passwords: creating users is not what is being measured
+        User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+        users = User.objects.bulk_create(
+            User(username=f'{USERNAME_PREFIX}{i}') for i in range(len(slot_ids) * options['attempts_per_slot'])
+        )
+        counters.add('players', len(users))
+        attempts = [(user, slot_ids[i % len(slot_ids)]) for i, user in enumerate(users)]
+
+        try:
+            start = threading.Event()
+            won = []
+            workers = [
+                threading.Thread(target=_worker, args=(attempts[i::options['workers']], start, won))
+                for i in range(options['workers'])
+            ]
+            for worker in workers:
+                worker.start()
+            began = time.perf_counter()
+            start.set()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - began
+            won = len(won)
+
+            self.stdout.write(
+                f'{connection.vendor}: {len(attempts)} attempts on {len(slot_ids)} slots, '
+                f'{options["workers"]} threads, {elapsed:.2f} s'
+            )
+            self.stdout.write(
+                f'{len(attempts) / elapsed:.0f} attempts/s, {won / elapsed:.0f} bookings/s'
+            )
+            if won == len(slot_ids) == Booking.objects.filter(slot__ground=ground).count():
+                self.stdout.write(self.style.SUCCESS('Every slot was booked exactly once.'))
+            else:
+                self.stdout.write(self.style.ERROR(f'{won} claims won for {len(slot_ids)} slots.'))
+        finally:
+            if options['keep']:
+                self.stdout.write(f'Kept ground {ground.pk} and {len(users)} {USERNAME_PREFIX}* users.')
+            else:
+                ground.delete()
+                User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
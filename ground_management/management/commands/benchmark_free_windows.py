@@ -0,0 +1,91 @@
+import time
+from datetime import date, datetime, time as dtime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+from ground_management.bitmaps import FreeWindow, free_windows
+from ground_management.models import Ground, Slot
+
+
+def orm_free_windows(minutes, start_date, end_date, grounds=None, earliest=None, latest=None):
+    """The plain ORM approach: load every available slot and merge adjacent ones."""
+    earliest = earliest or dtime(0)
+    latest = latest or dtime(23, 59)
+    slots = Slot.objects.filter(
+        date__gte=start_date,
+        date__lte=end_date,
+        availability_status='Available',
+        end_time__gt=earliest,
+        start_time__lt=latest,
+    )
+    if grounds is not None:
+        slots = slots.filter(ground__in=grounds)
+
+    def close(run):
+        ground_id, day, start, end = run
+        start, end = max(start, earliest), min(end, latest)
+        length = datetime.combine(day, end) - datetime.combine(day, start)
+        if length >= timedelta(minutes=minutes):
+            windows.append(FreeWindow(ground_id, day, start, end))
+
+    windows = []
+    run = None
+    for slot in slots.order_by('date', 'ground_id', 'start_time'):
+        if run and run[:2] == (slot.ground_id, slot.date) and slot.start_time <= run[3]:
+            run = run[:3] + (max(run[3], slot.end_time),)
+            continue
+        if run:
+            close(run)
+        run = (slot.ground_id, slot.date, slot.start_time, slot.end_time)
+    if run:
+        close(run)
+    return windows
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the free-window search on availability bitmaps with loading '
+        'and merging slot rows through the ORM.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--minutes', type=int, default=120, help='Minimum window length')
+        parser.add_argument('--start-date', type=date.fromisoformat, help='First day (default: first slot date)')
+        parser.add_argument('--days', type=int, default=7, help='Days to search')
+        parser.add_argument('--grounds', type=int, help='Search only the first N grounds (default: all)')
+        parser.add_argument('--earliest', type=dtime.fromisoformat, default=dtime(6), help='Earliest time of day')
+        parser.add_argument('--latest', type=dtime.fromisoformat, default=dtime(22), help='Latest time of day')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per approach; the best is reported')
+
+    def handle(self, *args, **options):
+        start_date = options['start_date'] or Slot.objects.order_by('date').values_list('date', flat=True).first()
+        if start_date is None:
+            raise CommandError('No slots; run generate_data first.')
+        end_date = start_date + timedelta(days=options['days'] - 1)
+        grounds = None
+        if options['grounds']:
+            grounds = list(Ground.objects.order_by('pk').values_list('pk', flat=True)[:options['grounds']])
+        arguments = (options['minutes'], start_date, end_date, grounds, options['earliest'], options['latest'])
+
+        results = {}
+        for name, search in [('orm', orm_free_windows), ('bitmap', free_windows)]:
+            best = None
+            for _ in range(options['repeat']):
+                reset_queries()
+                with CaptureQueriesContext(connection) as queries:
+                    began = time.perf_counter()
+                    windows = search(*arguments)
+                    elapsed = time.perf_counter() - began
+                best = elapsed if best is None else min(best, elapsed)
+            results[name] = windows
+            self.stdout.write(
+                f'{name:<8}{best * 1000:>10.1f} ms{len(windows):>10} windows{len(queries):>5} queries'
+            )
+
+        if results['orm'] == results['bitmap']:
+            self.stdout.write(self.style.SUCCESS('Both approaches found the same windows.'))
+        else:
+            # Slots not on 15-minute boundaries only count whole 15-minute blocks in the bitmaps
+            self.stdout.write(self.style.WARNING('The approaches disagree; are slot times on 15-minute boundaries?'))
@@ -0,0 +1,192 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from multiprocessing import Pool
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from ground_management.models import Ground
+
+HOST = '127.0.0.1'
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def _read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    headers = {}
+    for line in head.split(b'\r\n')[1:]:
+        if b':' in line:
+            name, value = line.split(b':', 1)
+            headers[name.strip().lower()] = value.strip()
+    if headers.get(b'transfer-encoding') == b'chunked':
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get(b'content-length', 0)))
+    return status, headers.get(b'connection') == b'close'
+
+
+async def _connection(port, paths, offset, deadline, latencies, errors):
+    reader = writer = None
+    i = offset
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(HOST, port)
+            began = time.perf_counter()
+            writer.write(f'GET {path} HTTP/1.1\r\nHost: {HOST}:{port}\r\n\r\n'.encode())
+            status, closed = await _read_response(reader)
+            latencies.append(time.perf_counter() - began)
+            if status >= 400:
+                errors.append(status)
+            if closed:
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError, ValueError) as exc:
+            errors.append(type(exc).__name__)
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.01)
+    if writer is not None:
+        writer.close()
+
+
+def _run_client(args):
+    """Drive one share of the connections from a separate process."""
+    port, paths, connections, duration, offset = args
+    latencies, errors = [], []
+
+    async def main():
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(
+            _connection(port, paths, offset + i, deadline, latencies, errors)
+            for i in range(connections)
+        ))
+
+    asyncio.run(main())
+    return latencies, errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the WSGI (gunicorn) and ASGI (uvicorn) serving paths against '
+        'the current database: requests per second and latency percentiles for '
+        'the public read endpoints under many concurrent keep-alive connections.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=200, help='Concurrent client connections')
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds of load per server')
+        parser.add_argument('--warmup', type=float, default=2.0, help='Seconds of unmeasured load first')
+        parser.add_argument('--workers', type=int, default=4, help='Server worker processes')
+        parser.add_argument('--threads', type=int, default=8, help='Threads per gunicorn worker')
+        parser.add_argument('--client-processes', type=int, default=4, help='Processes generating load')
+        parser.add_argument('--servers', default='wsgi,asgi', help='Comma-separated: wsgi, asgi')
+        parser.add_argument('--port', type=int, default=8800, help='First port to listen on')
+        parser.add_argument('--path', action='append', dest='paths', help='Path to request (repeatable; default: the async read paths)')
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or self.default_paths()
+
+        servers = {
+            'wsgi': [
+                sys.executable, '-m', 'gunicorn', 'sports_ground_management.wsgi:application',
+                '--workers', str(options['workers']), '--threads', str(options['threads']),
+                '--log-level', 'warning',
+            ],
+            'asgi': [
+                sys.executable, '-m', 'uvicorn', 'sports_ground_management.asgi:application',
+                '--workers', str(options['workers']), '--no-access-log', '--log-level', 'warning',
+            ],
+        }
+
+        results = []
+        for offset, name in enumerate(options['servers'].split(',')):
+            name = name.strip()
+            if name not in servers:
+                raise CommandError(f'Unknown server "{name}".')
+            port = options['port'] + offset
+            command = servers[name] + (
+                ['--bind', f'{HOST}:{port}'] if name == 'wsgi' else ['--host', HOST, '--port', str(port)]
+            )
+            self.stdout.write(f'Starting {name}: {" ".join(command[2:])}')
+            process = subprocess.Popen(command, env=os.environ.copy())
+            try:
+                self.wait_for_port(port, process)
+                self.load(port, paths, options, options['warmup'])
+                latencies, errors = self.load(port, paths, options, options['duration'])
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+            results.append((name, latencies, errors))
+
+        self.report(results, paths, options)
+
+    def default_paths(self):
+        ground = Ground.objects.order_by('pk').first()
+        if ground is None:
+            raise CommandError('No grounds; run generate_data first.')
+        return [
+            reverse('home'),
+            reverse('ground_list'),
+            reverse('ground_detail', args=[ground.id]),
+            reverse('api_ground_slots', args=[ground.id]),
+        ]
+
+    def wait_for_port(self, port, process, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f'Server exited with status {process.returncode}.')
+            try:
+                socket.create_connection((HOST, port), timeout=0.5).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f'Server did not start listening on port {port}.')
+
+    def load(self, port, paths, options, duration):
+        processes = max(1, min(options['client_processes'], options['concurrency']))
+        shares = [
+            options['concurrency'] // processes + (1 if i < options['concurrency'] % processes else 0)
+            for i in range(processes)
+        ]
+        with Pool(processes) as pool:
+            parts = pool.map(_run_client, [
+                (port, paths, share, duration, i * 7) for i, share in enumerate(shares)
+            ])
+        latencies = [value for part, _ in parts for value in part]
+        errors = [error for _, part in parts for error in part]
+        return latencies, errors
+
+    def report(self, results, paths, options):
+        self.stdout.write('')
+        self.stdout.write(
+            f'{options["concurrency"]} connections, {options["duration"]:.0f}s per server, '
+            f'{options["workers"]} workers; paths: {", ".join(urlsplit(path).path for path in paths)}'
+        )
+        self.stdout.write(f'{"server":<8}{"requests":>10}{"req/s":>10}{"p50 ms":>10}{"p99 ms":>10}{"errors":>8}')
+        for name, latencies, errors in results:
+            self.stdout.write(
+                f'{name:<8}{len(latencies):>10}{len(latencies) / options["duration"]:>10.0f}'
+                f'{percentile(latencies, 0.50) * 1000:>10.1f}{percentile(latencies, 0.99) * 1000:>10.1f}'
+                f'{len(errors):>8}'
+            )
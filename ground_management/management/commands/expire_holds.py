@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from ground_management.bookings import HOLD_EXPIRY_BATCH_SIZE, expire_holds
+
+
+class Command(BaseCommand):
+    help = 'Cancel unpaid booking holds that have expired and release their slots'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=HOLD_EXPIRY_BATCH_SIZE, help='Holds released per transaction')
+        parser.add_argument(
+            '--every', type=float, metavar='SECONDS',
+            help='Keep running and check again every SECONDS (e.g. 5) instead of once'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            expired = expire_holds(batch_size=options['batch_size'])
+            if expired or not options['every']:
+                self.stdout.write(self.style.SUCCESS(f'{expired} expired holds released.'))
+            if not options['every']:
+                return
+            close_old_connections()
+            time.sleep(options['every'])
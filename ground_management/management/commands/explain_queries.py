@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from ground_management.models import (
+    ACTIVE_BOOKING_STATUSES, FINISHED_BOOKING_STATUSES, ArchivedBooking, AvailabilityBitmap, Booking, Counter,
+    DailyRevenue, Ground, Slot
+)
+
+
+class Command(BaseCommand):
+    help = "Print EXPLAIN plans for the main queries behind each view"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--analyze',
+            action='store_true',
+            help='Run EXPLAIN ANALYZE (PostgreSQL only; executes the queries)',
+        )
+
+    def handle(self, *args, **options):
+        ground = Ground.objects.order_by('pk').first()
+        user = User.objects.filter(bookings__isnull=False).order_by('pk').first() or User.objects.order_by('pk').first()
+        if ground is None or user is None:
+            self.stderr.write('Need at least one ground and one user to build sample queries.')
+            return
+
+        explain_options = {}
+        if options['analyze']:
+            if connection.vendor == 'postgresql':
+                explain_options = {'analyze': True, 'buffers': True}
+            else:
+                self.stderr.write(f'--analyze is not supported on {connection.vendor}; showing plain plans.')
+
+        for view_name, label, queryset in self.sample_queries(ground, user):
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{view_name}: {label}'))
+            self.stdout.write(queryset.explain(**explain_options))
+            self.stdout.write('')
+
+    def sample_queries(self, ground, user):
+        # Kept in step with the views; pages fetch one row more than they show
+        today = timezone.localdate()
+        month_ago = today - timedelta(days=30)
+        return [
+            ('ground_detail', 'available slots for a ground and date (on a cache miss)', Slot.objects.select_related(
+                'ground'
+            ).filter(ground_id=ground.id, date=today, availability_status='Available').order_by('start_time')),
+            ('user_dashboard', 'upcoming bookings', Booking.objects.select_related('slot__ground').filter(
+                user=user, status__in=ACTIVE_BOOKING_STATUSES
+            ).order_by('slot__date', 'slot__start_time')[:3]),
+            ('user_bookings', 'past bookings', Booking.objects.select_related('slot__ground').filter(
+                user=user, status__in=FINISHED_BOOKING_STATUSES
+            )),
+            ('user_bookings', 'archived bookings', ArchivedBooking.objects.select_related('slot__ground').filter(
+                user=user
+            )),
+            ('admin_dashboard', 'counters', Counter.objects.filter(
+                name__in=['grounds', 'slots', 'bookings', 'players', 'revenue']
+            )),
+            ('admin_dashboard', 'recent bookings', Booking.objects.select_related(
+                'user', 'slot__ground', 'payment'
+            ).order_by('-booking_date')[:5]),
+            ('admin_booking_list', 'first keyset page', Booking.objects.select_related(
+                'user', 'slot__ground', 'payment'
+            ).order_by('-booking_date', '-id')[:51]),
+            ('admin_slot_list', 'first keyset page for a ground', Slot.objects.select_related('ground').filter(
+                ground_id=ground.id
+            ).order_by('date', 'start_time', 'id')[:101]),
+            ('revenue_report', 'rollup revenue by ground', Ground.objects.annotate(
+                total_revenue=Sum('daily_revenue__amount', filter=Q(daily_revenue__date__gte=month_ago)),
+            ).filter(total_revenue__gt=0).order_by('-total_revenue', 'name')),
+            ('analytics_report', 'rollup revenue by day', DailyRevenue.objects.filter(
+                date__gte=month_ago, date__lte=today
+            ).values('date').annotate(amount=Sum('amount')).order_by()),
+            ('occupancy_report', 'slot counts by ground in a date window', Slot.objects.filter(
+                date__gte=month_ago, date__lte=today
+            ).values('ground_id').annotate(
+                total_slots=Count('id'), booked_slots=Count('id', filter=Q(availability_status='Booked'))
+            ).order_by()),
+            ('api_free_windows', 'bitmaps for a week', AvailabilityBitmap.objects.filter(
+                date__gte=today, date__lte=today + timedelta(days=6)
+            ).order_by('date', 'ground_id').values_list('ground_id', 'date', 'free')),
+            ('expire_holds', 'lapsed holds', Booking.objects.filter(
+                status='Pending', expires_at__lte=timezone.now()
+            ).order_by('expires_at').values_list('id', 'slot_id', 'user_id')[:1000]),
+        ]
@@ -0,0 +1,44 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ground_management.exports import DATASETS, EXPORT_CHUNK_SIZE, EXPORT_FORMATS, stream_export
+from ground_management.forms import BookingFilterForm
+from ground_management.models import BOOKING_STATUSES
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream bookings or payments, joined with their user, slot and ground, as CSV or '
+        'JSON Lines. Rows are read in chunks, so memory stays flat however many there are.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=list(DATASETS))
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='csv', dest='export_format')
+        parser.add_argument('--output', help='File to write (default: standard output)')
+        parser.add_argument('--status', choices=[value for value, _ in BOOKING_STATUSES], help='Booking status')
+        parser.add_argument('--ground', type=int, help='Ground id')
+        parser.add_argument('--start-date', type=date.fromisoformat, help='First slot date (YYYY-MM-DD)')
+        parser.add_argument('--end-date', type=date.fromisoformat, help='Last slot date (YYYY-MM-DD)')
+        parser.add_argument('--payment-status', help='Payment status, or None for bookings without one')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE, help='Rows per database fetch')
+
+    def handle(self, *args, **options):
+        form = BookingFilterForm({
+            name: options[name]
+            for name in ['status', 'ground', 'start_date', 'end_date', 'payment_status']
+            if options[name] is not None
+        })
+        if not form.is_valid():
+            raise CommandError(' '.join(
+                f'{name}: {" ".join(messages)}' for name, messages in form.errors.items()
+            ))
+
+        chunks = stream_export(options['dataset'], options['export_format'], form, options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                output.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from ground_management.models import Slot
+from ground_management.overlaps import find_overlaps
+
+
+class Command(BaseCommand):
+    help = (
+        'List stored slots that overlap another slot of the same ground and day. '
+        'Resolve them before migrating a PostgreSQL database to the slot overlap constraint.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=50, help='Overlaps to list (the rest are only counted)')
+
+    def handle(self, *args, **options):
+        rows = Slot.objects.order_by('ground_id', 'date', 'start_time').values_list(
+            'ground_id', 'date', 'start_time', 'end_time', 'id'
+        ).iterator(chunk_size=5000)
+        count = 0
+        for earlier, later in find_overlaps(rows):
+            count += 1
+            if count <= options['limit']:
+                self.stdout.write(
+                    f'Ground {earlier[0]} on {earlier[1]}: slot {earlier[4]} '
+                    f'({earlier[2]:%H:%M}-{earlier[3]:%H:%M}) overlaps slot {later[4]} '
+                    f'({later[2]:%H:%M}-{later[3]:%H:%M})'
+                )
+        if count:
+            self.stdout.write(self.style.WARNING(f'{count} overlapping slot pairs found.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('No overlapping slots.'))
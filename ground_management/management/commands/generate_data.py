@@ -0,0 +1,284 @@
+import random
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from ground_management.models import (
+    Booking, CustomUser, Ground, Payment, Slot, PAYMENT_METHODS, SPORT_TYPES
+)
+from ground_management import facets
+from ground_management.bitmaps import rebuild_bitmaps
+from ground_management.counters import reconcile
+from ground_management.revenue import rebuild_daily_revenue
+
+DEMO_GROUNDS = [
+    {
+        'name': 'Green Field Cricket Ground',
+        'location': 'Downtown Sports Complex',
+        'sport_type': 'Cricket',
+        'rating': 4.5,
+        'description': 'A well-maintained cricket ground with lush green outfield and a professional pitch. Perfect for cricket matches and practice sessions.'
+    },
+    {
+        'name': 'Victory Football Stadium',
+        'location': 'North Sports City',
+        'sport_type': 'Football',
+        'rating': 4.2,
+        'description': 'Full-size football ground with artificial turf. Includes floodlights for evening matches and changing rooms.'
+    },
+    {
+        'name': 'Elite Basketball Court',
+        'location': 'Central Recreation Center',
+        'sport_type': 'Basketball',
+        'rating': 4.0,
+        'description': 'Indoor basketball court with professional flooring and equipment. Air-conditioned facility available throughout the year.'
+    },
+    {
+        'name': 'Ace Tennis Center',
+        'location': 'East End Sports Club',
+        'sport_type': 'Tennis',
+        'rating': 4.8,
+        'description': 'Premium tennis courts with clay and hard court options. Coaching services available upon request.'
+    },
+    {
+        'name': 'Olympic Swimming Pool',
+        'location': 'Aquatic Sports Center',
+        'sport_type': 'Swimming',
+        'rating': 4.6,
+        'description': 'Olympic-sized swimming pool with temperature control. Separate lanes for professional swimmers and beginners.'
+    }
+]
+
+LOCATIONS = [
+    'Downtown Sports Complex', 'North Sports City', 'Central Recreation Center',
+    'East End Sports Club', 'Aquatic Sports Center', 'West Park Arena',
+    'Riverside Grounds', 'Lakeview Sports Hub',
+]
+
+# Slots are spread evenly over the opening hours
+OPENING_MINUTE = 6 * 60
+CLOSING_MINUTE = 22 * 60
+
+
+class Command(BaseCommand):
+    help = (
+        'Populate the database with demo accounts and synthetic grounds, slots, '
+        'bookings and payments. Rows are inserted with batched bulk_create, so '
+        'it scales to millions of slots for load testing.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grounds', type=int, default=5, help='Number of grounds to create')
+        parser.add_argument('--days', type=int, default=7, help='Number of days of slots per ground')
+        parser.add_argument('--slots-per-day', type=int, default=6, help='Slots per ground per day (06:00-22:00)')
+        parser.add_argument('--users', type=int, default=20, help='Number of regular users to create')
+        parser.add_argument('--booking-ratio', type=float, default=0.3, help='Fraction of slots that get booked')
+        parser.add_argument('--payment-ratio', type=float, default=0.8, help='Fraction of bookings that are paid')
+        parser.add_argument('--start-date', type=date.fromisoformat, help='First slot date (default: today)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for reproducible runs')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per INSERT batch and transaction')
+        parser.add_argument('--clear', action='store_true', help='Delete all grounds (and their slots, bookings and payments) first')
+
+    def handle(self, *args, **options):
+        self.validate(options)
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        started = time.perf_counter()
+
+        if options['clear']:
+            Ground.objects.all().delete()
+            self.stdout.write('Cleared existing grounds, slots, bookings and payments.')
+
+        self.create_demo_accounts()
+        users = self.create_users(options['users'], options['seed'])
+        grounds = self.create_grounds(options['grounds'])
+
+        slot_count, booking_count, payment_count = self.create_slots_and_bookings(
+            grounds,
+            users,
+            start_date=options['start_date'] or date.today(),
+            days=options['days'],
+            slots_per_day=options['slots_per_day'],
+            booking_ratio=options['booking_ratio'],
+            payment_ratio=options['payment_ratio'],
+        )
+
+        rollup_rows = rebuild_daily_revenue()
+        bitmap_rows = rebuild_bitmaps(batch_size=self.batch_size)
+        # bulk_create sends no signals, so recount the dashboard counters
+        reconcile()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {len(grounds)} grounds, {len(users)} users, {slot_count} slots, '
+            f'{booking_count} bookings and {payment_count} payments '
+            f'({rollup_rows} revenue rollup rows, {bitmap_rows} availability bitmaps) in {elapsed:.1f}s '
+            f'({slot_count / elapsed:,.0f} slots/s).'
+        ))
+
+    def validate(self, options):
+        for name in ['grounds', 'days', 'users']:
+            if options[name] < 0:
+                raise CommandError(f'--{name} must not be negative.')
+        for name in ['slots_per_day', 'batch_size']:
+            if options[name] <= 0:
+                raise CommandError(f'--{name.replace("_", "-")} must be positive.')
+        for name in ['booking_ratio', 'payment_ratio']:
+            if not 0 <= options[name] <= 1:
+                raise CommandError(f'--{name.replace("_", "-")} must be between 0 and 1.')
+        if (CLOSING_MINUTE - OPENING_MINUTE) // options['slots_per_day'] < 15:
+            raise CommandError('--slots-per-day is too high; slots must be at least 15 minutes long.')
+        if options['booking_ratio'] and not options['users']:
+            raise CommandError('--users must be positive when creating bookings.')
+
+    def create_demo_accounts(self):
+        if not User.objects.filter(username='admin').exists():
+            admin_user = User.objects.create_superuser(
+                username='admin',
+                email='admin@example.com',
+                password='admin123'
+            )
+            CustomUser.objects.create(
+                user=admin_user,
+                phone_number='9876543210',
+                address='Admin Office, Sports Ground Management'
+            )
+            self.stdout.write('Created admin user (admin / admin123).')
+
+        if not User.objects.filter(username='user').exists():
+            regular_user = User.objects.create_user(
+                username='user',
+                email='user@example.com',
+                password='user123',
+                first_name='Regular',
+                last_name='User'
+            )
+            CustomUser.objects.create(
+                user=regular_user,
+                phone_number='1234567890',
+                address='123 Main St, User City'
+            )
+            self.stdout.write('Created regular user (user / user123).')
+
+    def create_users(self, count, seed):
+        # Synthetic users cannot log in; they only own bookings. Names depend on
+        # the seed, so rerunning with the same seed reuses the same users.
+        prefix = f'loadtest-{seed}-'
+        users = []
+        for i in range(count):
+            user = User(username=f'{prefix}{i}', email=f'{prefix}{i}@example.com')
+            user.set_unusable_password()
+            users.append(user)
+        with transaction.atomic():
+            User.objects.bulk_create(users, batch_size=self.batch_size, ignore_conflicts=True)
+        return list(
+            User.objects.filter(username__startswith=prefix).order_by('pk').values_list('pk', flat=True)[:count]
+        )
+
+    def create_grounds(self, count):
+        grounds = []
+        for i in range(count):
+            if i < len(DEMO_GROUNDS) and not Ground.objects.filter(name=DEMO_GROUNDS[i]['name']).exists():
+                grounds.append(Ground(**DEMO_GROUNDS[i]))
+                continue
+            sport_type = self.rng.choice(SPORT_TYPES)[0]
+            grounds.append(Ground(
+                name=f'{sport_type} Ground {i + 1}',
+                location=self.rng.choice(LOCATIONS),
+                sport_type=sport_type,
+                rating=round(self.rng.uniform(2.5, 5.0), 1),
+                description=f'Synthetic {sport_type.lower()} ground for load testing.'
+            ))
+        with transaction.atomic():
+            grounds = Ground.objects.bulk_create(grounds, batch_size=self.batch_size)
+            # bulk_create sends no signals
+            facets.invalidate()
+        return [ground.pk for ground in grounds]
+
+    def slot_times(self, slots_per_day):
+        length = (CLOSING_MINUTE - OPENING_MINUTE) // slots_per_day
+        times = []
+        for i in range(slots_per_day):
+            start = OPENING_MINUTE + i * length
+            end = start + length
+            times.append((
+                datetime.min.replace(hour=start // 60, minute=start % 60).time(),
+                datetime.min.replace(hour=end // 60, minute=end % 60).time(),
+                # Evening slots cost more
+                Decimal(500 + (start // 60) * 40),
+            ))
+        return times
+
+    def iter_slots(self, grounds, start_date, days, slots_per_day, booking_ratio):
+        times = self.slot_times(slots_per_day)
+        random_value = self.rng.random
+        for ground_id in grounds:
+            for day in range(days):
+                slot_date = start_date + timedelta(days=day)
+                for start_time, end_time, price in times:
+                    yield Slot(
+                        ground_id=ground_id,
+                        date=slot_date,
+                        start_time=start_time,
+                        end_time=end_time,
+                        price_per_slot=price,
+                        availability_status='Booked' if random_value() < booking_ratio else 'Available'
+                    )
+
+    def create_slots_and_bookings(self, grounds, users, start_date, days, slots_per_day, booking_ratio, payment_ratio):
+        slot_count = booking_count = payment_count = 0
+        total = len(grounds) * days * slots_per_day
+        batch = []
+        for slot in self.iter_slots(grounds, start_date, days, slots_per_day, booking_ratio):
+            batch.append(slot)
+            if len(batch) >= self.batch_size:
+                bookings, payments = self.insert_batch(batch, users, payment_ratio)
+                slot_count += len(batch)
+                booking_count += bookings
+                payment_count += payments
+                batch = []
+                self.report_progress(slot_count, total)
+        if batch:
+            bookings, payments = self.insert_batch(batch, users, payment_ratio)
+            slot_count += len(batch)
+            booking_count += bookings
+            payment_count += payments
+        return slot_count, booking_count, payment_count
+
+    def insert_batch(self, slots, users, payment_ratio):
+        """Insert one batch of slots with their bookings and payments in a transaction."""
+        with transaction.atomic():
+            Slot.objects.bulk_create(slots, batch_size=self.batch_size)
+            bookings = Booking.objects.bulk_create(
+                (
+                    Booking(user_id=self.rng.choice(users), slot_id=slot.pk, status='Confirmed')
+                    for slot in slots
+                    if slot.availability_status == 'Booked'
+                ),
+                batch_size=self.batch_size
+            )
+            prices = {slot.pk: slot.price_per_slot for slot in slots}
+            payments = Payment.objects.bulk_create(
+                (
+                    Payment(
+                        booking_id=booking.pk,
+                        amount=prices[booking.slot_id],
+                        payment_method=self.rng.choice(PAYMENT_METHODS)[0],
+                        payment_status='Paid'
+                    )
+                    for booking in bookings
+                    if self.rng.random() < payment_ratio
+                ),
+                batch_size=self.batch_size
+            )
+        return len(bookings), len(payments)
+
+    def report_progress(self, done, total):
+        # Roughly every 10% of the run
+        step = max(total // 10, self.batch_size)
+        if done % step < self.batch_size:
+            self.stdout.write(f'  {done:,} / {total:,} slots')
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ground_management.imports import IMPORT_BATCH_SIZE, ImportFileError, import_file
+
+
+class Command(BaseCommand):
+    help = (
+        'Import grounds or slots from a CSV or XLSX file with a header row. '
+        'Rows are validated like the admin forms; invalid rows are reported and skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=['grounds', 'slots'])
+        parser.add_argument('path', help='CSV or XLSX file')
+        parser.add_argument('--dry-run', action='store_true', help='Validate every row but import nothing')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help='Rows per transaction')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as file:
+                result = import_file(
+                    options['kind'], file, options['path'],
+                    dry_run=options['dry_run'], batch_size=options['batch_size']
+                )
+        except (ImportFileError, OSError) as e:
+            raise CommandError(str(e))
+
+        for line, message in result.errors:
+            self.stderr.write(f'Line {line}: {message}')
+        if result.error_count > len(result.errors):
+            self.stderr.write(f'... and {result.error_count - len(result.errors)} more errors.')
+
+        verb = 'would be imported' if result.dry_run else 'imported'
+        summary = f'{result.rows} rows read, {result.created} {result.kind} {verb}, {result.error_count} rows with errors.'
+        self.stdout.write(self.style.WARNING(summary) if result.error_count else self.style.SUCCESS(summary))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from ground_management.payments import PAYMENT_BATCH_SIZE, process_pending
+
+
+class Command(BaseCommand):
+    help = (
+        'Charge submitted payment intents that no worker has finished, oldest first. '
+        'Run it with --every when PAYMENT_WORKERS is 0, or once after a restart.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=PAYMENT_BATCH_SIZE, help='Intents read per pass')
+        parser.add_argument(
+            '--every', type=float, metavar='SECONDS',
+            help='Keep running and check again every SECONDS instead of once'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed = process_pending(batch_size=options['batch_size'])
+            if processed or not options['every']:
+                self.stdout.write(self.style.SUCCESS(f'{processed} payments processed.'))
+            if not options['every']:
+                return
+            close_old_connections()
+            time.sleep(options['every'])
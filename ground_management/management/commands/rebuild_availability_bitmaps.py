@@ -0,0 +1,18 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from ground_management.bitmaps import rebuild_bitmaps
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-ground, per-day availability bitmaps from slots'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', type=date.fromisoformat, help='First day to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--end-date', type=date.fromisoformat, help='Last day to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--ground', type=int, action='append', dest='grounds', help='Ground id to rebuild (repeatable; default: all)')
+
+    def handle(self, *args, **options):
+        rows = rebuild_bitmaps(options['grounds'], options['start_date'], options['end_date'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt availability bitmaps: {rows} rows written.'))
@@ -0,0 +1,18 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from ground_management.analytics import STATS_CHUNK_DAYS, rebuild_booking_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the booking analytics rollup for days the lifecycle sweeper has finished'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', type=date.fromisoformat, help='First slot day to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--end-date', type=date.fromisoformat, help='Last slot day to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--chunk-days', type=int, default=STATS_CHUNK_DAYS, help='Days rebuilt per transaction')
+
+    def handle(self, *args, **options):
+        rows = rebuild_booking_stats(options['start_date'], options['end_date'], options['chunk_days'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt booking analytics rollup: {rows} rows written.'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from ground_management.models import Slot
+from ground_management.overlaps import create_triggers, find_overlaps
+
+
+class Command(BaseCommand):
+    help = 'Recreate the SQLite triggers that reject overlapping slots, e.g. after a migration rebuilt the slot table'
+
+    def handle(self, *args, **options):
+        if not create_triggers():
+            self.stdout.write('This database enforces the overlap rule with a constraint; nothing to rebuild.')
+            return
+        self.stdout.write(self.style.SUCCESS('Recreated the slot overlap triggers.'))
+
+        # The triggers only check new writes; report what slipped in without them
+        rows = Slot.objects.order_by('ground_id', 'date', 'start_time').values_list(
+            'ground_id', 'date', 'start_time', 'end_time'
+        ).iterator(chunk_size=5000)
+        count = sum(1 for _ in find_overlaps(rows))
+        if count:
+            self.stdout.write(self.style.WARNING(
+                f'{count} overlapping slot pairs were stored meanwhile; list them with find_slot_overlaps.'
+            ))
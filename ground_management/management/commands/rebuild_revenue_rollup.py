@@ -0,0 +1,17 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from ground_management.revenue import rebuild_daily_revenue
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily revenue rollup from paid payments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', type=date.fromisoformat, help='First day to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--end-date', type=date.fromisoformat, help='Last day to rebuild (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        rows = rebuild_daily_revenue(options['start_date'], options['end_date'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt daily revenue rollup: {rows} rows written.'))
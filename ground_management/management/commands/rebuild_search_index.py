@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from ground_management.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Recreate the SQLite ground search table and triggers and reindex every ground'
+
+    def handle(self, *args, **options):
+        indexed = rebuild_index()
+        if indexed is None:
+            self.stdout.write('This database maintains its search indexes itself; nothing to rebuild.')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt ground search index: {indexed} grounds indexed.'))
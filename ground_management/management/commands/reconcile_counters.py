@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from ground_management.counters import COUNTERS, reconcile
+
+
+class Command(BaseCommand):
+    help = 'Recount the maintained dashboard counters from their tables and fix any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', metavar='counter', help=f'Counters to recount (default: all of {", ".join(COUNTERS)})')
+        parser.add_argument(
+            '--every', type=int, metavar='SECONDS',
+            help='Keep running and reconcile again every SECONDS instead of once'
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options['names']) - set(COUNTERS)
+        if unknown:
+            raise CommandError(f'Unknown counters: {", ".join(sorted(unknown))}')
+        while True:
+            for name, (stored, counted) in reconcile(options['names']).items():
+                if stored is None:
+                    self.stdout.write(f'{name}: created at {counted}')
+                elif stored != counted:
+                    self.stdout.write(self.style.WARNING(f'{name}: drifted to {stored}, fixed to {counted}'))
+                else:
+                    self.stdout.write(f'{name}: {counted}')
+            if not options['every']:
+                return
+            close_old_connections()
+            time.sleep(options['every'])
@@ -0,0 +1,39 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from ground_management.lifecycle import SWEEP_CHUNK_DAYS, sweep
+
+
+class Command(BaseCommand):
+    help = (
+        'Complete confirmed bookings, cancel pending ones and close available slots '
+        'whose day has passed'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=date.fromisoformat, help='First day to sweep (YYYY-MM-DD; default: after the last sweep)')
+        parser.add_argument('--chunk-days', type=int, default=SWEEP_CHUNK_DAYS, help='Days updated per transaction')
+        parser.add_argument(
+            '--every', type=int, metavar='SECONDS',
+            help='Keep running and sweep again every SECONDS instead of once'
+        )
+
+    def handle(self, *args, **options):
+        since = options['since']
+        while True:
+            record = sweep(since=since, chunk_days=options['chunk_days'])
+            if record:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Swept {record.from_date} to {record.through_date}: {record.bookings_completed} bookings '
+                    f'completed, {record.bookings_cancelled} cancelled, {record.slots_closed} slots closed.'
+                ))
+            else:
+                self.stdout.write('Nothing to sweep.')
+            if not options['every']:
+                return
+            since = None
+            close_old_connections()
+            time.sleep(options['every'])
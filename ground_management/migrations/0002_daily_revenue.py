@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_revenue(apps, schema_editor):
+    Payment = apps.get_model('ground_management', 'Payment')
+    DailyRevenue = apps.get_model('ground_management', 'DailyRevenue')
+    totals = Payment.objects.filter(payment_status='Paid').values(
+        'payment_method', day=TruncDate('payment_date'), ground_id=F('booking__slot__ground_id')
+    ).annotate(total=Sum('amount'), count=Count('id')).order_by()
+    DailyRevenue.objects.bulk_create(
+        (
+            DailyRevenue(
+                ground_id=row['ground_id'],
+                date=row['day'],
+                payment_method=row['payment_method'],
+                amount=row['total'],
+                payment_count=row['count'],
+            )
+            for row in totals.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ground_management', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRevenue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('payment_method', models.CharField(choices=[('Credit Card', 'Credit Card'), ('Debit Card', 'Debit Card'), ('UPI', 'UPI'), ('Net Banking', 'Net Banking'), ('Cash', 'Cash')], max_length=20)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('payment_count', models.IntegerField(default=0)),
+                ('ground', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_revenue', to='ground_management.ground')),
+            ],
+            options={
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['date', 'ground'], name='daily_revenue_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('ground', 'date', 'payment_method'), name='unique_daily_revenue')],
+            },
+        ),
+        migrations.RunPython(backfill_daily_revenue, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:38
+
+from django.db import migrations, models
+
+GROUND_TABLE = 'ground_management_ground'
+
+POSTGRESQL_FORWARD = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    f"""
+    CREATE INDEX IF NOT EXISTS ground_search_document_idx ON {GROUND_TABLE} USING gin (
+        to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(sport_type, '') || ' '
+        || coalesce(location, '') || ' ' || coalesce(description, ''))
+    )
+    """,
+    f'CREATE INDEX IF NOT EXISTS ground_name_trgm_idx ON {GROUND_TABLE} USING gin (name gin_trgm_ops)',
+]
+
+POSTGRESQL_BACKWARD = [
+    'DROP INDEX IF EXISTS ground_name_trgm_idx',
+    'DROP INDEX IF EXISTS ground_search_document_idx',
+]
+
+SQLITE_FORWARD = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS ground_search USING fts5(
+        name, sport_type, location, description,
+        content='{GROUND_TABLE}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    "CREATE VIRTUAL TABLE IF NOT EXISTS ground_search_vocab USING fts5vocab(ground_search, 'row')",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS ground_search_ai AFTER INSERT ON {GROUND_TABLE} BEGIN
+        INSERT INTO ground_search(rowid, name, sport_type, location, description)
+        VALUES (new.id, new.name, new.sport_type, new.location, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS ground_search_ad AFTER DELETE ON {GROUND_TABLE} BEGIN
+        INSERT INTO ground_search(ground_search, rowid, name, sport_type, location, description)
+        VALUES ('delete', old.id, old.name, old.sport_type, old.location, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS ground_search_au AFTER UPDATE ON {GROUND_TABLE} BEGIN
+        INSERT INTO ground_search(ground_search, rowid, name, sport_type, location, description)
+        VALUES ('delete', old.id, old.name, old.sport_type, old.location, old.description);
+        INSERT INTO ground_search(rowid, name, sport_type, location, description)
+        VALUES (new.id, new.name, new.sport_type, new.location, new.description);
+    END
+    """,
+    "INSERT INTO ground_search(ground_search) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS ground_search_au',
+    'DROP TRIGGER IF EXISTS ground_search_ad',
+    'DROP TRIGGER IF EXISTS ground_search_ai',
+    'DROP TABLE IF EXISTS ground_search_vocab',
+    'DROP TABLE IF EXISTS ground_search',
+]
+
+
+def _run(schema_editor, statements):
+    statements = statements.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement, params=None)
+
+
+def create_search_index(apps, schema_editor):
+    _run(schema_editor, {'postgresql': POSTGRESQL_FORWARD, 'sqlite': SQLITE_FORWARD})
+
+
+def drop_search_index(apps, schema_editor):
+    _run(schema_editor, {'postgresql': POSTGRESQL_BACKWARD, 'sqlite': SQLITE_BACKWARD})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ground_management', '0003_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ground',
+            index=models.Index(fields=['sport_type'], name='ground_sport_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ground',
+            index=models.Index(fields=['location'], name='ground_location_idx'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
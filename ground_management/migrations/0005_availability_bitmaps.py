@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+from itertools import groupby
+
+
+def backfill_availability_bitmaps(apps, schema_editor):
+    # Same encoding as ground_management.bitmaps: bit i covers minutes [15i, 15i + 15)
+    Slot = apps.get_model('ground_management', 'Slot')
+    AvailabilityBitmap = apps.get_model('ground_management', 'AvailabilityBitmap')
+    rows = Slot.objects.filter(availability_status='Available').order_by('ground_id', 'date').values_list(
+        'ground_id', 'date', 'start_time', 'end_time'
+    ).iterator(chunk_size=5000)
+
+    def bitmaps():
+        for (ground_id, day), slots in groupby(rows, key=lambda row: row[:2]):
+            bits = 0
+            for _, _, start_time, end_time in slots:
+                start = start_time.hour * 60 + start_time.minute + (start_time.second > 0)
+                first = -(-start // 15)
+                last = (end_time.hour * 60 + end_time.minute) // 15
+                if last > first:
+                    bits |= ((1 << (last - first)) - 1) << first
+            if bits:
+                yield AvailabilityBitmap(ground_id=ground_id, date=day, free=bits.to_bytes(12, 'little'))
+
+    AvailabilityBitmap.objects.bulk_create(bitmaps(), batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ground_management', '0004_ground_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvailabilityBitmap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('free', models.BinaryField(max_length=12)),
+                ('ground', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability_bitmaps', to='ground_management.ground')),
+            ],
+            options={
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['date', 'ground'], name='bitmap_date_ground_idx')],
+                'constraints': [models.UniqueConstraint(fields=('ground', 'date'), name='unique_availability_bitmap')],
+            },
+        ),
+        migrations.RunPython(backfill_availability_bitmaps, migrations.RunPython.noop),
+    ]
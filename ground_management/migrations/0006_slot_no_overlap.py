@@ -0,0 +1,76 @@
+from django.db import migrations
+
+SLOT_TABLE = 'ground_management_slot'
+
+POSTGRESQL_FORWARD = [
+    'CREATE EXTENSION IF NOT EXISTS btree_gist',
+    f"""
+    ALTER TABLE {SLOT_TABLE} ADD CONSTRAINT slot_no_overlap EXCLUDE USING gist (
+        ground_id WITH =,
+        tsrange(date + start_time, date + end_time) WITH &&
+    )
+    """,
+]
+
+POSTGRESQL_BACKWARD = [
+    f'ALTER TABLE {SLOT_TABLE} DROP CONSTRAINT IF EXISTS slot_no_overlap',
+]
+
+# SQLite has no exclusion constraints; triggers do the same check, using the
+# (ground, date, start_time) unique index to find the day's slots
+SQLITE_FORWARD = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS slot_no_overlap_insert BEFORE INSERT ON {SLOT_TABLE}
+    WHEN EXISTS (
+        SELECT 1 FROM {SLOT_TABLE}
+        WHERE ground_id = new.ground_id AND date = new.date
+        AND start_time < new.end_time AND end_time > new.start_time
+    )
+    BEGIN
+        SELECT RAISE(ABORT, 'slot_no_overlap: slot overlaps another slot of the same ground');
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS slot_no_overlap_update
+    BEFORE UPDATE OF ground_id, date, start_time, end_time ON {SLOT_TABLE}
+    WHEN EXISTS (
+        SELECT 1 FROM {SLOT_TABLE}
+        WHERE ground_id = new.ground_id AND date = new.date
+        AND start_time < new.end_time AND end_time > new.start_time
+        AND id != new.id
+    )
+    BEGIN
+        SELECT RAISE(ABORT, 'slot_no_overlap: slot overlaps another slot of the same ground');
+    END
+    """,
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS slot_no_overlap_update',
+    'DROP TRIGGER IF EXISTS slot_no_overlap_insert',
+]
+
+
+def _run(schema_editor, statements):
+    statements = statements.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement, params=None)
+
+
+def add_overlap_constraint(apps, schema_editor):
+    _run(schema_editor, {'postgresql': POSTGRESQL_FORWARD, 'sqlite': SQLITE_FORWARD})
+
+
+def drop_overlap_constraint(apps, schema_editor):
+    _run(schema_editor, {'postgresql': POSTGRESQL_BACKWARD, 'sqlite': SQLITE_BACKWARD})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ground_management', '0005_availability_bitmaps'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_overlap_constraint, drop_overlap_constraint),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ground_management', '0007_archive_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LifecycleSweep',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ran_at', models.DateTimeField(auto_now_add=True)),
+                ('from_date', models.DateField()),
+                ('through_date', models.DateField()),
+                ('bookings_completed', models.IntegerField(default=0)),
+                ('bookings_cancelled', models.IntegerField(default=0)),
+                ('slots_closed', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-through_date'],
+            },
+        ),
+    ]
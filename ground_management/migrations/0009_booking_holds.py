@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ground_management', '0008_lifecycle_sweeps'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('status', 'Pending')), fields=['expires_at'], name='booking_hold_expiry_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ground_management', '0011_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyBookingStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('lead_days', models.IntegerField()),
+                ('bookings', models.IntegerField(default=0)),
+                ('cancelled', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['date', 'lead_days'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='dailyrevenue',
+            index=models.Index(fields=['date', 'amount', 'payment_count'], name='daily_revenue_totals_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailybookingstats',
+            constraint=models.UniqueConstraint(fields=('date', 'lead_days'), name='unique_daily_booking_stats'),
+        ),
+    ]
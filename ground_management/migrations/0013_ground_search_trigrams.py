@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 09:12
+
+from django.db import migrations
+
+GROUND_TABLE = 'ground_management_ground'
+
+# Trigrams over every searched column, so a misspelt word is found wherever it is
+POSTGRESQL_FORWARD = [
+    f"""
+    CREATE INDEX IF NOT EXISTS ground_search_text_trgm_idx ON {GROUND_TABLE} USING gin (
+        (coalesce(name, '') || ' ' || coalesce(sport_type, '') || ' '
+        || coalesce(location, '') || ' ' || coalesce(description, '')) gin_trgm_ops
+    )
+    """,
+]
+
+POSTGRESQL_BACKWARD = [
+    'DROP INDEX IF EXISTS ground_search_text_trgm_idx',
+]
+
+
+def _run(schema_editor, statements):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in statements:
+            schema_editor.execute(statement, params=None)
+
+
+def create_trigram_index(apps, schema_editor):
+    _run(schema_editor, POSTGRESQL_FORWARD)
+
+
+def drop_trigram_index(apps, schema_editor):
+    _run(schema_editor, POSTGRESQL_BACKWARD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ground_management', '0012_booking_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -29,6 +29,11 @@ BOOKING_STATUSES = [
     ('Cancelled', 'Cancelled'),
 ]
 
+# Bookings still to be played; the lifecycle sweeper (lifecycle.py) moves
+# them to a finished status once their day has passed
+ACTIVE_BOOKING_STATUSES = ['Pending', 'Confirmed']
+FINISHED_BOOKING_STATUSES = ['Completed', 'Cancelled']
+
 PAYMENT_METHODS = [
     ('Credit Card', 'Credit Card'),
     ('Debit Card', 'Debit Card'),
@@ -39,6 +44,7 @@ PAYMENT_METHODS = [
 
 PAYMENT_STATUSES = [
     ('Pending', 'Pending'),
+    ('Processing', 'Processing'),
     ('Paid', 'Paid'),
     ('Failed', 'Failed'),
     ('Refunded', 'Refunded'),
@@ -62,6 +68,11 @@ class Ground(models.Model):
     
     class Meta:
         ordering = ['name']
+        indexes = [
+            # Exact filters from the ground list dropdowns
+            models.Index(fields=['sport_type'], name='ground_sport_type_idx'),
+            models.Index(fields=['location'], name='ground_location_idx'),
+        ]
 
 class Slot(models.Model):
     """Model representing a time slot for a ground"""
@@ -88,6 +99,18 @@ class Slot(models.Model):
                 name='unique_ground_slot'
             ),
         ]
+        indexes = [
+            # Public pages filter on (ground, date, availability_status)
+            models.Index(fields=['ground', 'date', 'availability_status'], name='slot_ground_date_status_idx'),
+            # Only bookable slots, already in display order
+            models.Index(
+                fields=['ground', 'date', 'start_time'],
+                condition=models.Q(availability_status='Available'),
+                name='slot_available_idx'
+            ),
+            # Date-window reports across all grounds
+            models.Index(fields=['date', 'ground'], name='slot_date_ground_idx'),
+        ]
 
 class CustomUser(models.Model):
     """Model extending the built-in User model with additional fields"""
@@ -108,12 +131,27 @@ class Booking(models.Model):
         choices=BOOKING_STATUSES,
         default='Confirmed'
     )
+    # When an unpaid Pending hold lapses and its slot is released (see bookings.py)
+    expires_at = models.DateTimeField(null=True, blank=True)
     
     def __str__(self):
         return f"Booking {self.id} - {self.user.username} - {self.slot}"
     
     class Meta:
         ordering = ['-booking_date']
+        indexes = [
+            # The hold expiry scan only ever reads pending holds, oldest deadline first
+            models.Index(
+                fields=['expires_at'],
+                condition=models.Q(status='Pending'),
+                name='booking_hold_expiry_idx'
+            ),
+            # User dashboards filter on user and status, then join to slot dates
+            models.Index(fields=['user', 'status'], name='booking_user_status_idx'),
+            models.Index(fields=['user', 'slot'], name='booking_user_slot_idx'),
+            # Admin list ordering
+            models.Index(fields=['booking_date', 'id'], name='booking_date_id_idx'),
+        ]
 
 class Payment(models.Model):
     """Model representing a payment for a booking"""
@@ -126,9 +164,165 @@ class Payment(models.Model):
         choices=PAYMENT_STATUSES,
         default='Pending'
     )
+    # Set on payment intents submitted through payments.submit_payment
+    idempotency_key = models.CharField(max_length=64, unique=True, null=True, blank=True)
+    gateway_reference = models.CharField(max_length=100, blank=True)
+    failure_reason = models.CharField(max_length=200, blank=True)
+    attempted_at = models.DateTimeField(null=True, blank=True)
     
     def __str__(self):
         return f"Payment for Booking {self.booking.id}"
     
     class Meta:
-        ordering = ['-payment_date']
\ No newline at end of file
+        ordering = ['-payment_date']
+        indexes = [
+            models.Index(fields=['payment_status', 'payment_date'], name='payment_status_date_idx'),
+            # Reports only ever sum paid payments
+            models.Index(
+                fields=['payment_date'],
+                condition=models.Q(payment_status='Paid'),
+                name='payment_paid_date_idx'
+            ),
+        ]
+
+class DailyRevenue(models.Model):
+    """Pre-aggregated paid revenue per ground, day and payment method"""
+    ground = models.ForeignKey(Ground, on_delete=models.CASCADE, related_name='daily_revenue')
+    date = models.DateField()
+    payment_method = models.CharField(max_length=20, choices=PAYMENT_METHODS)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    payment_count = models.IntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.ground.name} - {self.date} ({self.payment_method}): {self.amount}"
+    
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['ground', 'date', 'payment_method'],
+                name='unique_daily_revenue'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['date', 'ground'], name='daily_revenue_date_idx'),
+            # Covers the per-day totals of analytics.py, read without touching the table
+            models.Index(fields=['date', 'amount', 'payment_count'], name='daily_revenue_totals_idx'),
+        ]
+
+class DailyBookingStats(models.Model):
+    """Bookings of one swept slot day, by days booked in advance (see analytics.py)"""
+    date = models.DateField()
+    lead_days = models.IntegerField()
+    bookings = models.IntegerField(default=0)
+    cancelled = models.IntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.date} ({self.lead_days} days ahead): {self.bookings}"
+    
+    class Meta:
+        ordering = ['date', 'lead_days']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'lead_days'],
+                name='unique_daily_booking_stats'
+            ),
+        ]
+
+class AvailabilityBitmap(models.Model):
+    """Bookable time of a ground on one day, one bit per 15 minutes (see bitmaps.py)"""
+    ground = models.ForeignKey(Ground, on_delete=models.CASCADE, related_name='availability_bitmaps')
+    date = models.DateField()
+    free = models.BinaryField(max_length=12)
+    
+    def __str__(self):
+        return f"{self.ground_id} - {self.date}"
+    
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['ground', 'date'],
+                name='unique_availability_bitmap'
+            ),
+        ]
+        indexes = [
+            # Free-window searches scan a date range across grounds
+            models.Index(fields=['date', 'ground'], name='bitmap_date_ground_idx'),
+        ]
+
+class LifecycleSweep(models.Model):
+    """One run of the lifecycle sweeper over past days, and what it changed"""
+    ran_at = models.DateTimeField(auto_now_add=True)
+    from_date = models.DateField()
+    through_date = models.DateField()
+    bookings_completed = models.IntegerField(default=0)
+    bookings_cancelled = models.IntegerField(default=0)
+    slots_closed = models.IntegerField(default=0)
+    
+    def __str__(self):
+        return f"Sweep {self.from_date} to {self.through_date}"
+    
+    class Meta:
+        ordering = ['-through_date']
+
+class Counter(models.Model):
+    """A named running total kept in step with the rows it counts (see counters.py)"""
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+class ArchivedSlot(models.Model):
+    """A past slot moved out of Slot by archive_history (see archive.py), keeping its id"""
+    id = models.BigIntegerField(primary_key=True)
+    ground = models.ForeignKey(Ground, on_delete=models.CASCADE, related_name='archived_slots')
+    date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    price_per_slot = models.DecimalField(max_digits=10, decimal_places=2)
+    availability_status = models.CharField(max_length=20, choices=AVAILABILITY_STATUSES)
+    
+    def __str__(self):
+        return f"{self.ground.name} - {self.date} ({self.start_time} to {self.end_time})"
+    
+    class Meta:
+        ordering = ['date', 'start_time']
+        indexes = [
+            # Reports read the archive by date window, like slot_date_ground_idx
+            models.Index(fields=['date', 'ground'], name='archived_slot_date_idx'),
+        ]
+
+class ArchivedBooking(models.Model):
+    """A booking of an archived slot; related names match Booking so templates read both"""
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_bookings')
+    slot = models.ForeignKey(ArchivedSlot, on_delete=models.CASCADE, related_name='bookings')
+    booking_date = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=BOOKING_STATUSES)
+    
+    def __str__(self):
+        return f"Booking {self.id} - {self.user.username} - {self.slot}"
+    
+    class Meta:
+        ordering = ['-booking_date']
+        indexes = [
+            models.Index(fields=['user', 'slot'], name='archived_booking_user_idx'),
+        ]
+
+class ArchivedPayment(models.Model):
+    """The payment of an archived booking"""
+    id = models.BigIntegerField(primary_key=True)
+    booking = models.OneToOneField(ArchivedBooking, on_delete=models.CASCADE, related_name='payment')
+    payment_date = models.DateTimeField()
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    payment_method = models.CharField(max_length=20, choices=PAYMENT_METHODS)
+    payment_status = models.CharField(max_length=20, choices=PAYMENT_STATUSES)
+    
+    def __str__(self):
+        return f"Payment for Booking {self.booking_id}"
+    
+    class Meta:
+        ordering = ['-payment_date']
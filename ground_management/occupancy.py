@@ -0,0 +1,108 @@
+"""
+Occupancy engine.
+
+Computes slot occupancy for every ground, and an hour-of-week heatmap
+(ground x weekday x start hour), each in a single grouped query over ``Slot``
+restricted to an optional date window. Windows that reach back past the
+archive cutoff read ``ArchivedSlot`` too, through UNION ALL in the same
+query; counts for a key found in both tables are added up afterwards.
+"""
+
+from django.db.models import Count, Q
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay
+
+from .archive import reaches_archive
+from .models import ArchivedSlot, Ground, Slot
+
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+
+def _rate(booked, total):
+    return (booked / total) * 100 if total else 0
+
+
+def _date_window(start_date, end_date):
+    window = Q()
+    if start_date:
+        window &= Q(date__gte=start_date)
+    if end_date:
+        window &= Q(date__lte=end_date)
+    return window
+
+
+def _counted(start_date, end_date, *group_by, **expressions):
+    # Grouped slot counts over the window, from both tables if it reaches the archive
+    models = [Slot, ArchivedSlot] if reaches_archive(start_date) else [Slot]
+    counts = [
+        model.objects.filter(_date_window(start_date, end_date)).values(*group_by, **expressions).annotate(
+            total_slots=Count('id'),
+            booked_slots=Count('id', filter=Q(availability_status='Booked')),
+            maintenance_slots=Count('id', filter=Q(availability_status='Maintenance')),
+        ).order_by()
+        for model in models
+    ]
+    return counts[0].union(*counts[1:], all=True)
+
+
+def _merged(rows, key):
+    # Add up the counts of rows that share a key, e.g. hot and archived ones
+    merged = {}
+    for row in rows:
+        cell = merged.setdefault(key(row), dict(row, total_slots=0, booked_slots=0, maintenance_slots=0))
+        for field in ('total_slots', 'booked_slots', 'maintenance_slots'):
+            cell[field] += row[field]
+    return merged
+
+
+def ground_occupancy(start_date=None, end_date=None):
+    """Return total, booked and maintenance slot counts per ground.
+
+    Grounds without slots in the window are left out; the rest are sorted by
+    occupancy rate, highest first.
+    """
+    counts = _merged(_counted(start_date, end_date, 'ground_id'), key=lambda row: row['ground_id'])
+    grounds = Ground.objects.in_bulk(counts)
+
+    occupancy_data = [
+        {
+            'ground': grounds[ground_id],
+            'total_slots': count['total_slots'],
+            'booked_slots': count['booked_slots'],
+            'maintenance_slots': count['maintenance_slots'],
+            'occupancy_rate': _rate(count['booked_slots'], count['total_slots']),
+        }
+        for ground_id, count in counts.items()
+        if ground_id in grounds
+    ]
+    occupancy_data.sort(key=lambda x: x['occupancy_rate'], reverse=True)
+    return occupancy_data
+
+
+def occupancy_heatmap(start_date=None, end_date=None):
+    """Return one cell per (ground, ISO weekday, start hour) with slot counts."""
+    cells = _merged(
+        _counted(start_date, end_date, 'ground_id', weekday=ExtractIsoWeekDay('date'), hour=ExtractHour('start_time')),
+        key=lambda row: (row['ground_id'], row['weekday'], row['hour']),
+    )
+    return [cells[key] for key in sorted(cells)]
+
+
+def combined_heatmap(cells):
+    """Fold per-ground heatmap cells into a weekday x hour grid of occupancy rates."""
+    totals = {}
+    for cell in cells:
+        key = (cell['weekday'], cell['hour'])
+        total, booked = totals.get(key, (0, 0))
+        totals[key] = (total + cell['total_slots'], booked + cell['booked_slots'])
+
+    hours = sorted({hour for _, hour in totals})
+    rows = []
+    for weekday, label in enumerate(WEEKDAYS, start=1):
+        rows.append({
+            'weekday': label,
+            'rates': [
+                _rate(totals[weekday, hour][1], totals[weekday, hour][0]) if (weekday, hour) in totals else None
+                for hour in hours
+            ],
+        })
+    return {'hours': hours, 'rows': rows}
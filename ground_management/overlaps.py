@@ -0,0 +1,162 @@
+"""
+Slot overlap detection.
+
+Two slots of one ground on one day overlap when each starts before the other
+ends (06:00-08:00 and 07:00-09:00). ``unique_ground_slot`` only rejects equal
+start times, so overlaps are checked here and, since migration 0006, by the
+database: an exclusion constraint on PostgreSQL and triggers on SQLite.
+
+``clashing_slot`` checks one slot with a single range query on the
+(ground, date, start_time) index. ``check_slots`` checks a stream of new
+slots against each other and the stored ones by sorting and sweeping, reading
+the stored slots once per batch instead of once per new slot.
+
+SQLite drops the triggers when a migration rebuilds the slot table, so run
+``manage.py rebuild_overlap_triggers`` after altering ``Slot``.
+"""
+
+from bisect import bisect_left
+from itertools import groupby, islice
+
+from django.db import connection
+
+from .models import Slot
+
+SLOT_TABLE = Slot._meta.db_table
+
+# Kept identical to the triggers created by migration 0006
+SQLITE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS slot_no_overlap_insert BEFORE INSERT ON {SLOT_TABLE}
+    WHEN EXISTS (
+        SELECT 1 FROM {SLOT_TABLE}
+        WHERE ground_id = new.ground_id AND date = new.date
+        AND start_time < new.end_time AND end_time > new.start_time
+    )
+    BEGIN
+        SELECT RAISE(ABORT, 'slot_no_overlap: slot overlaps another slot of the same ground');
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS slot_no_overlap_update
+    BEFORE UPDATE OF ground_id, date, start_time, end_time ON {SLOT_TABLE}
+    WHEN EXISTS (
+        SELECT 1 FROM {SLOT_TABLE}
+        WHERE ground_id = new.ground_id AND date = new.date
+        AND start_time < new.end_time AND end_time > new.start_time
+        AND id != new.id
+    )
+    BEGIN
+        SELECT RAISE(ABORT, 'slot_no_overlap: slot overlaps another slot of the same ground');
+    END
+    """,
+]
+
+
+def clashing_slot(ground_id, date, start_time, end_time, exclude_pk=None):
+    """Return a stored slot overlapping the given times, or None."""
+    slots = Slot.objects.filter(
+        ground_id=ground_id,
+        date=date,
+        start_time__lt=end_time,
+        end_time__gt=start_time
+    )
+    if exclude_pk is not None:
+        slots = slots.exclude(pk=exclude_pk)
+    return slots.order_by('start_time').first()
+
+
+class _Day:
+    """Stored intervals of one ground-day, searchable by start time."""
+
+    def __init__(self, intervals):
+        intervals.sort()
+        self.starts = [start for start, _ in intervals]
+        self.intervals = intervals
+        # Longest reach of any interval up to each position, in case stored
+        # rows already overlap each other
+        self.reach = []
+        furthest = None
+        for interval in intervals:
+            if furthest is None or interval[1] > furthest[1]:
+                furthest = interval
+            self.reach.append(furthest)
+
+    def clash(self, start_time, end_time):
+        index = bisect_left(self.starts, end_time) - 1
+        if index >= 0 and self.reach[index][1] > start_time:
+            return self.reach[index]
+        return None
+
+
+def _stored_days(batch):
+    ground_ids = {slot.ground_id for slot in batch}
+    dates = [slot.date for slot in batch]
+    rows = Slot.objects.filter(
+        ground_id__in=ground_ids,
+        date__gte=min(dates),
+        date__lte=max(dates)
+    ).order_by('ground_id', 'date').values_list('ground_id', 'date', 'start_time', 'end_time')
+    return {
+        key: _Day([(start_time, end_time) for _, _, start_time, end_time in day_rows])
+        for key, day_rows in groupby(rows, key=lambda row: row[:2])
+    }
+
+
+def check_slots(slots, batch_size=5000):
+    """Yield (slot, clash) for each new slot, in order.
+
+    clash is None when the slot fits, else the (start_time, end_time) of a
+    stored slot or of an earlier accepted new slot it overlaps. slots must be
+    ordered by ground, date and start time, as schedules produce them; new
+    slots are not saved, so yield them to an insert as they are accepted.
+    """
+    slots = iter(slots)
+    accepted_key = accepted_end = None
+    accepted_interval = None
+    while True:
+        batch = list(islice(slots, batch_size))
+        if not batch:
+            return
+        stored = _stored_days(batch)
+        for slot in batch:
+            key = (slot.ground_id, slot.date)
+            day = stored.get(key)
+            clash = day.clash(slot.start_time, slot.end_time) if day else None
+            if clash is None and key == accepted_key and accepted_end > slot.start_time:
+                clash = accepted_interval
+            if clash is None:
+                if key != accepted_key or slot.end_time > accepted_end:
+                    accepted_key, accepted_end = key, slot.end_time
+                    accepted_interval = (slot.start_time, slot.end_time)
+            yield slot, clash
+
+
+def find_overlaps(rows):
+    """Yield (earlier, later) pairs of overlapping rows.
+
+    rows are (ground_id, date, start_time, end_time, ...) tuples ordered by
+    ground, date and start time; each later row is paired with the earlier
+    row that reaches furthest into the day.
+    """
+    for _, day_rows in groupby(rows, key=lambda row: row[:2]):
+        furthest = None
+        for row in day_rows:
+            if furthest is not None and row[2] < furthest[3]:
+                yield furthest, row
+            if furthest is None or row[3] > furthest[3]:
+                furthest = row
+
+
+def create_triggers():
+    """(Re)create the SQLite overlap triggers.
+
+    Returns False when the database needs none (PostgreSQL keeps its
+    exclusion constraint through table changes).
+    """
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        for statement in SQLITE_TRIGGERS:
+            cursor.execute(statement)
+    return True
@@ -0,0 +1,112 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are addressed by the sort key of their boundary rows instead of an
+OFFSET, so fetching page 1,000 costs the same single index range scan as
+fetching page 1. Cursors are opaque, URL-safe strings.
+"""
+
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    """Raised when a cursor cannot be decoded for the given queryset."""
+
+
+def encode_cursor(values):
+    payload = json.dumps([str(value) for value in values]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor, model, fields):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(raw, list) or len(raw) != len(fields):
+            raise ValueError('wrong number of values')
+        return [
+            model._meta.get_field(name).to_python(value)
+            for name, value in zip(fields, raw)
+        ]
+    except (ValueError, TypeError, ValidationError) as exc:
+        raise InvalidCursor(str(exc)) from exc
+
+
+def _beyond(fields, values, descending):
+    """Q for rows strictly after values in (fields, descending) order."""
+    lookup = 'lt' if descending else 'gt'
+    condition = Q()
+    for i, name in enumerate(fields):
+        step = Q(**{f'{name}__{lookup}': values[i]})
+        for prior, value in zip(fields[:i], values[:i]):
+            step &= Q(**{prior: value})
+        condition |= step
+    return condition
+
+
+class KeysetPage:
+    """One page of rows plus cursors for the neighbouring pages."""
+
+    def __init__(self, rows, fields, has_next, has_previous):
+        self.rows = rows
+        self.fields = fields
+        self.next_cursor = self._cursor(rows[-1]) if rows and has_next else None
+        self.previous_cursor = self._cursor(rows[0]) if rows and has_previous else None
+
+    def _cursor(self, row):
+        return encode_cursor(
+            row[name] if isinstance(row, dict) else getattr(row, name)
+            for name in self.fields
+        )
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+
+def _page_query(queryset, fields, after, before, page_size, descending):
+    """Return the queryset that fetches one page (plus one row to detect more)."""
+    prefix = '-' if descending else ''
+    order = [f'{prefix}{name}' for name in fields]
+    reverse_order = [f'{"" if descending else "-"}{name}' for name in fields]
+
+    if before:
+        values = decode_cursor(before, queryset.model, fields)
+        return queryset.filter(_beyond(fields, values, not descending)).order_by(*reverse_order)[:page_size + 1]
+
+    if after:
+        values = decode_cursor(after, queryset.model, fields)
+        queryset = queryset.filter(_beyond(fields, values, descending))
+    return queryset.order_by(*order)[:page_size + 1]
+
+
+def _make_page(rows, fields, after, before, page_size):
+    if before:
+        has_previous = len(rows) > page_size
+        return KeysetPage(rows[:page_size][::-1], fields, has_next=True, has_previous=has_previous)
+    has_next = len(rows) > page_size
+    return KeysetPage(rows[:page_size], fields, has_next=has_next, has_previous=bool(after))
+
+
+def keyset_paginate(queryset, fields, after=None, before=None, page_size=50, descending=True):
+    """Return the KeysetPage after (or before) a cursor.
+
+    ``fields`` must end with a unique column (normally ``id``) so the order is
+    total. Passing neither cursor returns the first page.
+    """
+    fields = list(fields)
+    rows = list(_page_query(queryset, fields, after, before, page_size, descending))
+    return _make_page(rows, fields, after, before, page_size)
+
+
+async def akeyset_paginate(queryset, fields, after=None, before=None, page_size=50, descending=True):
+    """Async version of keyset_paginate()."""
+    fields = list(fields)
+    rows = [row async for row in _page_query(queryset, fields, after, before, page_size, descending)]
+    return _make_page(rows, fields, after, before, page_size)
@@ -0,0 +1,249 @@
+"""
+Payment pipeline.
+
+The payment view only records a payment intent: a Pending ``Payment`` with
+the idempotency key of the form it came from, so a resubmitted form finds
+the intent it already made instead of charging twice. The booking's hold is
+extended meanwhile by PAYMENT_RETRY_AFTER on top of a fresh hold, so the
+gateway has time to decide; an intent that is never processed still lets
+its hold lapse. Once the transaction commits the intent is handed to a
+local pool of ``PAYMENT_WORKERS`` threads, and the request returns without
+waiting for the gateway; ``payment_success`` polls for the outcome.
+
+A worker claims the intent (Pending -> Processing, a conditional UPDATE),
+charges it through the gateway named by ``PAYMENT_GATEWAY`` and records the
+result: Paid confirms the booking, Failed restarts its hold so the user can
+try again. Gateways must treat the idempotency key the same way, so charging
+an intent twice (after a worker died mid-call) takes the money once.
+
+``manage.py process_payments`` picks up intents the pool never finished,
+after a restart or when ``PAYMENT_WORKERS`` is 0 and it runs as the worker.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from django.utils.module_loading import import_string
+
+from . import versions
+from .bookings import HoldExpired, confirm_booking, hold_deadline
+from .models import Booking, Payment
+
+# Intents left Processing this long are assumed abandoned and charged again
+PAYMENT_RETRY_AFTER = timedelta(minutes=5)
+
+PAYMENT_BATCH_SIZE = 500
+
+# Payment statuses the user waits on
+IN_FLIGHT_STATUSES = ['Pending', 'Processing']
+
+
+def new_idempotency_key():
+    return uuid.uuid4().hex
+
+
+# Gateways
+@dataclass
+class GatewayResult:
+    approved: bool
+    reference: str = ''
+    message: str = ''
+
+
+class GatewayError(Exception):
+    """Raised by a gateway when the outcome of a charge is unknown (e.g. a timeout)."""
+
+
+class FakeGateway:
+    """In-process gateway for development and tests.
+
+    Approves every charge except those paid with a method in decline_methods,
+    after sleeping latency seconds like a real round trip. Repeated keys get
+    the first result back.
+    """
+
+    def __init__(self, latency=0, decline_methods=()):
+        self.latency = latency
+        self.decline_methods = set(decline_methods)
+        self.charges = {}
+        self._lock = threading.Lock()
+
+    def charge(self, idempotency_key, amount, payment_method, description=''):
+        time.sleep(self.latency)
+        with self._lock:
+            if idempotency_key not in self.charges:
+                if payment_method in self.decline_methods:
+                    result = GatewayResult(False, message=f'{payment_method} payments were declined.')
+                else:
+                    result = GatewayResult(True, reference=f'fake-{len(self.charges) + 1}')
+                self.charges[idempotency_key] = (amount, result)
+            return self.charges[idempotency_key][1]
+
+    def refund(self, reference, amount):
+        time.sleep(self.latency)
+        return GatewayResult(True, reference=reference)
+
+
+def _load_gateway():
+    gateway_class = import_string(getattr(settings, 'PAYMENT_GATEWAY', 'ground_management.payments.FakeGateway'))
+    return gateway_class(**getattr(settings, 'PAYMENT_GATEWAY_OPTIONS', {}))
+
+
+gateway = SimpleLazyObject(_load_gateway)
+
+
+# Submitting
+def submit_payment(booking, payment_method, amount, idempotency_key):
+    """Record a payment intent for booking and queue it; return the Payment.
+
+    A key seen before returns its intent unchanged, as does a booking whose
+    payment is already in flight or paid. Raises HoldExpired if the booking's
+    hold lapsed.
+    """
+    existing = Payment.objects.filter(idempotency_key=idempotency_key, booking=booking).first()
+    if existing:
+        return existing
+    try:
+        with transaction.atomic():
+            # Extend the hold so it outlasts the charge and one retry of it. This
+            # write comes first so SQLite takes its write lock before reading.
+            if booking.status == 'Pending':
+                extended = Booking.objects.filter(pk=booking.pk, status='Pending').exclude(
+                    expires_at__lte=timezone.now()
+                ).update(expires_at=hold_deadline() + PAYMENT_RETRY_AFTER)
+                if not extended:
+                    raise HoldExpired(f'The hold on booking {booking.pk} has expired.')
+            payment = Payment.objects.select_for_update().filter(booking=booking).first()
+            if payment and payment.payment_status != 'Failed':
+                return payment
+
+            payment = payment or Payment(booking=booking)
+            payment.payment_method = payment_method
+            payment.amount = amount
+            payment.payment_status = 'Pending'
+            payment.idempotency_key = idempotency_key
+            payment.failure_reason = ''
+            payment.save()
+            transaction.on_commit(lambda: enqueue(payment.pk))
+    except IntegrityError:
+        # Another request made the booking's intent first
+        payment = Payment.objects.filter(booking=booking).first()
+        if payment is None:
+            raise
+    return payment
+
+
+# Processing
+def _claim(payment_id, now):
+    intent = Payment.objects.filter(pk=payment_id, idempotency_key__isnull=False)
+    claimed = intent.filter(payment_status='Pending').update(payment_status='Processing', attempted_at=now)
+    if not claimed:
+        # Or take over one a dead worker left Processing
+        claimed = intent.filter(
+            payment_status='Processing', attempted_at__lt=now - PAYMENT_RETRY_AFTER
+        ).update(attempted_at=now)
+    return claimed
+
+
+def process_payment(payment_id):
+    """Charge one payment intent and record the outcome.
+
+    Returns the payment's new status, or None if another worker has it.
+    """
+    if not _claim(payment_id, timezone.now()):
+        return None
+    payment = Payment.objects.select_related('booking__slot__ground').get(pk=payment_id)
+    booking = payment.booking
+    try:
+        result = gateway.charge(
+            payment.idempotency_key,
+            payment.amount,
+            payment.payment_method,
+            f'Booking {booking.pk}: {booking.slot}',
+        )
+    except GatewayError as exc:
+        # Unknown outcome: leave it to the next attempt under the same key
+        Payment.objects.filter(pk=payment_id, payment_status='Processing').update(
+            payment_status='Pending', failure_reason=str(exc)[:200]
+        )
+        return 'Pending'
+
+    refund = False
+    with transaction.atomic():
+        if result.approved:
+            payment.gateway_reference = result.reference
+            try:
+                if booking.status == 'Cancelled':
+                    raise HoldExpired(f'Booking {booking.pk} was cancelled.')
+                confirm_booking(booking)
+                payment.payment_status = 'Paid'
+            except HoldExpired:
+                # Cancelled while the charge was in flight
+                refund = True
+        else:
+            payment.payment_status = 'Failed'
+            payment.failure_reason = result.message[:200]
+            # Give the user a fresh hold to try another method
+            Booking.objects.filter(pk=booking.pk, status='Pending').update(
+                expires_at=hold_deadline()
+            )
+        if not refund:
+            _record(payment)
+    if refund:
+        # A gateway round trip, so outside the transaction like the charge. If
+        # it raises, the intent stays Processing and a retry refunds it.
+        gateway.refund(result.reference, payment.amount)
+        payment.payment_status = 'Refunded'
+        with transaction.atomic():
+            _record(payment)
+    return payment.payment_status
+
+
+def _record(payment):
+    # save() keeps the revenue rollup in step
+    payment.save()
+    versions.touch('bookings', payment.booking.user_id)
+
+
+def _run(payment_id):
+    close_old_connections()
+    try:
+        process_payment(payment_id)
+    finally:
+        # Worker threads must not keep connections open between intents
+        connection.close()
+
+
+def _load_pool():
+    return ThreadPoolExecutor(max_workers=settings.PAYMENT_WORKERS, thread_name_prefix='payments')
+
+
+pool = SimpleLazyObject(_load_pool)
+
+
+def enqueue(payment_id):
+    """Hand an intent to the worker pool, unless process_payments does the work."""
+    if settings.PAYMENT_WORKERS:
+        return pool.submit(_run, payment_id)
+    return None
+
+
+def process_pending(now=None, batch_size=PAYMENT_BATCH_SIZE):
+    """Process waiting intents, oldest first, in this thread; return how many were processed."""
+    now = now or timezone.now()
+    intents = Payment.objects.filter(idempotency_key__isnull=False)
+    payment_ids = list(
+        (
+            intents.filter(payment_status='Pending')
+            | intents.filter(payment_status='Processing', attempted_at__lt=now - PAYMENT_RETRY_AFTER)
+        ).order_by('payment_date').values_list('id', flat=True)[:batch_size]
+    )
+    return sum(1 for payment_id in payment_ids if process_payment(payment_id))
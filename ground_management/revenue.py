@@ -0,0 +1,153 @@
+"""
+Daily revenue rollup.
+
+Paid payments are folded into ``DailyRevenue`` rows (one per ground, day and
+payment method) as they are saved, refunded or deleted, so the revenue report
+can read a handful of small aggregate rows instead of joining every payment
+back to its slot and ground.
+"""
+
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import ArchivedPayment, DailyRevenue, Ground, Payment
+
+# Report grouping options and how each one truncates the rollup date
+GROUP_BY_CHOICES = [
+    ('day', 'Day'),
+    ('week', 'Week'),
+    ('month', 'Month'),
+]
+
+PERIOD_EXPRESSIONS = {
+    'day': lambda: F('date'),
+    'week': lambda: TruncWeek('date'),
+    'month': lambda: TruncMonth('date'),
+}
+
+
+def payment_contribution(ground_id, payment_date, payment_method, payment_status, amount):
+    """Return the (key, amount) a payment adds to the rollup, or None if unpaid."""
+    if payment_status != 'Paid' or payment_date is None or ground_id is None:
+        return None
+    key = (ground_id, timezone.localdate(payment_date), payment_method)
+    return key, Decimal(amount)
+
+
+def apply_delta(key, amount, count):
+    """Add amount/count to the rollup row for key, creating it if needed."""
+    ground_id, date, payment_method = key
+    rows = DailyRevenue.objects.filter(ground_id=ground_id, date=date, payment_method=payment_method)
+    with transaction.atomic():
+        updated = rows.update(amount=F('amount') + amount, payment_count=F('payment_count') + count)
+        if updated or count < 0:
+            # Removals never create rows; a missing row means the ground is being deleted
+            return
+        try:
+            with transaction.atomic():
+                DailyRevenue.objects.create(
+                    ground_id=ground_id,
+                    date=date,
+                    payment_method=payment_method,
+                    amount=amount,
+                    payment_count=count,
+                )
+        except IntegrityError:
+            # Another writer created the row first
+            rows.update(amount=F('amount') + amount, payment_count=F('payment_count') + count)
+
+
+def apply_change(previous, current):
+    """Move a payment's contribution from its previous state to its current one."""
+    if previous == current:
+        return
+    if previous is not None:
+        apply_delta(previous[0], -previous[1], -1)
+    if current is not None:
+        apply_delta(current[0], current[1], 1)
+
+
+def rebuild_daily_revenue(start_date=None, end_date=None):
+    """Recompute rollup rows from payments, optionally limited to a date range.
+
+    Archived payments count too. Returns the number of rollup rows written.
+    """
+    rollups = DailyRevenue.objects.all()
+    if start_date:
+        rollups = rollups.filter(date__gte=start_date)
+    if end_date:
+        rollups = rollups.filter(date__lte=end_date)
+
+    totals = {}
+    for model in (Payment, ArchivedPayment):
+        payments = model.objects.filter(payment_status='Paid').annotate(day=TruncDate('payment_date'))
+        if start_date:
+            payments = payments.filter(day__gte=start_date)
+        if end_date:
+            payments = payments.filter(day__lte=end_date)
+        rows = payments.values(
+            'day', 'payment_method', ground_id=F('booking__slot__ground_id')
+        ).annotate(total=Sum('amount'), count=Count('id')).order_by()
+        for row in rows.iterator():
+            key = (row['ground_id'], row['day'], row['payment_method'])
+            amount, count = totals.get(key, (0, 0))
+            totals[key] = (amount + row['total'], count + row['count'])
+
+    with transaction.atomic():
+        rollups.delete()
+        rows = DailyRevenue.objects.bulk_create(
+            (
+                DailyRevenue(
+                    ground_id=ground_id,
+                    date=day,
+                    payment_method=payment_method,
+                    amount=amount,
+                    payment_count=count,
+                )
+                for (ground_id, day, payment_method), (amount, count) in totals.items()
+            ),
+            batch_size=1000,
+        )
+    return len(rows)
+
+
+def revenue_summary(start_date=None, end_date=None, group_by='month'):
+    """Return total, per-ground and per-period revenue from the rollup.
+
+    Runs three queries regardless of how many grounds or payments exist.
+    """
+    rollups = DailyRevenue.objects.all()
+    in_range = Q()
+    if start_date:
+        rollups = rollups.filter(date__gte=start_date)
+        in_range &= Q(daily_revenue__date__gte=start_date)
+    if end_date:
+        rollups = rollups.filter(date__lte=end_date)
+        in_range &= Q(daily_revenue__date__lte=end_date)
+
+    total_revenue = rollups.aggregate(total=Sum('amount'))['total'] or 0
+
+    in_range = in_range or None
+    by_ground = Ground.objects.annotate(
+        total_revenue=Sum('daily_revenue__amount', filter=in_range),
+        payment_count=Sum('daily_revenue__payment_count', filter=in_range),
+    ).filter(total_revenue__gt=0).order_by('-total_revenue', 'name')
+
+    period = PERIOD_EXPRESSIONS.get(group_by, PERIOD_EXPRESSIONS['month'])()
+    by_period = rollups.annotate(period=period).values('period').annotate(
+        total_revenue=Sum('amount'),
+        payment_count=Sum('payment_count'),
+    ).order_by('period')
+
+    return {
+        'total_revenue': total_revenue,
+        'revenue_data': [
+            {'ground': ground, 'total_revenue': ground.total_revenue, 'payment_count': ground.payment_count}
+            for ground in by_ground
+        ],
+        'period_data': list(by_period),
+    }
@@ -0,0 +1,216 @@
+"""
+Recurring slot schedules.
+
+A schedule describes slots by rule instead of one by one: a set of grounds,
+the weekdays they open, daily time ranges, a slot length, a date range and
+price rules. ``expand_schedule`` turns it into ``Slot`` objects lazily and
+``create_schedule_slots`` inserts them in batches, skipping any slot that
+overlaps one already stored (or an earlier slot of the same schedule).
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.db import transaction
+
+from . import availability, bitmaps, counters
+from .overlaps import check_slots
+from .models import Slot
+
+WEEKDAY_CHOICES = [
+    ('0', 'Mon'),
+    ('1', 'Tue'),
+    ('2', 'Wed'),
+    ('3', 'Thu'),
+    ('4', 'Fri'),
+    ('5', 'Sat'),
+    ('6', 'Sun'),
+]
+
+WEEKDAY_NUMBERS = {label.lower(): int(value) for value, label in WEEKDAY_CHOICES}
+
+
+@dataclass(frozen=True)
+class PriceRule:
+    """Price for slots starting in [start_time, end_time) on the given weekdays."""
+    start_time: time
+    end_time: time
+    price: Decimal
+    weekdays: frozenset = frozenset(range(7))
+
+    def matches(self, weekday, start_time):
+        return weekday in self.weekdays and self.start_time <= start_time < self.end_time
+
+
+@dataclass
+class Schedule:
+    grounds: list
+    start_date: date
+    end_date: date
+    weekdays: set
+    time_ranges: list
+    slot_minutes: int
+    price_per_slot: Decimal
+    price_rules: list = field(default_factory=list)
+
+    def daily_slots(self):
+        """Return (start_time, end_time) pairs that fit in the daily time ranges."""
+        length = timedelta(minutes=self.slot_minutes)
+        slots = []
+        for range_start, range_end in self.time_ranges:
+            current = datetime.combine(date.min, range_start)
+            end = datetime.combine(date.min, range_end)
+            while current + length <= end:
+                slots.append((current.time(), (current + length).time()))
+                current += length
+        return sorted(slots)
+
+    def price_for(self, weekday, start_time):
+        for rule in self.price_rules:
+            if rule.matches(weekday, start_time):
+                return rule.price
+        return self.price_per_slot
+
+    def dates(self):
+        current = self.start_date
+        while current <= self.end_date:
+            if current.weekday() in self.weekdays:
+                yield current
+            current += timedelta(days=1)
+
+    def slot_count(self):
+        return len(self.grounds) * sum(1 for _ in self.dates()) * len(self.daily_slots())
+
+
+def parse_time_ranges(text):
+    """Parse '06:00-10:00, 16:00-22:00' into a list of (start, end) times."""
+    ranges = []
+    for chunk in text.replace('\n', ',').split(','):
+        chunk = chunk.strip()
+        if not chunk:
+            continue
+        ranges.append(_parse_range(chunk))
+    if not ranges:
+        raise ValueError('Enter at least one time range.')
+    return ranges
+
+
+def parse_price_rules(text):
+    """Parse one rule per line: '[Sat,Sun] 18:00-22:00 = 1500'."""
+    rules = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if '=' not in line:
+            raise ValueError(f'"{line}": expected "[days] HH:MM-HH:MM = price".')
+        spec, price = (part.strip() for part in line.rsplit('=', 1))
+        try:
+            price = Decimal(price)
+        except ArithmeticError:
+            raise ValueError(f'"{line}": "{price}" is not a valid price.')
+        if price < 0:
+            raise ValueError(f'"{line}": price cannot be negative.')
+
+        weekdays = frozenset(range(7))
+        parts = spec.split()
+        if len(parts) == 2:
+            weekdays = _parse_weekdays(parts[0], line)
+            parts = parts[1:]
+        if len(parts) != 1:
+            raise ValueError(f'"{line}": expected "[days] HH:MM-HH:MM = price".')
+        start_time, end_time = _parse_range(parts[0])
+        rules.append(PriceRule(start_time, end_time, price, weekdays))
+    return rules
+
+
+def _parse_range(text):
+    try:
+        start, end = (datetime.strptime(part.strip(), '%H:%M').time() for part in text.split('-'))
+    except ValueError:
+        raise ValueError(f'"{text}" is not a valid time range; use HH:MM-HH:MM.')
+    if start >= end:
+        raise ValueError(f'"{text}": start time must be before end time.')
+    return start, end
+
+
+def _parse_weekdays(text, line):
+    weekdays = set()
+    for name in text.split(','):
+        number = WEEKDAY_NUMBERS.get(name.strip().lower()[:3])
+        if number is None:
+            raise ValueError(f'"{line}": unknown weekday "{name}".')
+        weekdays.add(number)
+    return frozenset(weekdays)
+
+
+def _expand_rows(schedule):
+    daily_slots = schedule.daily_slots()
+    for ground in schedule.grounds:
+        for slot_date in schedule.dates():
+            weekday = slot_date.weekday()
+            for start_time, end_time in daily_slots:
+                yield ground, slot_date, start_time, end_time, schedule.price_for(weekday, start_time)
+
+
+def _build_slot(ground, slot_date, start_time, end_time, price):
+    # Keep Ground instances attached so previews can show names without queries
+    ground_field = {'ground': ground} if hasattr(ground, 'pk') else {'ground_id': ground}
+    return Slot(
+        **ground_field,
+        date=slot_date,
+        start_time=start_time,
+        end_time=end_time,
+        price_per_slot=price,
+        availability_status='Available'
+    )
+
+
+def expand_schedule(schedule):
+    """Yield unsaved Slot objects for every ground, date and daily slot."""
+    for row in _expand_rows(schedule):
+        yield _build_slot(*row)
+
+
+def preview_schedule(schedule, limit=50):
+    """Summarise what committing the schedule would do, without writing anything."""
+    sample = []
+    conflicts = 0
+    total = 0
+    for slot, clash in check_slots(expand_schedule(schedule)):
+        total += 1
+        if clash is not None:
+            conflicts += 1
+        elif len(sample) < limit:
+            sample.append(slot)
+    return {
+        'total': total,
+        'conflicts': conflicts,
+        'to_create': total - conflicts,
+        'sample': sample,
+    }
+
+
+def create_schedule_slots(schedule, batch_size=5000):
+    """Insert the schedule's slots in batches; overlapping slots are skipped.
+
+    Returns the number of slots created.
+    """
+    created = 0
+    slots = (slot for slot, clash in check_slots(expand_schedule(schedule), batch_size) if clash is None)
+    with transaction.atomic():
+        while True:
+            batch = list(islice(slots, batch_size))
+            if not batch:
+                break
+            Slot.objects.bulk_create(batch, batch_size=batch_size)
+            created += len(batch)
+        # bulk_create sends no signals, so update derived availability explicitly
+        ground_ids = [getattr(ground, 'pk', ground) for ground in schedule.grounds]
+        bitmaps.rebuild_bitmaps(ground_ids, schedule.start_date, schedule.end_date, batch_size)
+        for ground_id in ground_ids:
+            availability.invalidate_ground(ground_id)
+        counters.add('slots', created)
+    return created
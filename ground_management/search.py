@@ -0,0 +1,211 @@
+"""
+Ranked, typo-tolerant ground search over name, sport type, location and
+description.
+
+PostgreSQL uses a GIN index on a tsvector expression for ranked word and
+prefix matches, and pg_trgm indexes for misspellings: one on the name, matched
+as a whole, and one on the same text as the tsvector (migration 0013), matched
+word by word. SQLite uses
+an FTS5 table (``ground_search``) that triggers keep in step with every
+insert, update and delete on the ground table, ranked with bm25; a misspelt
+word is replaced by the words in the index vocabulary (``ground_search_vocab``)
+that share its first letter and are within a small edit distance. Both are
+created by migration 0004. Other databases fall back to unindexed
+``icontains`` filtering.
+
+SQLite drops triggers when a migration rebuilds the table, so run
+``manage.py rebuild_search_index`` after altering ``Ground``.
+"""
+
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Ground
+
+SEARCH_LIMIT = 50
+
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+GROUND_TABLE = Ground._meta.db_table
+
+# Kept identical to the index expressions in migrations 0004 and 0013 so the planner uses them
+PG_TEXT = (
+    "(coalesce(g.name, '') || ' ' || coalesce(g.sport_type, '') || ' ' "
+    "|| coalesce(g.location, '') || ' ' || coalesce(g.description, ''))"
+)
+PG_DOCUMENT = f"to_tsvector('simple', {PG_TEXT})"
+
+SQLITE_SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS ground_search USING fts5(
+        name, sport_type, location, description,
+        content='{GROUND_TABLE}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    "CREATE VIRTUAL TABLE IF NOT EXISTS ground_search_vocab USING fts5vocab(ground_search, 'row')",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS ground_search_ai AFTER INSERT ON {GROUND_TABLE} BEGIN
+        INSERT INTO ground_search(rowid, name, sport_type, location, description)
+        VALUES (new.id, new.name, new.sport_type, new.location, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS ground_search_ad AFTER DELETE ON {GROUND_TABLE} BEGIN
+        INSERT INTO ground_search(ground_search, rowid, name, sport_type, location, description)
+        VALUES ('delete', old.id, old.name, old.sport_type, old.location, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS ground_search_au AFTER UPDATE ON {GROUND_TABLE} BEGIN
+        INSERT INTO ground_search(ground_search, rowid, name, sport_type, location, description)
+        VALUES ('delete', old.id, old.name, old.sport_type, old.location, old.description);
+        INSERT INTO ground_search(rowid, name, sport_type, location, description)
+        VALUES (new.id, new.name, new.sport_type, new.location, new.description);
+    END
+    """,
+]
+
+# bm25 column weights: name, sport type, location, description
+SQLITE_WEIGHTS = '10.0, 4.0, 4.0, 1.0'
+
+
+def search_terms(query):
+    """Split a query into lower-case words without accents; punctuation is ignored."""
+    # Mirror the index tokenizer (unicode61 remove_diacritics)
+    text = unicodedata.normalize('NFKD', query or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return [term.lower() for term in TERM_RE.findall(text)]
+
+
+def search_grounds(query, sport_type='', location='', limit=SEARCH_LIMIT):
+    """Return up to limit grounds matching query, best match first.
+
+    sport_type and location are exact filters, as offered by the ground list
+    dropdowns.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+    if connection.vendor == 'postgresql':
+        return _search_postgresql(terms, sport_type, location, limit)
+    if connection.vendor == 'sqlite':
+        return _search_sqlite(terms, sport_type, location, limit)
+    return _search_fallback(terms, sport_type, location, limit)
+
+
+def rebuild_index():
+    """(Re)create the SQLite search table and triggers and reindex every ground.
+
+    Returns the number of grounds indexed, or None when the database needs no
+    rebuild (PostgreSQL indexes are maintained by the database itself).
+    """
+    if connection.vendor != 'sqlite':
+        return None
+    with connection.cursor() as cursor:
+        for statement in SQLITE_SCHEMA:
+            cursor.execute(statement)
+        cursor.execute("INSERT INTO ground_search(ground_search) VALUES ('rebuild')")
+    return Ground.objects.count()
+
+
+def _filters(sport_type, location):
+    clauses, params = [], []
+    if sport_type:
+        clauses.append('g.sport_type = %s')
+        params.append(sport_type)
+    if location:
+        clauses.append('g.location = %s')
+        params.append(location)
+    return ''.join(f' AND {clause}' for clause in clauses), params
+
+
+def _search_postgresql(terms, sport_type, location, limit):
+    tsquery = ' & '.join(f'{term}:*' for term in terms)
+    text = ' '.join(terms)
+    # Every word has to be close to some word of the ground, as on SQLite
+    fuzzy = ' AND '.join(f'%s <%% {PG_TEXT}' for _ in terms)
+    filters, params = _filters(sport_type, location)
+    sql = f"""
+        SELECT g.* FROM {GROUND_TABLE} g
+        WHERE ({PG_DOCUMENT} @@ to_tsquery('simple', %s) OR g.name %% %s OR ({fuzzy})){filters}
+        ORDER BY ts_rank({PG_DOCUMENT}, to_tsquery('simple', %s)) + similarity(g.name, %s) DESC, g.id
+        LIMIT %s
+    """
+    return list(Ground.objects.raw(sql, [tsquery, text, *terms, *params, tsquery, text, limit]))
+
+
+def _search_sqlite(terms, sport_type, location, limit):
+    with connection.cursor() as cursor:
+        match = ' AND '.join(_sqlite_term(cursor, term) for term in terms)
+    filters, params = _filters(sport_type, location)
+    sql = f"""
+        SELECT g.* FROM ground_search
+        JOIN {GROUND_TABLE} g ON g.id = ground_search.rowid
+        WHERE ground_search MATCH %s{filters}
+        ORDER BY bm25(ground_search, {SQLITE_WEIGHTS}), g.id
+        LIMIT %s
+    """
+    return list(Ground.objects.raw(sql, [match, *params, limit]))
+
+
+def _sqlite_term(cursor, term):
+    """Turn one word into an FTS5 expression, correcting it if nothing matches."""
+    # Words are \w+ runs, so quoting is enough to keep them literal
+    cursor.execute(
+        'SELECT 1 FROM ground_search_vocab WHERE term >= %s AND term < %s LIMIT 1',
+        [term, term + '\uffff']
+    )
+    if cursor.fetchone() or len(term) < 3 or term.isdigit():
+        return f'"{term}"*'
+
+    # Only words sharing the first letter are compared: a range scan of the
+    # vocabulary instead of a pass over every distinct word in the index
+    max_distance = 1 if len(term) <= 5 else 2
+    cursor.execute(
+        'SELECT term FROM ground_search_vocab WHERE term >= %s AND term < %s',
+        [term[0], term[0] + '\uffff']
+    )
+    candidates = [
+        candidate for (candidate,) in cursor.fetchall()
+        if edit_distance(term, candidate, max_distance) <= max_distance
+    ]
+    if not candidates:
+        return f'"{term}"*'
+    return '(' + ' OR '.join(f'"{candidate}"' for candidate in candidates) + ')'
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance between a and b, or limit + 1 once it exceeds limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _search_fallback(terms, sport_type, location, limit):
+    grounds = Ground.objects.all()
+    for term in terms:
+        grounds = grounds.filter(
+            Q(name__icontains=term) | Q(location__icontains=term)
+            | Q(sport_type__icontains=term) | Q(description__icontains=term)
+        )
+    if sport_type:
+        grounds = grounds.filter(sport_type=sport_type)
+    if location:
+        grounds = grounds.filter(location=location)
+    return list(grounds.order_by('-rating', 'pk')[:limit])
@@ -0,0 +1,44 @@
+from rest_framework import serializers
+
+from .models import Booking, Ground, Slot
+
+
+class FieldSelectionMixin:
+    """Serializer that can be limited to the field names passed as ``fields``."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields:
+            unknown = set(fields) - set(self.fields)
+            if unknown:
+                raise serializers.ValidationError({
+                    'fields': f'Unknown field(s): {", ".join(sorted(unknown))}.'
+                })
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class GroundSerializer(FieldSelectionMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Ground
+        fields = ['id', 'name', 'location', 'sport_type', 'rating', 'description', 'image']
+
+
+class SlotSerializer(FieldSelectionMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Slot
+        fields = ['id', 'ground', 'date', 'start_time', 'end_time', 'price_per_slot', 'availability_status']
+
+
+class BookingSerializer(FieldSelectionMixin, serializers.ModelSerializer):
+    slot = SlotSerializer(read_only=True)
+    ground_name = serializers.CharField(source='slot.ground.name', read_only=True)
+    payment_status = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Booking
+        fields = ['id', 'status', 'booking_date', 'slot', 'ground_name', 'payment_status']
+
+    def get_payment_status(self, booking):
+        # hasattr() is False when the reverse one-to-one has no row
+        return booking.payment.payment_status if hasattr(booking, 'payment') else None
@@ -0,0 +1,233 @@
+"""Model signal handlers keeping derived data in step with the core tables."""
+
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Count, Q, Sum
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import availability, bitmaps, counters, facets, live, revenue, versions
+from .models import ArchivedBooking, ArchivedPayment, ArchivedSlot, Booking, Ground, Payment, Slot
+
+# Counter each model's rows add to
+COUNTED_MODELS = {
+    Ground: 'grounds',
+    Slot: 'slots',
+    ArchivedSlot: 'slots',
+    Booking: 'bookings',
+    ArchivedBooking: 'bookings',
+}
+
+
+def _paid_amount(payment_status, amount):
+    return Decimal(amount) if payment_status == 'Paid' else 0
+
+
+def _ground_cascade(origin):
+    # Rows deleted along with a ground are accounted for by subtract_ground_rows
+    return getattr(origin, 'model', type(origin)) is Ground
+
+
+def _payment_ground_id(payment):
+    try:
+        return payment.booking.slot.ground_id
+    except ObjectDoesNotExist:
+        return None
+
+
+@receiver(pre_save, sender=Payment)
+def remember_payment_contribution(sender, instance, raw=False, **kwargs):
+    """Capture what the stored row contributed before it is overwritten."""
+    instance._revenue_previous = None
+    instance._paid_previous = 0
+    if raw or instance.pk is None:
+        return
+    previous = sender.objects.filter(pk=instance.pk).values(
+        'payment_date', 'payment_method', 'payment_status', 'amount'
+    ).first()
+    if previous:
+        instance._paid_previous = _paid_amount(previous['payment_status'], previous['amount'])
+        instance._revenue_previous = revenue.payment_contribution(
+            _payment_ground_id(instance), **previous
+        )
+
+
+@receiver(post_save, sender=Payment)
+def update_revenue_rollup(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    current = revenue.payment_contribution(
+        _payment_ground_id(instance),
+        instance.payment_date,
+        instance.payment_method,
+        instance.payment_status,
+        instance.amount,
+    )
+    revenue.apply_change(getattr(instance, '_revenue_previous', None), current)
+    counters.add(
+        'revenue',
+        _paid_amount(instance.payment_status, instance.amount) - getattr(instance, '_paid_previous', 0)
+    )
+
+
+@receiver(post_delete, sender=Payment)
+def remove_from_revenue_rollup(sender, instance, origin=None, **kwargs):
+    # A ground's rollup rows are deleted with it
+    if _ground_cascade(origin):
+        return
+    previous = revenue.payment_contribution(
+        _payment_ground_id(instance),
+        instance.payment_date,
+        instance.payment_method,
+        instance.payment_status,
+        instance.amount,
+    )
+    revenue.apply_change(previous, None)
+
+
+@receiver(post_delete, sender=Payment)
+@receiver(post_delete, sender=ArchivedPayment)
+def count_deleted_payment(sender, instance, origin=None, **kwargs):
+    if _ground_cascade(origin):
+        return
+    counters.add('revenue', -_paid_amount(instance.payment_status, instance.amount))
+
+
+@receiver(pre_save, sender=Slot)
+def remember_slot_day(sender, instance, raw=False, **kwargs):
+    """Remember where an edited slot was, in case its ground or date changes."""
+    instance._availability_previous = None
+    if raw or instance.pk is None:
+        return
+    instance._availability_previous = sender.objects.filter(pk=instance.pk).values_list(
+        'ground_id', 'date'
+    ).first()
+
+
+@receiver(post_save, sender=Slot)
+def invalidate_slot_availability(sender, instance, raw=False, **kwargs):
+    days = [(instance.ground_id, instance.date)]
+    availability.invalidate_day(instance.ground_id, instance.date)
+    if not raw:
+        live.publish_slot(instance)
+    previous = getattr(instance, '_availability_previous', None)
+    if previous and previous != (instance.ground_id, instance.date):
+        days.append(previous)
+        availability.invalidate_day(*previous)
+        live.publish_slot(instance, 'Removed', *previous)
+    bitmaps.refresh_days(days)
+
+
+@receiver(post_delete, sender=Slot)
+def invalidate_deleted_slot_availability(sender, instance, origin=None, **kwargs):
+    availability.invalidate_day(instance.ground_id, instance.date)
+    live.publish_slot(instance, 'Removed')
+    # Deleting a ground takes its bitmaps with it
+    if not _ground_cascade(origin):
+        bitmaps.refresh_days([(instance.ground_id, instance.date)])
+
+
+@receiver(post_save, sender=Ground)
+@receiver(post_delete, sender=Ground)
+def invalidate_ground_caches(sender, instance, **kwargs):
+    facets.invalidate()
+    # Cached slots carry their ground, so a rename must not serve old names
+    availability.invalidate_ground(instance.pk)
+
+
+@receiver(pre_delete, sender=Ground)
+def subtract_ground_rows(sender, instance, **kwargs):
+    """Take a ground's slots, bookings and payments off the counters before it is deleted.
+
+    One grouped query per table, however many rows the delete cascades to.
+    """
+    slots = Slot.objects.filter(ground=instance).count() + ArchivedSlot.objects.filter(ground=instance).count()
+    bookings = Booking.objects.filter(slot__ground=instance).values('user_id').annotate(count=Count('pk'))
+    archived = ArchivedBooking.objects.filter(slot__ground=instance).aggregate(count=Count('pk'))['count']
+    paid = Q(payment_status='Paid')
+    revenue = sum(
+        (
+            model.objects.filter(paid, booking__slot__ground=instance).aggregate(total=Sum('amount'))['total'] or 0
+            for model in (Payment, ArchivedPayment)
+        ),
+        Decimal(0)
+    )
+    counters.add('slots', -slots)
+    counters.add('bookings', -(sum(row['count'] for row in bookings) + archived))
+    counters.add('revenue', -revenue)
+    for row in bookings:
+        versions.touch('bookings', row['user_id'])
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def touch_user_bookings(sender, instance, origin=None, **kwargs):
+    if not _ground_cascade(origin):
+        versions.touch('bookings', instance.user_id)
+
+
+@receiver(post_save, sender=Slot)
+@receiver(post_save, sender=Ground)
+def touch_booked_users(sender, instance, created, raw=False, **kwargs):
+    """Bookings show their slot and ground name, so an edit changes their users' lists."""
+    if created or raw:
+        return
+    bookings = Booking.objects.filter(**{'slot' if sender is Slot else 'slot__ground': instance})
+    for user_id in bookings.values_list('user_id', flat=True).distinct():
+        versions.touch('bookings', user_id)
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def touch_payment_bookings(sender, instance, origin=None, **kwargs):
+    if _ground_cascade(origin):
+        return
+    try:
+        versions.touch('bookings', instance.booking.user_id)
+    except ObjectDoesNotExist:
+        pass
+
+
+@receiver(post_save, sender=Ground)
+@receiver(post_save, sender=Slot)
+@receiver(post_save, sender=Booking)
+def count_created_row(sender, instance, created, **kwargs):
+    if created:
+        counters.add(COUNTED_MODELS[sender], 1)
+
+
+@receiver(post_delete, sender=Ground)
+@receiver(post_delete, sender=Slot)
+@receiver(post_delete, sender=ArchivedSlot)
+@receiver(post_delete, sender=Booking)
+@receiver(post_delete, sender=ArchivedBooking)
+def count_deleted_row(sender, instance, origin=None, **kwargs):
+    if sender is not Ground and _ground_cascade(origin):
+        return
+    counters.add(COUNTED_MODELS[sender], -1)
+
+
+@receiver(pre_save, sender=User)
+def remember_player(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Remember whether the stored user counted as a player, in case is_staff changes."""
+    instance._player_previous = None
+    # Logins save last_login alone, and must not pay for this
+    if raw or instance.pk is None or (update_fields is not None and 'is_staff' not in update_fields):
+        return
+    instance._player_previous = sender.objects.filter(pk=instance.pk, is_staff=False).exists()
+
+
+@receiver(post_save, sender=User)
+def count_players(sender, instance, created, **kwargs):
+    if created:
+        counters.add('players', int(not instance.is_staff))
+    elif getattr(instance, '_player_previous', None) is not None:
+        counters.add('players', int(not instance.is_staff) - instance._player_previous)
+
+
+@receiver(post_delete, sender=User)
+def count_deleted_player(sender, instance, **kwargs):
+    if not instance.is_staff:
+        counters.add('players', -1)
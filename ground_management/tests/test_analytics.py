@@ -0,0 +1,120 @@
+import io
+from datetime import datetime, time as dtime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..analytics import analytics_summary, rebuild_booking_stats
+from ..archive import archive_history
+from ..lifecycle import sweep
+from ..models import Booking, DailyBookingStats, Ground, Payment, Slot
+
+
+@override_settings(ARCHIVE_RETENTION_DAYS=30)
+class AnalyticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', password='secret123', is_staff=True)
+        cls.player = User.objects.create_user('player', password='secret123')
+        cls.ground = Ground.objects.create(name='Green Field', location='Downtown', sport_type='Cricket')
+        cls.today = timezone.localdate()
+        # Two months back: (days ago, days booked in advance, status, paid)
+        cls.start = cls.today - timedelta(days=59)
+        for hour, (days_ago, lead, status, paid) in enumerate([
+            (50, 3, 'Confirmed', True),
+            (50, 10, 'Cancelled', False),
+            (40, 1, 'Confirmed', True),
+            (20, 3, 'Confirmed', True),
+            (20, 0, 'Pending', False),
+            (5, 7, 'Confirmed', True),
+        ]):
+            day = cls.today - timedelta(days=days_ago)
+            slot = Slot.objects.create(
+                ground=cls.ground, date=day, start_time=dtime(6 + hour), end_time=dtime(7 + hour),
+                price_per_slot=1000, availability_status='Booked'
+            )
+            booking = Booking.objects.create(user=cls.player, slot=slot, status=status)
+            booked_at = timezone.make_aware(datetime.combine(day - timedelta(days=lead), dtime(12)))
+            Booking.objects.filter(pk=booking.pk).update(booking_date=booked_at)
+            if paid:
+                Payment.objects.create(booking=booking, amount=1000, payment_method='UPI', payment_status='Paid')
+
+    def summary(self, group_by='month'):
+        return analytics_summary(self.start, self.today, group_by)
+
+    def test_live_summary(self):
+        summary = self.summary()
+        self.assertEqual(summary['totals'], {
+            'revenue': 4000.0, 'payments': 4, 'bookings': 6, 'cancelled': 1, 'cancellation_rate': 16.67
+        })
+        # Cancelled bookings do not count towards lead times
+        self.assertEqual(summary['lead_time']['days'], [0, 1, 3, 7, 10])
+        self.assertEqual(summary['lead_time']['bookings'], [1, 1, 2, 1, 0])
+        self.assertEqual(
+            (summary['lead_time']['mean'], summary['lead_time']['median'], summary['lead_time']['p90']), (2.8, 3, 7)
+        )
+
+        daily = summary['daily']
+        self.assertEqual(len(daily['date']), 60)
+        day = daily['date'].index((self.today - timedelta(days=50)).isoformat())
+        self.assertEqual((daily['bookings'][day], daily['bookings_7d'][day + 6]), (2, round(2 / 7, 2)))
+        # Payments were made today, so all revenue lands on the last day
+        self.assertEqual((daily['revenue'][-1], daily['revenue_28d'][-1]), (4000.0, round(4000 / 28, 2)))
+
+        periods = self.summary('week')['periods']
+        self.assertEqual(sum(periods['bookings']), 6)
+        self.assertTrue(all(datetime.fromisoformat(start).weekday() == 0 for start in periods['start'][1:]))
+        periods = summary['periods']
+        self.assertEqual(periods['start'][0], self.start.replace(day=1).isoformat())
+        self.assertTrue(all(start.endswith('-01') for start in periods['start']))
+
+    def test_swept_days_come_from_the_rollup(self):
+        live = self.summary()
+        sweep()
+        self.assertTrue(DailyBookingStats.objects.exists())
+        self.assertEqual(Booking.objects.filter(status='Cancelled').count(), 2)
+        summary = self.summary()
+        self.assertEqual(summary['totals']['cancelled'], 2)
+        self.assertEqual(summary['lead_time']['bookings'], [0, 1, 2, 1, 0])
+        self.assertEqual(summary['daily']['revenue'], live['daily']['revenue'])
+
+        # Revenue, the last sweep, the rollup and the live days after it
+        with self.assertNumQueries(4):
+            self.summary()
+
+        # Archived bookings are rebuilt from the archive
+        self.assertEqual(archive_history().bookings, 3)
+        rows = list(DailyBookingStats.objects.values_list('date', 'lead_days', 'bookings', 'cancelled'))
+        self.assertEqual(rebuild_booking_stats(), len(rows))
+        self.assertEqual(list(DailyBookingStats.objects.values_list('date', 'lead_days', 'bookings', 'cancelled')), rows)
+        self.assertEqual(self.summary()['totals'], summary['totals'])
+
+    def test_empty_window(self):
+        summary = analytics_summary(self.today + timedelta(days=10), self.today + timedelta(days=20), 'week')
+        self.assertEqual(summary['totals']['bookings'], 0)
+        self.assertIsNone(summary['lead_time']['median'])
+        self.assertEqual(summary['periods']['cancellation_rate'], [0.0] * len(summary['periods']['start']))
+
+    def test_pages(self):
+        self.client.login(username='staff', password='secret123')
+        response = self.client.get(reverse('analytics_report'), {'group_by': 'week'})
+        self.assertContains(response, 'Cancellation Rate by Week')
+        self.assertEqual(len(response.context['period_rows']), len(response.context['summary']['periods']['start']))
+
+        data = self.client.get(reverse('analytics_report_json'), {
+            'start_date': self.start.isoformat(), 'end_date': self.today.isoformat()
+        }).json()
+        self.assertEqual((data['group_by'], data['totals']['bookings']), ('month', 6))
+        response = self.client.get(reverse('analytics_report_json'), {'start_date': 'soon'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_command(self):
+        sweep()
+        DailyBookingStats.objects.all().delete()
+        out = io.StringIO()
+        call_command('rebuild_booking_stats', stdout=out)
+        self.assertIn(f'{DailyBookingStats.objects.count()} rows written', out.getvalue())
+        self.assertEqual(self.summary()['totals']['bookings'], 6)
@@ -0,0 +1,160 @@
+from datetime import time as dtime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..bookings import claim_slot, release_booking
+from ..models import Booking, Ground, Slot
+
+
+class ApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('player', password='secret123')
+        self.ground = Ground.objects.create(name='Green Field', location='Downtown', sport_type='Cricket', rating=4.5)
+        Ground.objects.create(name='Ace Courts', location='East End', sport_type='Tennis', rating=4.8)
+        self.today = timezone.now().date()
+        self.slots = [
+            Slot.objects.create(
+                ground=self.ground,
+                date=self.today + timedelta(days=day),
+                start_time=dtime(hour, 0),
+                end_time=dtime(hour + 2, 0),
+                price_per_slot=1000
+            )
+            for day in range(3)
+            for hour in (16, 18, 20)
+        ]
+        self.slots_url = reverse('api_ground_slots', args=[self.ground.id])
+
+    def test_ground_list_paginates_with_field_selection(self):
+        response = self.client.get(reverse('api_ground_list'), {'page_size': 1, 'fields': 'id,name'})
+
+        data = response.json()
+        self.assertEqual(list(data['results'][0]), ['id', 'name'])
+        self.assertEqual(data['results'][0]['name'], 'Ace Courts')
+        self.assertIsNone(data['previous'])
+
+        data = self.client.get(data['next']).json()
+        self.assertEqual(data['results'][0]['name'], 'Green Field')
+        self.assertIsNone(data['next'])
+        self.assertIsNotNone(data['previous'])
+
+    def test_bad_parameters_are_rejected(self):
+        self.assertEqual(self.client.get(reverse('api_ground_list'), {'fields': 'id,secret'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('api_ground_list'), {'after': 'garbage'}).status_code, 400)
+        self.assertEqual(self.client.get(self.slots_url, {'page_size': 0}).status_code, 400)
+        self.assertEqual(self.client.get(self.slots_url, {'status': 'Free'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('api_ground_slots', args=[999])).status_code, 404)
+
+    def test_slots_in_date_range(self):
+        tomorrow = self.today + timedelta(days=1)
+        response = self.client.get(self.slots_url, {'start_date': tomorrow, 'end_date': tomorrow})
+
+        self.assertEqual([slot['id'] for slot in response.json()['results']], [s.id for s in self.slots[3:6]])
+
+    def test_unchanged_slots_are_not_modified_without_queries(self):
+        response = self.client.get(self.slots_url)
+        etag = response['ETag']
+        self.assertFalse(etag.startswith('W/'))
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.slots_url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.slots_url, headers={'if-modified-since': response['Last-Modified']})
+        self.assertEqual(response.status_code, 304)
+
+        # A different representation has a different tag
+        response = self.client.get(self.slots_url, {'fields': 'id'}, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_booking_changes_slot_etag(self):
+        etag = self.client.get(self.slots_url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            claim_slot(self.user, self.slots[0])
+
+        response = self.client.get(self.slots_url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['availability_status'], 'Booked')
+
+    def test_bookings_require_login_and_track_changes(self):
+        self.assertEqual(self.client.get(reverse('api_booking_list')).status_code, 403)
+
+        other = User.objects.create_user('rival', password='secret123')
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = claim_slot(self.user, self.slots[0])
+            claim_slot(other, self.slots[1])
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse('api_booking_list'))
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        results = response.json()['results']
+        self.assertEqual([row['id'] for row in results], [booking.id])
+        self.assertEqual(results[0]['slot']['id'], self.slots[0].id)
+        self.assertIsNone(results[0]['payment_status'])
+
+        etag = response['ETag']
+        self.assertEqual(self.client.get(reverse('api_booking_list'), headers={'if-none-match': etag}).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            release_booking(Booking.objects.get(pk=booking.id))
+        response = self.client.get(reverse('api_booking_list'), headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['status'], 'Cancelled')
+
+    def test_slot_and_ground_edits_change_booking_etags(self):
+        other = User.objects.create_user('rival', password='secret123')
+        with self.captureOnCommitCallbacks(execute=True):
+            claim_slot(self.user, self.slots[0])
+            claim_slot(other, self.slots[3])
+        self.client.force_login(self.user)
+        url = reverse('api_booking_list')
+
+        # Moving the booked slot changes the booking list
+        etag = self.client.get(url)['ETag']
+        slot = Slot.objects.get(pk=self.slots[0].pk)
+        slot.start_time, slot.end_time = dtime(10), dtime(12)
+        with self.captureOnCommitCallbacks(execute=True):
+            slot.save()
+        response = self.client.get(url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['slot']['start_time'], '10:00:00')
+
+        # Editing a slot nobody booked leaves it alone
+        etag = response['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.slots[1].save()
+        self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 304)
+
+        # So does editing a slot someone else booked
+        with self.captureOnCommitCallbacks(execute=True):
+            Slot.objects.get(pk=self.slots[3].pk).save()
+        self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 304)
+
+        # Renaming the ground changes the name shown with the booking
+        self.ground.name = 'Green Field Arena'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ground.save()
+        response = self.client.get(url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['ground_name'], 'Green Field Arena')
+
+    def test_ground_edit_changes_etags(self):
+        list_etag = self.client.get(reverse('api_ground_list'))['ETag']
+        detail_url = reverse('api_ground_detail', args=[self.ground.id])
+        detail_etag = self.client.get(detail_url)['ETag']
+
+        self.ground.name = 'Green Field Arena'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ground.save()
+
+        self.assertEqual(self.client.get(reverse('api_ground_list'), headers={'if-none-match': list_etag}).status_code, 200)
+        response = self.client.get(detail_url, headers={'if-none-match': detail_etag})
+        self.assertEqual(response.json()['name'], 'Green Field Arena')
@@ -0,0 +1,103 @@
+import csv
+import io
+from datetime import time as dtime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..archive import archive_history, archivable, past_bookings
+from ..exports import stream_export
+from ..forms import BookingFilterForm
+from ..models import (
+    ArchivedBooking, ArchivedPayment, ArchivedSlot, AvailabilityBitmap, Booking, DailyRevenue, Ground, Payment, Slot
+)
+from ..occupancy import ground_occupancy, occupancy_heatmap
+from ..revenue import rebuild_daily_revenue
+
+
+@override_settings(ARCHIVE_RETENTION_DAYS=30)
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.player = User.objects.create_user('player', password='secret123')
+        cls.ground = Ground.objects.create(name='Green Field', location='Downtown', sport_type='Cricket')
+        cls.today = timezone.localdate()
+        cls.old_day = cls.today - timedelta(days=40)
+        cls.recent_day = cls.today - timedelta(days=5)
+        cls.bookings = []
+        for day in [cls.old_day, cls.old_day, cls.old_day, cls.recent_day]:
+            hour = 6 + 2 * len(cls.bookings)
+            slot = Slot.objects.create(
+                ground=cls.ground, date=day, start_time=dtime(hour), end_time=dtime(hour + 2),
+                price_per_slot=1000, availability_status='Booked'
+            )
+            booking = Booking.objects.create(user=cls.player, slot=slot, status='Completed')
+            Payment.objects.create(booking=booking, amount=1000, payment_method='UPI', payment_status='Paid')
+            cls.bookings.append(booking)
+        # An old slot nobody booked
+        Slot.objects.create(
+            ground=cls.ground, date=cls.old_day, start_time=dtime(20), end_time=dtime(22), price_per_slot=800
+        )
+
+    def test_moves_old_rows_in_batches(self):
+        self.assertEqual(archivable().slots, 4)
+        result = archive_history(batch_size=3)
+        self.assertEqual((result.slots, result.bookings, result.payments), (4, 3, 3))
+
+        self.assertEqual(list(Slot.objects.values_list('date', flat=True)), [self.recent_day])
+        self.assertEqual(list(Booking.objects.all()), [self.bookings[3]])
+        archived = ArchivedBooking.objects.select_related('slot', 'payment').get(pk=self.bookings[0].pk)
+        self.assertEqual((archived.slot_id, archived.slot.start_time), (self.bookings[0].slot_id, dtime(6)))
+        self.assertEqual(archived.payment.amount, 1000)
+        self.assertFalse(AvailabilityBitmap.objects.filter(date=self.old_day).exists())
+
+        # Nothing left to move
+        self.assertEqual(archive_history().slots, 0)
+
+    def test_reads_cover_both_tables(self):
+        archive_history()
+        self.assertEqual(ArchivedSlot.objects.count(), 4)
+
+        self.assertEqual(
+            [booking.pk for booking in past_bookings(self.player)],
+            [self.bookings[3].pk, self.bookings[2].pk, self.bookings[1].pk, self.bookings[0].pk]
+        )
+
+        (occupancy,) = ground_occupancy()
+        self.assertEqual((occupancy['total_slots'], occupancy['booked_slots']), (5, 4))
+        # A window after the cutoff reads the hot table only
+        with self.assertNumQueries(2):
+            (occupancy,) = ground_occupancy(start_date=self.recent_day)
+        self.assertEqual(occupancy['total_slots'], 1)
+        cells = occupancy_heatmap()
+        self.assertEqual(sum(cell['total_slots'] for cell in cells), 5)
+        self.assertEqual(len(cells), 5)
+
+        rebuild_daily_revenue()
+        self.assertEqual(sum(row.amount for row in DailyRevenue.objects.all()), 4000)
+
+        form = BookingFilterForm({})
+        self.assertTrue(form.is_valid())
+        rows = list(csv.DictReader(io.StringIO(''.join(stream_export('payments', 'csv', form)))))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0]['slot_date'], self.old_day.isoformat())
+
+    def test_user_pages(self):
+        archive_history()
+        self.client.login(username='player', password='secret123')
+        response = self.client.get(reverse('user_bookings'))
+        self.assertEqual(len(response.context['past_bookings']), 4)
+        response = self.client.get(reverse('user_dashboard'))
+        self.assertEqual(response.context['total_bookings'], 4)
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command('archive_history', '--dry-run', stdout=out)
+        self.assertIn('4 slots, 3 bookings and 3 payments would be archived', out.getvalue())
+        self.assertEqual(ArchivedSlot.objects.count(), 0)
+
+        call_command('archive_history', '--cutoff', self.today.isoformat(), stdout=out)
+        self.assertEqual((ArchivedSlot.objects.count(), ArchivedPayment.objects.count()), (5, 4))
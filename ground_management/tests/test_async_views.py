@@ -0,0 +1,105 @@
+import io
+from datetime import time as dtime, timedelta
+
+from asgiref.testing import ApplicationCommunicator
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from .. import async_views, views
+from ..models import Ground, Slot
+
+
+@override_settings(ROOT_URLCONF='sports_ground_management.asgi_urls')
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('player', password='secret123')
+        self.ground = Ground.objects.create(name='Green Field', location='Downtown', sport_type='Cricket', rating=4.5)
+        Ground.objects.create(name='Ace Courts', location='East End', sport_type='Tennis', rating=4.8)
+        self.day = timezone.now().date()
+        self.slots = [
+            Slot.objects.create(
+                ground=self.ground,
+                date=self.day,
+                start_time=dtime(hour, 0),
+                end_time=dtime(hour + 2, 0),
+                price_per_slot=1000,
+                availability_status=status
+            )
+            for hour, status in [(16, 'Available'), (18, 'Booked'), (20, 'Available')]
+        ]
+
+    def test_read_paths_use_async_views(self):
+        self.assertIs(resolve(reverse('home')).func, async_views.home)
+        self.assertIs(resolve(reverse('ground_list')).func, async_views.ground_list)
+        self.assertIs(resolve(reverse('ground_detail', args=[1])).func, async_views.ground_detail)
+        self.assertIs(resolve(reverse('api_ground_slots', args=[1])).func, async_views.api_ground_slots)
+
+    async def test_home_and_ground_list(self):
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(reverse('home'))
+        self.assertEqual([g.name for g in response.context['featured_grounds']], ['Ace Courts', 'Green Field'])
+        self.assertContains(response, 'player')
+
+        response = await self.async_client.get(reverse('ground_list'), {'sport_type': 'Cricket'})
+        self.assertEqual(response.context['grounds'], [self.ground])
+        self.assertContains(response, 'Cricket (1)')
+
+        response = await self.async_client.get(reverse('ground_list'), {'q': 'courts'})
+        self.assertEqual([g.name for g in response.context['grounds']], ['Ace Courts'])
+
+    async def test_ground_detail(self):
+        url = reverse('ground_detail', args=[self.ground.id])
+        response = await self.async_client.get(url)
+
+        self.assertEqual([s.id for s in response.context['available_slots']], [self.slots[0].id, self.slots[2].id])
+        self.assertEqual((await self.async_client.get(reverse('ground_detail', args=[999]))).status_code, 404)
+
+    async def test_slot_api_matches_sync_view(self):
+        url = reverse('api_ground_slots', args=[self.ground.id])
+        params = {'status': 'Available', 'fields': 'id,availability_status'}
+        response = await self.async_client.get(url, params)
+
+        with self.settings(ROOT_URLCONF='sports_ground_management.urls'):
+            expected = await self.async_client.get(url, params)
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual(response['ETag'], expected['ETag'])
+
+        response = await self.async_client.get(url, params, headers={'if-none-match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+        response = await self.async_client.get(url, {'status': 'Free'})
+        with self.settings(ROOT_URLCONF='sports_ground_management.urls'):
+            expected = await self.async_client.get(url, {'status': 'Free'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual((await self.async_client.get(url, {'after': 'garbage'})).status_code, 400)
+        self.assertEqual((await self.async_client.get(reverse('api_ground_slots', args=[999]))).status_code, 404)
+
+
+class AsgiEntryPointTests(SimpleTestCase):
+    def test_routes_requests_without_touching_settings(self):
+        from sports_ground_management.asgi import application
+
+        scope = {'type': 'http', 'method': 'GET', 'path': '/grounds/', 'query_string': b'', 'headers': []}
+        request, error = application.create_request(scope, io.BytesIO())
+        self.assertIsNone(error)
+        self.assertIs(resolve(request.path_info, request.urlconf).func, async_views.ground_list)
+        # WSGI, and anything else in the process, keeps the synchronous views
+        self.assertEqual(settings.ROOT_URLCONF, 'sports_ground_management.urls')
+        self.assertIs(resolve('/grounds/').func, views.ground_list)
+
+    async def test_serves_requests(self):
+        from sports_ground_management.asgi import application
+
+        communicator = ApplicationCommunicator(application, {
+            'type': 'http', 'method': 'GET', 'path': '/nowhere/', 'query_string': b'',
+            'headers': [(b'host', b'testserver')],
+        })
+        await communicator.send_input({'type': 'http.request', 'body': b''})
+        self.assertEqual((await communicator.receive_output(5))['status'], 404)
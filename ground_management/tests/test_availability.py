@@ -0,0 +1,112 @@
+from datetime import time as dtime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import availability
+from ..models import Ground, Slot
+
+
+class AvailabilityCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        availability.stats.reset()
+        self.user = User.objects.create_user('player', password='secret123')
+        self.staff = User.objects.create_user('staff', password='secret123', is_staff=True)
+        self.ground = Ground.objects.create(name='Green Field', location='Downtown', sport_type='Cricket')
+        self.day = timezone.now().date() + timedelta(days=1)
+        self.slots = [
+            Slot.objects.create(
+                ground=self.ground,
+                date=self.day,
+                start_time=dtime(hour, 0),
+                end_time=dtime(hour + 2, 0),
+                price_per_slot=1000
+            )
+            for hour in (16, 18, 20)
+        ]
+        self.detail_url = reverse('ground_detail', args=[self.ground.id]) + f'?date={self.day:%Y-%m-%d}'
+
+    def shown_slots(self):
+        response = self.client.get(self.detail_url)
+        return [slot.id for slot in response.context['available_slots']]
+
+    def test_repeat_views_hit_the_cache(self):
+        self.shown_slots()
+        with self.assertNumQueries(1):  # the ground itself
+            self.shown_slots()
+
+        self.assertEqual(availability.stats.misses, 1)
+        self.assertEqual(availability.stats.hits, 1)
+
+    def test_booking_is_never_served_stale(self):
+        self.assertEqual(self.shown_slots(), [slot.id for slot in self.slots])
+        self.client.force_login(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('book_ground', args=[self.ground.id]),
+                {'slot': self.slots[0].id, 'status': 'Confirmed'}
+            )
+
+        self.assertEqual(self.shown_slots(), [slot.id for slot in self.slots[1:]])
+        self.assertEqual(availability.stats.misses, 2)
+
+    def test_cancellation_reopens_slot(self):
+        self.client.force_login(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('book_ground', args=[self.ground.id]),
+                {'slot': self.slots[0].id, 'status': 'Confirmed'}
+            )
+        self.assertNotIn(self.slots[0].id, self.shown_slots())
+        booking = self.user.bookings.get()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('cancel_booking', args=[booking.id]))
+
+        self.assertIn(self.slots[0].id, self.shown_slots())
+
+    def test_admin_slot_edit_invalidates_old_and_new_date(self):
+        next_day = self.day + timedelta(days=1)
+        self.assertEqual(len(self.shown_slots()), 3)
+        self.client.get(self.detail_url.replace(f'{self.day:%Y-%m-%d}', f'{next_day:%Y-%m-%d}'))
+        self.client.force_login(self.staff)
+
+        slot = self.slots[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('admin_slot_edit', args=[slot.id]), {
+                'ground': self.ground.id,
+                'date': next_day.isoformat(),
+                'start_time': '16:00',
+                'end_time': '18:00',
+                'price_per_slot': '1000',
+                'availability_status': 'Available',
+            })
+
+        self.assertNotIn(slot.id, self.shown_slots())
+        self.assertEqual(
+            [s.id for s in availability.available_slots(self.ground.id, next_day)],
+            [slot.id]
+        )
+
+    def test_admin_slot_delete_invalidates(self):
+        self.shown_slots()
+        self.client.force_login(self.staff)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('admin_slot_delete', args=[self.slots[1].id]))
+
+        self.assertEqual(self.shown_slots(), [self.slots[0].id, self.slots[2].id])
+
+    def test_rolled_back_write_keeps_cache(self):
+        self.shown_slots()
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            availability.invalidate_day(self.ground.id, self.day)
+
+        self.assertTrue(callbacks)
+        self.shown_slots()
+        self.assertEqual(availability.stats.hits, 1)
@@ -0,0 +1,142 @@
+from datetime import time as dtime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import bitmaps
+from ..bookings import claim_slot, release_booking
+from ..management.commands.benchmark_free_windows import orm_free_windows
+from ..models import AvailabilityBitmap, Ground, Slot
+from ..schedules import Schedule, create_schedule_slots
+
+
+class BitmapEncodingTests(SimpleTestCase):
+    def test_masks_cover_whole_blocks_only(self):
+        self.assertEqual(bitmaps.time_mask(dtime(0, 0), dtime(0, 30)), 0b11)
+        self.assertEqual(bitmaps.time_mask(dtime(6, 0), dtime(8, 0)), 0xff << 24)
+        # 06:10-07:05 only wholly contains 06:15-07:00
+        self.assertEqual(bitmaps.time_mask(dtime(6, 10), dtime(7, 5)), 0b111 << 25)
+        self.assertEqual(bitmaps.time_mask(dtime(6, 5), dtime(6, 10)), 0)
+
+    def test_round_trip_and_runs(self):
+        bits = bitmaps.time_mask(dtime(6), dtime(8)) | bitmaps.time_mask(dtime(9), dtime(9, 30))
+        self.assertEqual(len(bitmaps.encode(bits)), 12)
+        self.assertEqual(bitmaps.decode(bitmaps.encode(bits)), bits)
+        self.assertEqual(list(bitmaps.free_runs(bits)), [(24, 8), (36, 2)])
+        self.assertTrue(bitmaps.runs_of(bits, 8))
+        self.assertFalse(bitmaps.runs_of(bits, 9))
+
+
+class AvailabilityBitmapTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('player', password='secret123')
+        self.ground = Ground.objects.create(name='Green Field', location='Downtown', sport_type='Cricket')
+        self.other = Ground.objects.create(name='Ace Courts', location='East End', sport_type='Tennis')
+        self.day = timezone.now().date() + timedelta(days=1)
+        # 06:00-12:00 in two-hour slots, then 14:00-15:00
+        self.slots = [self.make_slot(self.ground, hour, hour + 2) for hour in (6, 8, 10)]
+        self.slots.append(self.make_slot(self.ground, 14, 15))
+        self.make_slot(self.other, 18, 20)
+
+    def make_slot(self, ground, start, end, day=None, status='Available'):
+        return Slot.objects.create(
+            ground=ground,
+            date=day or self.day,
+            start_time=dtime(start, 0),
+            end_time=dtime(end, 0),
+            price_per_slot=1000,
+            availability_status=status
+        )
+
+    def windows(self, minutes, **kwargs):
+        return [
+            (w.ground_id, w.date, w.start_time, w.end_time)
+            for w in bitmaps.free_windows(minutes, self.day, self.day + timedelta(days=1), **kwargs)
+        ]
+
+    def test_adjacent_slots_form_one_window(self):
+        with self.assertNumQueries(1):
+            windows = self.windows(120)
+        self.assertEqual(windows, [
+            (self.ground.id, self.day, dtime(6), dtime(12)),
+            (self.other.id, self.day, dtime(18), dtime(20)),
+        ])
+        self.assertEqual(self.windows(61, grounds=[self.ground]), [(self.ground.id, self.day, dtime(6), dtime(12))])
+        self.assertEqual(self.windows(60, grounds=[self.ground], earliest=dtime(11), latest=dtime(15)), [
+            (self.ground.id, self.day, dtime(11), dtime(12)),
+            (self.ground.id, self.day, dtime(14), dtime(15)),
+        ])
+
+    def test_booking_and_cancellation_update_bitmap(self):
+        booking = claim_slot(self.user, self.slots[1])
+        self.assertEqual(self.windows(60, grounds=[self.ground]), [
+            (self.ground.id, self.day, dtime(6), dtime(8)),
+            (self.ground.id, self.day, dtime(10), dtime(12)),
+            (self.ground.id, self.day, dtime(14), dtime(15)),
+        ])
+
+        release_booking(booking)
+        self.assertEqual(self.windows(360, grounds=[self.ground]), [(self.ground.id, self.day, dtime(6), dtime(12))])
+
+    def test_slot_edits_update_old_and_new_day(self):
+        slot = self.slots[0]
+        slot.date = self.day + timedelta(days=1)
+        slot.save()
+        self.assertEqual(self.windows(120, grounds=[self.ground]), [
+            (self.ground.id, self.day, dtime(8), dtime(12)),
+            (self.ground.id, self.day + timedelta(days=1), dtime(6), dtime(8)),
+        ])
+
+        slot.delete()
+        self.slots[2].availability_status = 'Maintenance'
+        self.slots[2].save()
+        self.assertEqual(self.windows(120, grounds=[self.ground]), [(self.ground.id, self.day, dtime(8), dtime(10))])
+
+    def test_ground_delete_removes_bitmaps(self):
+        self.ground.delete()
+        self.assertFalse(AvailabilityBitmap.objects.filter(ground_id=self.slots[0].ground_id).exists())
+        self.assertEqual(AvailabilityBitmap.objects.count(), 1)
+
+    def test_schedules_and_rebuild_match_orm(self):
+        create_schedule_slots(Schedule(
+            grounds=[self.other],
+            start_date=self.day,
+            end_date=self.day + timedelta(days=1),
+            weekdays=set(range(7)),
+            time_ranges=[(dtime(6), dtime(12))],
+            slot_minutes=90,
+            price_per_slot=Decimal('800'),
+        ))
+        arguments = (90, self.day, self.day + timedelta(days=1))
+        self.assertEqual(bitmaps.free_windows(*arguments), orm_free_windows(*arguments))
+        self.assertEqual(len(bitmaps.free_windows(*arguments, grounds=[self.other])), 3)
+
+        expected = bitmaps.free_windows(*arguments)
+        AvailabilityBitmap.objects.all().delete()
+        self.assertEqual(bitmaps.rebuild_bitmaps(), 3)
+        self.assertEqual(bitmaps.free_windows(*arguments), expected)
+
+    def test_api(self):
+        url = reverse('api_free_windows')
+        response = self.client.get(url, {
+            'minutes': 90,
+            'start_date': self.day,
+            'end_date': self.day,
+            'ground': self.ground.id,
+            'earliest': '09:00',
+        })
+        self.assertEqual(response.json()['results'], [{
+            'ground': self.ground.id,
+            'date': self.day.isoformat(),
+            'start_time': '09:00:00',
+            'end_time': '12:00:00',
+            'minutes': 180,
+        }])
+
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.get(url, {'minutes': 60, 'earliest': '12:00', 'latest': '09:00'}).status_code, 400)
+        response = self.client.get(url, {'minutes': 60, 'start_date': self.day, 'end_date': self.day + timedelta(days=40)})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,235 @@
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import time as dtime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import close_old_connections, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import bitmaps
+from ..bookings import BookingNotActive, HoldExpired, SlotUnavailable, claim_slot, confirm_booking, expire_holds, release_booking
+from ..models import Booking, Ground, Payment, Slot
+from ..payments import process_pending
+
+
+class ClaimSlotTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('player', password='secret123')
+        self.ground = Ground.objects.create(name='Green Field', location='Downtown', sport_type='Cricket')
+        self.slot = Slot.objects.create(
+            ground=self.ground,
+            date=timezone.now().date() + timedelta(days=1),
+            start_time=dtime(18, 0),
+            end_time=dtime(20, 0),
+            price_per_slot=1200
+        )
+
+    def test_claim_books_slot(self):
+        booking = claim_slot(self.user, self.slot)
+
+        self.slot.refresh_from_db()
+        self.assertEqual(self.slot.availability_status, 'Booked')
+        self.assertEqual(booking.slot_id, self.slot.id)
+
+    def test_second_claim_fails(self):
+        claim_slot(self.user, self.slot)
+
+        with self.assertRaises(SlotUnavailable):
+            claim_slot(self.user, self.slot)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_release_frees_slot(self):
+        booking = claim_slot(self.user, self.slot)
+        release_booking(booking)
+
+        self.slot.refresh_from_db()
+        self.assertEqual(self.slot.availability_status, 'Available')
+        self.assertEqual(Booking.objects.get().status, 'Cancelled')
+
+    def test_book_ground_rejects_taken_slot(self):
+        other = User.objects.create_user('rival', password='secret123')
+        claim_slot(other, self.slot)
+        self.client.force_login(self.user)
+
+        response = self.client.post(
+            reverse('book_ground', args=[self.ground.id]),
+            {'slot': self.slot.id, 'status': 'Confirmed'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('slot', response.context['form'].errors)
+        self.assertEqual(Booking.objects.count(), 1)
+
+
+class HoldTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('player', password='secret123')
+        self.ground = Ground.objects.create(name='Green Field', location='Downtown', sport_type='Cricket')
+        self.day = timezone.now().date() + timedelta(days=1)
+        self.slots = [
+            Slot.objects.create(
+                ground=self.ground, date=self.day, start_time=dtime(hour), end_time=dtime(hour + 1), price_per_slot=800
+            )
+            for hour in range(17, 22)
+        ]
+
+    def lapse(self, *bookings):
+        Booking.objects.filter(pk__in=[b.pk for b in bookings]).update(expires_at=timezone.now() - timedelta(seconds=1))
+
+    def test_booking_starts_as_a_hold(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('book_ground', args=[self.ground.id]), {'slot': self.slots[0].id})
+        booking = Booking.objects.get()
+        self.assertRedirects(response, reverse('payment', args=[booking.id]))
+        self.assertEqual(booking.status, 'Pending')
+        self.assertAlmostEqual(booking.expires_at, timezone.now() + timedelta(minutes=15), delta=timedelta(seconds=30))
+
+    @override_settings(PAYMENT_WORKERS=0)
+    def test_payment_confirms_the_hold(self):
+        booking = claim_slot(self.user, self.slots[0])
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse('payment', args=[booking.id]), {'payment_method': 'UPI', 'amount': '800', 'idempotency_key': 'k1'}
+        )
+        self.assertRedirects(response, reverse('payment_success', args=[booking.id]))
+        self.assertEqual(process_pending(), 1)
+        booking.refresh_from_db()
+        self.assertEqual((booking.status, booking.expires_at), ('Confirmed', None))
+        self.assertTrue(Payment.objects.filter(booking=booking, payment_status='Paid').exists())
+
+    def test_lapsed_hold_cannot_be_paid(self):
+        booking = claim_slot(self.user, self.slots[0])
+        self.lapse(booking)
+        with self.assertRaises(HoldExpired):
+            confirm_booking(booking)
+
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse('payment', args=[booking.id]), {'payment_method': 'UPI', 'amount': '800', 'idempotency_key': 'k1'}
+        )
+        self.assertRedirects(response, reverse('book_ground', args=[self.ground.id]), fetch_redirect_response=False)
+        self.assertFalse(Payment.objects.exists())
+
+    def test_expire_holds_releases_lapsed_slots(self):
+        bookings = [claim_slot(self.user, slot) for slot in self.slots]
+        confirmed = claim_slot(self.user, Slot.objects.create(
+            ground=self.ground, date=self.day, start_time=dtime(6), end_time=dtime(7), price_per_slot=800
+        ), status='Confirmed')
+        self.lapse(*bookings[:4], confirmed)
+
+        # Per batch: the scan, two updates, the released slots and the bitmap
+        # refresh (lock, read, upsert), plus the savepoint pairs; then the empty scan
+        with self.assertNumQueries(25):
+            self.assertEqual(expire_holds(batch_size=2), 4)
+        self.assertEqual(
+            list(Booking.objects.order_by('slot__start_time').values_list('status', flat=True)),
+            ['Confirmed', 'Cancelled', 'Cancelled', 'Cancelled', 'Cancelled', 'Pending']
+        )
+        self.assertEqual(Slot.objects.filter(availability_status='Available').count(), 4)
+        windows = bitmaps.free_windows(60, self.day, self.day, grounds=[self.ground])
+        self.assertEqual([(w.start_time, w.end_time) for w in windows], [(dtime(17), dtime(21))])
+
+        with self.assertNumQueries(3):
+            self.assertEqual(expire_holds(), 0)
+
+    def test_cancel_after_expiry_leaves_the_new_booking_alone(self):
+        stale = claim_slot(self.user, self.slots[0])
+        self.lapse(stale)
+        expire_holds()
+        rival = User.objects.create_user('rival', password='secret123')
+        current = claim_slot(rival, self.slots[0])
+
+        # The original holder's page still offers to cancel the lapsed hold
+        with self.assertRaises(BookingNotActive):
+            release_booking(stale)
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('cancel_booking', args=[stale.id]))
+        self.assertRedirects(response, reverse('user_bookings'), fetch_redirect_response=False)
+
+        self.slots[0].refresh_from_db()
+        current.refresh_from_db()
+        self.assertEqual(self.slots[0].availability_status, 'Booked')
+        self.assertEqual(current.status, 'Pending')
+        windows = bitmaps.free_windows(60, self.day, self.day, grounds=[self.ground])
+        self.assertEqual([(w.start_time, w.end_time) for w in windows], [(dtime(18), dtime(22))])
+
+    def test_lapsed_hold_cannot_be_cancelled(self):
+        booking = claim_slot(self.user, self.slots[0])
+        self.lapse(booking)
+        self.client.force_login(self.user)
+        self.client.post(reverse('cancel_booking', args=[booking.id]))
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, 'Pending')
+        # Left for expire_holds, which releases the slot
+        self.assertEqual(expire_holds(), 1)
+
+    def test_command(self):
+        self.lapse(claim_slot(self.user, self.slots[0]))
+        call_command('expire_holds', stdout=io.StringIO())
+        self.assertEqual(Booking.objects.get().status, 'Cancelled')
+
+
+class ConcurrentBookingStressTest(TransactionTestCase):
+    """Fire many simultaneous claims at a few slots; each slot must have one winner."""
+
+    SLOTS = 10
+    ATTEMPTS_PER_SLOT = 30
+    WORKERS = 16
+
+    def setUp(self):
+        ground = Ground.objects.create(name='Stress Arena', location='Test', sport_type='Football')
+        date = timezone.now().date() + timedelta(days=1)
+        self.slots = Slot.objects.bulk_create(
+            Slot(
+                ground=ground,
+                date=date,
+                start_time=dtime(6 + i, 0),
+                end_time=dtime(7 + i, 0),
+                price_per_slot=500
+            )
+            for i in range(self.SLOTS)
+        )
+        self.users = User.objects.bulk_create(
+            User(username=f'racer{i}') for i in range(self.SLOTS * self.ATTEMPTS_PER_SLOT)
+        )
+
+    def _attempt(self, user, slot, start):
+        start.wait()
+        try:
+            claim_slot(user, slot)
+            return True
+        except SlotUnavailable:
+            return False
+        finally:
+            close_old_connections()
+            connection.close()
+
+    def test_exactly_one_winner_per_slot(self):
+        start = threading.Event()
+        attempts = [
+            (user, self.slots[i % self.SLOTS])
+            for i, user in enumerate(self.users)
+        ]
+
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            futures = [pool.submit(self._attempt, user, slot, start) for user, slot in attempts]
+            start.set()
+            results = [future.result() for future in futures]
+
+        self.assertEqual(sum(results), self.SLOTS)
+        for slot in self.slots:
+            self.assertEqual(Booking.objects.filter(slot=slot).count(), 1)
+        self.assertFalse(Slot.objects.exclude(availability_status='Booked').exists())
+
+    def test_benchmark_command(self):
+        out = io.StringIO()
+        call_command('benchmark_bookings', '--days', '1', '--workers', '4', stdout=out)
+        self.assertIn('96 attempts on 32 slots, 4 threads', out.getvalue())
+        self.assertIn('Every slot was booked exactly once.', out.getvalue())
+        # The benchmark ground and users are gone again
+        self.assertEqual(Ground.objects.count(), 1)
+        self.assertEqual(User.objects.count(), len(self.users))
@@ -0,0 +1,127 @@
+import io
+from datetime import time as dtime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import counters, versions
+from ..archive import archive_history
+from ..bookings import claim_slot
+from ..models import Booking, Counter, DailyRevenue, Ground, Payment, Slot
+from ..schedules import Schedule, create_schedule_slots
+
+
+class CounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', password='secret123', is_staff=True)
+        cls.player = User.objects.create_user('player', password='secret123')
+        cls.ground = Ground.objects.create(name='Green Field', location='Downtown', sport_type='Cricket')
+        cls.slot = Slot.objects.create(
+            ground=cls.ground, date=timezone.localdate() + timedelta(days=1), start_time=dtime(6),
+            end_time=dtime(8), price_per_slot=1000
+        )
+
+    def setUp(self):
+        counters.reconcile()
+
+    def assertCounters(self, **expected):
+        self.assertEqual(counters.read(*expected), expected)
+        # And nothing drifted from what the tables say
+        self.assertEqual(
+            {name: counted for name, (stored, counted) in counters.reconcile(list(expected)).items()}, expected
+        )
+
+    def test_write_paths_keep_counters_in_step(self):
+        self.assertCounters(grounds=1, slots=1, bookings=0, players=1, revenue=0)
+
+        booking = claim_slot(self.player, self.slot)
+        payment = Payment.objects.create(booking=booking, amount=1000, payment_method='UPI', payment_status='Pending')
+        self.assertCounters(bookings=1, revenue=0)
+        payment.payment_status = 'Paid'
+        payment.save()
+        self.assertCounters(revenue=1000)
+        payment.payment_status = 'Refunded'
+        payment.save()
+        self.assertCounters(revenue=0)
+
+        self.player.is_staff = True
+        self.player.save()
+        self.assertCounters(players=0)
+        # Logging in saves last_login only and counts nothing
+        self.client.login(username='staff', password='secret123')
+        self.assertCounters(players=0)
+
+        created = create_schedule_slots(Schedule(
+            grounds=[self.ground], start_date=self.slot.date + timedelta(days=1),
+            end_date=self.slot.date + timedelta(days=2), weekdays=set(range(7)),
+            time_ranges=[(dtime(6), dtime(10))], slot_minutes=60, price_per_slot=500
+        ))
+        self.assertEqual(created, 8)
+        self.assertCounters(slots=9)
+
+        self.ground.delete()
+        self.assertCounters(grounds=0, slots=0, bookings=0, revenue=0)
+
+    def test_archiving_keeps_totals(self):
+        booking = Booking.objects.create(user=self.player, slot=self.slot, status='Completed')
+        Payment.objects.create(booking=booking, amount=1000, payment_method='UPI', payment_status='Paid')
+        Slot.objects.filter(pk=self.slot.pk).update(date=timezone.localdate() - timedelta(days=400))
+        self.assertEqual(archive_history().slots, 1)
+        self.assertCounters(slots=1, bookings=1, revenue=1000)
+        # Archived rows leave the totals when their ground goes
+        self.ground.delete()
+        self.assertCounters(slots=0, bookings=0, revenue=0)
+
+    def test_ground_delete_costs_the_same_whatever_it_cascades_to(self):
+        other = Ground.objects.create(name='Blue Court', location='Uptown', sport_type='Tennis')
+        for ground, bookings in ((self.ground, 2), (other, 12)):
+            for hour in range(bookings):
+                slot = Slot.objects.create(
+                    ground=ground, date=self.slot.date + timedelta(days=1), start_time=dtime(hour),
+                    end_time=dtime(hour, 30), price_per_slot=500
+                )
+                booking = Booking.objects.create(user=self.player, slot=slot)
+                Payment.objects.create(booking=booking, amount=500, payment_method='UPI', payment_status='Paid')
+        self.assertCounters(grounds=2, slots=15, bookings=14, revenue=7000)
+
+        version = versions.current('bookings', self.player.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as first:
+                self.ground.delete()
+        self.assertCounters(grounds=1, slots=12, bookings=12, revenue=6000)
+        self.assertNotEqual(versions.current('bookings', self.player.pk), version)
+        self.assertEqual(set(DailyRevenue.objects.values_list('ground_id', flat=True)), {other.pk})
+
+        with CaptureQueriesContext(connection) as second:
+            other.delete()
+        self.assertEqual(len(first), len(second))
+        self.assertCounters(grounds=0, slots=0, bookings=0, revenue=0)
+
+    def test_missing_counter_is_counted_on_first_read(self):
+        Counter.objects.filter(name='grounds').delete()
+        Ground.objects.create(name='Blue Court', location='Uptown', sport_type='Tennis')
+        self.assertEqual(counters.read('grounds'), {'grounds': 2})
+
+    def test_dashboard_reads_counters_only(self):
+        self.client.login(username='staff', password='secret123')
+        # Session, user, counters and recent bookings
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('admin_dashboard'))
+        self.assertEqual(
+            [response.context[key] for key in ('grounds_count', 'slots_count', 'bookings_count', 'users_count')],
+            [1, 1, 0, 1]
+        )
+
+    def test_command_fixes_drift(self):
+        Counter.objects.filter(name='slots').update(value=99)
+        out = io.StringIO()
+        call_command('reconcile_counters', stdout=out)
+        self.assertIn('slots: drifted to 99.00, fixed to 1', out.getvalue())
+        self.assertIn('grounds: 1', out.getvalue())
+        self.assertEqual(counters.read('slots'), {'slots': 1})
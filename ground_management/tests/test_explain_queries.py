@@ -0,0 +1,38 @@
+from io import StringIO
+from unittest import skipIf
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from ..models import Ground
+
+
+class ExplainQueriesTests(TestCase):
+    def test_prints_a_plan_per_sample(self):
+        User.objects.create_user('player', password='secret123')
+        Ground.objects.create(name='Green Field', location='Downtown', sport_type='Cricket')
+        out = StringIO()
+        call_command('explain_queries', stdout=out)
+        output = out.getvalue()
+        for heading in [
+            'ground_detail: available slots', 'admin_dashboard: counters', 'admin_booking_list: first keyset page',
+            'occupancy_report: slot counts', 'api_free_windows: bitmaps for a week', 'expire_holds: lapsed holds',
+        ]:
+            self.assertIn(heading, output)
+        # The dashboard no longer sums payments
+        self.assertNotIn('paid revenue', output)
+
+    @skipIf(connection.vendor == 'postgresql', 'PostgreSQL runs EXPLAIN ANALYZE')
+    def test_analyze_needs_postgresql(self):
+        User.objects.create_user('player', password='secret123')
+        Ground.objects.create(name='Green Field', location='Downtown', sport_type='Cricket')
+        err = StringIO()
+        call_command('explain_queries', '--analyze', stdout=StringIO(), stderr=err)
+        self.assertIn('--analyze is not supported', err.getvalue())
+
+    def test_needs_sample_rows(self):
+        err = StringIO()
+        call_command('explain_queries', stdout=StringIO(), stderr=err)
+        self.assertIn('Need at least one ground and one user', err.getvalue())
@@ -0,0 +1,111 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import time as dtime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import async_views
+from ..exports import stream_export
+from ..forms import BookingFilterForm
+from ..models import Booking, Ground, Payment, Slot
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', password='secret123', is_staff=True)
+        cls.player = User.objects.create_user('=player', email='player@example.com')
+        cls.ground = Ground.objects.create(name='Green Field', location='Downtown', sport_type='Cricket')
+        cls.other = Ground.objects.create(name='Ace Courts', location='East End', sport_type='Tennis')
+        cls.day = timezone.now().date() + timedelta(days=1)
+        cls.bookings = []
+        for ground, hour, status in [(cls.ground, 6, 'Confirmed'), (cls.ground, 8, 'Cancelled'), (cls.other, 6, 'Confirmed')]:
+            slot = Slot.objects.create(
+                ground=ground, date=cls.day, start_time=dtime(hour), end_time=dtime(hour + 2), price_per_slot=1000
+            )
+            cls.bookings.append(Booking.objects.create(user=cls.player, slot=slot, status=status))
+        cls.payment = Payment.objects.create(
+            booking=cls.bookings[0], amount='1000.50', payment_method='UPI', payment_status='Paid'
+        )
+
+    def export(self, dataset, export_format='csv', chunk_size=2, **filters):
+        form = BookingFilterForm(filters)
+        self.assertTrue(form.is_valid(), form.errors)
+        return ''.join(stream_export(dataset, export_format, form, chunk_size))
+
+    def test_bookings_csv(self):
+        # One query per table (archive and hot) however many chunks the rows come in
+        with self.assertNumQueries(2):
+            rows = list(csv.DictReader(io.StringIO(self.export('bookings'))))
+        self.assertEqual([row['booking_id'] for row in rows], [str(b.id) for b in self.bookings])
+        first = rows[0]
+        self.assertEqual(first['username'], "'=player")
+        self.assertEqual(first['ground'], 'Green Field')
+        self.assertEqual(first['slot_date'], self.day.isoformat())
+        self.assertEqual(first['start_time'], '06:00:00')
+        self.assertEqual((first['amount'], first['payment_method']), ('1000.50', 'UPI'))
+        self.assertEqual(rows[1]['payment_id'], '')
+
+    def test_filters_match_the_booking_list(self):
+        rows = list(csv.DictReader(io.StringIO(self.export('bookings', status='Confirmed', ground=self.ground.id))))
+        self.assertEqual([row['booking_id'] for row in rows], [str(self.bookings[0].id)])
+        rows = list(csv.DictReader(io.StringIO(self.export('bookings', payment_status='None'))))
+        self.assertEqual(len(rows), 2)
+        rows = list(csv.DictReader(io.StringIO(self.export('payments', start_date=self.day + timedelta(days=1)))))
+        self.assertEqual(rows, [])
+
+    def test_payments_json_lines(self):
+        lines = self.export('payments', 'jsonl').splitlines()
+        self.assertEqual(len(lines), 1)
+        payment = json.loads(lines[0])
+        self.assertEqual(payment['payment_id'], self.payment.id)
+        self.assertEqual(payment['amount'], '1000.50')
+        self.assertEqual(payment['booking_status'], 'Confirmed')
+        self.assertEqual(payment['username'], '=player')
+        self.assertEqual(payment['ground'], 'Green Field')
+
+    def test_view_streams_for_staff_only(self):
+        url = reverse('admin_export_payments')
+        self.client.force_login(self.player)
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.force_login(self.staff)
+        response = self.client.get(url, {'format': 'jsonl'})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        self.assertIn('attachment; filename="payments-', response['Content-Disposition'])
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 1)
+
+        self.assertEqual(self.client.get(url, {'format': 'xml'}).status_code, 400)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bookings.csv')
+            call_command('export_data', 'bookings', '--status', 'Confirmed', '--output', path)
+            with open(path, newline='') as file:
+                self.assertEqual(len(list(csv.DictReader(file))), 2)
+
+
+@override_settings(ROOT_URLCONF='sports_ground_management.asgi_urls')
+class AsyncExportTests(TestCase):
+    async def test_async_view_streams(self):
+        staff = await User.objects.acreate(username='staff', is_staff=True)
+        ground = await Ground.objects.acreate(name='Green Field', location='Downtown', sport_type='Cricket')
+        slot = await Slot.objects.acreate(
+            ground=ground, date=timezone.now().date(), start_time=dtime(6), end_time=dtime(8), price_per_slot=1000
+        )
+        await Booking.objects.acreate(user=staff, slot=slot)
+        await self.async_client.aforce_login(staff)
+
+        response = await self.async_client.get(reverse('admin_export_bookings'), {'ground': ground.id})
+        self.assertIs(response.resolver_match.func, async_views.admin_export)
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertEqual(len(list(csv.DictReader(io.StringIO(body)))), 1)
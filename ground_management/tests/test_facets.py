@@ -0,0 +1,55 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from .. import facets
+from ..models import Ground
+
+
+class GroundFacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Ground.objects.create(name='Green Field', location='Downtown', sport_type='Cricket', rating=4.5)
+        Ground.objects.create(name='Victory Stadium', location='Downtown', sport_type='Football', rating=4.2)
+        Ground.objects.create(name='Ace Courts', location='East End', sport_type='Tennis', rating=4.8)
+        Ground.objects.create(name='Pitch Two', location='East End', sport_type='Cricket', rating=3.0)
+
+    def test_counts_from_one_query(self):
+        with self.assertNumQueries(1):
+            result = facets.ground_facets()
+
+        self.assertEqual(result['sport_types'], [('Cricket', 2), ('Football', 1), ('Tennis', 1)])
+        self.assertEqual(result['locations'], [('Downtown', 2), ('East End', 2)])
+        self.assertEqual(result['total'], 4)
+
+    def test_ground_list_renders_from_cache(self):
+        self.client.get(reverse('ground_list'))
+
+        with self.assertNumQueries(1):  # only the filtered ground query
+            response = self.client.get(reverse('ground_list'), {'sport_type': 'Cricket'})
+        self.assertContains(response, 'Cricket (2)')
+        self.assertEqual(len(response.context['grounds']), 2)
+
+    def test_home_featured_grounds_cached(self):
+        self.client.get(reverse('home'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('home'))
+        self.assertEqual(
+            [ground.name for ground in response.context['featured_grounds']],
+            ['Ace Courts', 'Green Field', 'Victory Stadium']
+        )
+
+    def test_ground_changes_recompute(self):
+        facets.ground_facets()
+        facets.featured_grounds()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Ground.objects.create(name='Top Pool', location='Lakeside', sport_type='Swimming', rating=5.0)
+        self.assertIn(('Swimming', 1), facets.ground_facets()['sport_types'])
+        self.assertEqual(facets.featured_grounds()[0].name, 'Top Pool')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Ground.objects.get(name='Top Pool').delete()
+        self.assertNotIn(('Swimming', 1), facets.ground_facets()['sport_types'])
+        self.assertEqual(facets.featured_grounds()[0].name, 'Ace Courts')
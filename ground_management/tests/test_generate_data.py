@@ -0,0 +1,84 @@
+import io
+from collections import defaultdict
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db.models import Sum
+from django.test import TestCase
+from django.utils import timezone
+
+from .. import counters, facets
+from ..bitmaps import day_bits, decode
+from ..models import AvailabilityBitmap, Booking, DailyRevenue, Ground, Payment, Slot
+
+
+class GenerateDataTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def generate(self, *args):
+        out = io.StringIO()
+        # Cache invalidation waits for the transaction to commit
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('generate_data', *args, stdout=out)
+        return out.getvalue()
+
+    def test_small_run_leaves_derived_data_consistent(self):
+        counters.reconcile()
+        self.assertEqual(facets.ground_facets()['total'], 0)
+        start = timezone.localdate() + timedelta(days=1)
+
+        # A batch size that splits grounds and days across several transactions
+        out = self.generate(
+            '--grounds', '3', '--days', '2', '--slots-per-day', '4', '--users', '3',
+            '--booking-ratio', '0.5', '--payment-ratio', '0.5', '--batch-size', '5',
+            '--start-date', start.isoformat(),
+        )
+        self.assertIn('Created 3 grounds, 3 users, 24 slots', out)
+
+        self.assertEqual(Ground.objects.count(), 3)
+        self.assertEqual(Slot.objects.count(), 24)
+        self.assertEqual(set(Slot.objects.values_list('date', flat=True)), {start, start + timedelta(days=1)})
+        booked = Slot.objects.filter(availability_status='Booked')
+        self.assertTrue(0 < booked.count() < 24)
+        self.assertEqual(Booking.objects.count(), booked.count())
+        self.assertEqual(set(Booking.objects.values_list('slot_id', flat=True)), set(booked.values_list('pk', flat=True)))
+        self.assertLessEqual(Payment.objects.count(), Booking.objects.count())
+
+        # Counters, rollups, bitmaps and the facet cache all agree with the tables
+        self.assertTrue(all(stored == counted for stored, counted in counters.reconcile().values()))
+        self.assertEqual(counters.read('grounds', 'slots'), {'grounds': 3, 'slots': 24})
+        self.assertEqual(
+            DailyRevenue.objects.aggregate(total=Sum('amount'))['total'],
+            Payment.objects.filter(payment_status='Paid').aggregate(total=Sum('amount'))['total'],
+        )
+        expected = defaultdict(list)
+        for ground_id, day, *slot in Slot.objects.values_list(
+            'ground_id', 'date', 'start_time', 'end_time', 'availability_status'
+        ):
+            expected[ground_id, day].append(slot)
+        expected = {key: day_bits(slots) for key, slots in expected.items()}
+        stored = {
+            (ground_id, day): decode(free)
+            for ground_id, day, free in AvailabilityBitmap.objects.values_list('ground_id', 'date', 'free')
+        }
+        self.assertEqual(
+            {key: bits for key, bits in stored.items() if bits}, {key: bits for key, bits in expected.items() if bits}
+        )
+        self.assertEqual(facets.ground_facets()['total'], 3)
+
+    def test_reruns_add_grounds_but_reuse_users(self):
+        args = ['--grounds', '1', '--days', '1', '--slots-per-day', '2', '--users', '2', '--booking-ratio', '1']
+        self.generate(*args)
+        self.generate(*args)
+        self.assertEqual(User.objects.filter(username__startswith='loadtest-42-').count(), 2)
+        # The demo ground is only created once; the rerun adds a synthetic one
+        self.assertEqual(Ground.objects.filter(name='Green Field Cricket Ground').count(), 1)
+        self.assertEqual((Ground.objects.count(), Booking.objects.count()), (2, 4))
+
+    def test_invalid_options(self):
+        for args in (['--batch-size', '0'], ['--booking-ratio', '2'], ['--slots-per-day', '100']):
+            with self.assertRaises(CommandError):
+                call_command('generate_data', *args, stdout=io.StringIO())
@@ -0,0 +1,140 @@
+import io
+from datetime import time as dtime, timedelta
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import bitmaps
+from ..imports import ImportFileError, import_file
+from ..models import AvailabilityBitmap, Ground, Slot
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+
+def csv_file(*lines):
+    return io.BytesIO('\n'.join(lines).encode())
+
+
+class ImportTests(TestCase):
+    def setUp(self):
+        self.ground = Ground.objects.create(name='Green Field', location='Downtown', sport_type='Cricket')
+        self.day = timezone.now().date() + timedelta(days=1)
+        Slot.objects.create(
+            ground=self.ground, date=self.day, start_time=dtime(6), end_time=dtime(8), price_per_slot=1000
+        )
+
+    def import_slots(self, *rows, **kwargs):
+        lines = ['ground,date,start_time,end_time,price_per_slot'] + [','.join(map(str, row)) for row in rows]
+        return import_file('slots', csv_file(*lines), 'slots.csv', **kwargs)
+
+    def test_grounds_are_validated_like_the_form(self):
+        result = import_file('grounds', csv_file(
+            '﻿Name,Location,Sport Type,Rating',
+            'Ace Courts,East End,Tennis,4.5',
+            ',West End,Tennis,',
+            '',
+            'Blue Arena,North,Curling,7',
+        ), 'grounds.csv')
+        self.assertEqual((result.rows, result.created, result.error_count), (3, 1, 2))
+        self.assertEqual(result.errors[0], (3, 'name: This field is required.'))
+        self.assertEqual(result.errors[1][0], 5)
+        self.assertIn('sport_type', result.errors[1][1])
+        self.assertIn('rating', result.errors[1][1])
+        self.assertTrue(Ground.objects.filter(name='Ace Courts', rating=4.5).exists())
+
+    def test_slots_report_row_errors_and_overlaps(self):
+        Ground.objects.create(name='Twin', location='A', sport_type='Tennis')
+        Ground.objects.create(name='Twin', location='B', sport_type='Tennis')
+        result = self.import_slots(
+            (self.ground.id, self.day, '08:00', '10:00', 900),
+            ('Green Field', self.day, '10:00', '12:00', 900),
+            (self.ground.id, self.day, '07:00', '09:00', 900),
+            ('Nowhere', self.day, '12:00', '13:00', 900),
+            ('Twin', self.day, '12:00', '13:00', 900),
+            (self.ground.id, self.day, '14:00', '13:00', 900),
+            (self.ground.id, self.day - timedelta(days=2), '14:00', '15:00', 900),
+            (self.ground.id, self.day, '09:00', '11:00', 900),
+            batch_size=4,
+        )
+        self.assertEqual((result.rows, result.created, result.error_count), (8, 2, 6))
+        self.assertEqual(result.errors, [
+            (4, 'Overlaps the slot 06:00-08:00 on this ground.'),
+            (5, 'ground: Unknown ground "Nowhere".'),
+            (6, 'ground: Several grounds are called "Twin"; use the ground id.'),
+            (7, 'Start time must be before end time.'),
+            (8, 'Cannot create slots for past dates.'),
+            # Checked against the first batch, which is already stored
+            (9, 'Overlaps the slot 10:00-12:00 on this ground.'),
+        ])
+        slots = Slot.objects.filter(ground=self.ground).order_by('start_time')
+        self.assertEqual([slot.start_time for slot in slots], [dtime(6), dtime(8), dtime(10)])
+        self.assertEqual(slots[1].availability_status, 'Available')
+        windows = bitmaps.free_windows(360, self.day, self.day, grounds=[self.ground])
+        self.assertEqual([(w.start_time, w.end_time) for w in windows], [(dtime(6), dtime(12))])
+
+    def test_queries_per_batch_do_not_grow_with_rows(self):
+        rows = [(self.ground.id, self.day, f'{hour:02}:00', f'{hour + 1:02}:00', 500) for hour in range(8, 20)]
+        # Per batch: grounds, stored slots, the insert, the bitmap refresh
+        # (lock, read, upsert) and the slot counter, plus two savepoint pairs
+        with self.assertNumQueries(11):
+            self.import_slots(*rows[:4], batch_size=100)
+        with self.assertNumQueries(11):
+            self.import_slots(*rows[4:], batch_size=100)
+
+    def test_dry_run_imports_nothing(self):
+        result = self.import_slots(
+            (self.ground.id, self.day, '08:00', '10:00', 900),
+            (self.ground.id, self.day, '09:00', '11:00', 900),
+            dry_run=True,
+            batch_size=1,
+        )
+        self.assertEqual((result.created, result.error_count), (1, 1))
+        self.assertEqual(Slot.objects.count(), 1)
+        self.assertEqual(AvailabilityBitmap.objects.filter(ground=self.ground).count(), 1)
+
+    def test_bad_files(self):
+        with self.assertRaisesMessage(ImportFileError, 'Missing columns: end_time, price_per_slot.'):
+            import_file('slots', csv_file('ground,date,start_time'), 'slots.csv')
+        with self.assertRaisesMessage(ImportFileError, 'Unknown columns: colour.'):
+            import_file('grounds', csv_file('name,location,sport_type,colour'), 'grounds.csv')
+        with self.assertRaisesMessage(ImportFileError, 'The file is empty.'):
+            import_file('grounds', csv_file(), 'grounds.csv')
+        with self.assertRaises(ImportFileError):
+            import_file('grounds', csv_file('name'), 'grounds.txt')
+
+    @skipUnless(openpyxl, 'Needs openpyxl')
+    def test_xlsx(self):
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(['ground', 'date', 'start_time', 'end_time', 'price_per_slot', 'availability_status'])
+        sheet.append([float(self.ground.id), self.day, dtime(8), dtime(10), 900.0, 'Maintenance'])
+        sheet.append([self.ground.id, self.day, dtime(7), dtime(9), 900, None])
+        content = io.BytesIO()
+        workbook.save(content)
+        content.seek(0)
+
+        result = import_file('slots', content, 'slots.xlsx')
+        self.assertEqual((result.created, result.errors), (1, [(3, 'Overlaps the slot 06:00-08:00 on this ground.')]))
+        self.assertEqual(Slot.objects.get(start_time=dtime(8)).availability_status, 'Maintenance')
+
+        with self.assertRaises(ImportFileError):
+            import_file('slots', io.BytesIO(b'not a workbook'), 'slots.xlsx')
+
+    def test_admin_upload(self):
+        User.objects.create_user('staff', password='secret123', is_staff=True)
+        self.client.login(username='staff', password='secret123')
+        upload = SimpleUploadedFile('grounds.csv', b'name,location,sport_type\nAce Courts,East End,Tennis\n')
+        response = self.client.post(reverse('admin_import'), {'kind': 'grounds', 'file': upload, 'dry_run': 'on'})
+        self.assertContains(response, 'would be imported')
+        self.assertFalse(Ground.objects.filter(name='Ace Courts').exists())
+
+        upload = SimpleUploadedFile('grounds.csv', b'name\nAce Courts\n')
+        response = self.client.post(reverse('admin_import'), {'kind': 'grounds', 'file': upload})
+        self.assertContains(response, 'Missing columns: location, sport_type.')
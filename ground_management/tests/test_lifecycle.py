@@ -0,0 +1,88 @@
+import io
+from datetime import time as dtime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import bitmaps
+from ..lifecycle import sweep
+from ..models import AvailabilityBitmap, Booking, Ground, LifecycleSweep, Slot
+
+
+class LifecycleSweepTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.player = User.objects.create_user('player', password='secret123')
+        cls.ground = Ground.objects.create(name='Green Field', location='Downtown', sport_type='Cricket')
+        cls.today = timezone.localdate()
+        cls.bookings = {}
+        for days_ago, status in [(20, 'Confirmed'), (3, 'Pending'), (1, 'Cancelled'), (0, 'Confirmed')]:
+            slot = Slot.objects.create(
+                ground=cls.ground, date=cls.today - timedelta(days=days_ago), start_time=dtime(6),
+                end_time=dtime(8), price_per_slot=1000, availability_status='Booked'
+            )
+            cls.bookings[days_ago] = Booking.objects.create(user=cls.player, slot=slot, status=status)
+        for days_ago in (10, 0):
+            Slot.objects.create(
+                ground=cls.ground, date=cls.today - timedelta(days=days_ago), start_time=dtime(10),
+                end_time=dtime(12), price_per_slot=1000
+            )
+
+    def status(self, days_ago):
+        return Booking.objects.get(pk=self.bookings[days_ago].pk).status
+
+    def test_sweeps_past_days_in_chunks(self):
+        self.assertTrue(AvailabilityBitmap.objects.filter(date=self.today - timedelta(days=10)).exists())
+        record = sweep(chunk_days=7)
+        self.assertEqual(
+            (record.from_date, record.through_date),
+            (self.today - timedelta(days=20), self.today - timedelta(days=1))
+        )
+        self.assertEqual((record.bookings_completed, record.bookings_cancelled, record.slots_closed), (1, 1, 1))
+        self.assertEqual(
+            [self.status(days_ago) for days_ago in (20, 3, 1, 0)],
+            ['Completed', 'Cancelled', 'Cancelled', 'Confirmed']
+        )
+        self.assertEqual(
+            list(Slot.objects.filter(availability_status='Available').values_list('date', flat=True)),
+            [self.today]
+        )
+        self.assertFalse(AvailabilityBitmap.objects.filter(date__lt=self.today).exists())
+        windows = bitmaps.free_windows(60, self.today, self.today, grounds=[self.ground])
+        self.assertEqual(len(windows), 1)
+
+        # The next run starts where this one stopped
+        self.assertIsNone(sweep())
+        record = sweep(today=self.today + timedelta(days=1))
+        self.assertEqual((record.from_date, record.bookings_completed, record.slots_closed), (self.today, 1, 1))
+
+    def test_queries_per_chunk_do_not_grow_with_rows(self):
+        sweep(since=self.today - timedelta(days=1))
+        # The last sweep, then per chunk: user ids, two booking updates, ground
+        # ids, slot update, bitmap delete and the analytics rollup (read, delete,
+        # insert), plus two savepoint pairs; then the record
+        with self.assertNumQueries(15):
+            sweep(today=self.today + timedelta(days=1))
+
+    def test_user_pages_split_by_status(self):
+        sweep()
+        self.client.login(username='player', password='secret123')
+        response = self.client.get(reverse('user_bookings'))
+        self.assertEqual(list(response.context['upcoming_bookings']), [self.bookings[0]])
+        self.assertEqual(
+            [booking.pk for booking in response.context['past_bookings']],
+            [self.bookings[days_ago].pk for days_ago in (1, 3, 20)]
+        )
+        response = self.client.get(reverse('user_dashboard'))
+        self.assertEqual(list(response.context['upcoming_bookings']), [self.bookings[0]])
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command('sweep_lifecycle', stdout=out)
+        self.assertIn('1 bookings completed, 1 cancelled, 1 slots closed', out.getvalue())
+        call_command('sweep_lifecycle', stdout=out)
+        self.assertIn('Nothing to sweep.', out.getvalue())
+        self.assertEqual(LifecycleSweep.objects.count(), 1)
@@ -0,0 +1,257 @@
+import asyncio
+import json
+import threading
+from datetime import time as dtime, timedelta
+from unittest import mock, skipUnless
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import live
+from ..models import Booking, Ground, Slot
+
+try:
+    import fakeredis
+    from redis.exceptions import ConnectionError as RedisConnectionError
+except ImportError:
+    fakeredis = None
+
+
+class RecordingBroker(live.InMemoryBroker):
+    def __init__(self):
+        super().__init__()
+        self.published = []
+
+    def publish(self, channel, event):
+        self.published.append((channel, event['slot'], event['status']))
+        super().publish(channel, event)
+
+
+def parse_events(text):
+    events = []
+    for block in text.strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.split('\n') if not line.startswith(':'))
+        if 'event' in fields:
+            events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+
+class BrokerTests(SimpleTestCase):
+    def test_fan_out_from_another_thread(self):
+        broker = live.InMemoryBroker()
+
+        async def main():
+            subscriptions = [broker.subscribe('slots:1:2030-01-01') for _ in range(500)]
+            other = broker.subscribe('slots:2:2030-01-01')
+            thread = threading.Thread(target=broker.publish, args=('slots:1:2030-01-01', {'slot': 7}))
+            thread.start()
+            received = await asyncio.gather(*(s.get(timeout=1) for s in subscriptions))
+            thread.join()
+            self.assertEqual(received, [{'slot': 7}] * 500)
+            self.assertIsNone(await other.get(timeout=0.01))
+
+            for subscription in subscriptions + [other]:
+                subscription.close()
+            self.assertEqual(broker.subscriber_count(), 0)
+
+        asyncio.run(main())
+
+    def test_slow_subscriber_is_told_to_resync(self):
+        broker = live.InMemoryBroker()
+
+        async def main():
+            subscription = broker.subscribe('slots:1:2030-01-01')
+            for i in range(live.SUBSCRIBER_QUEUE_SIZE + 5):
+                broker.publish('slots:1:2030-01-01', {'slot': i})
+            await asyncio.sleep(0)
+            self.assertIs(await subscription.get(timeout=1), live.RESYNC)
+            self.assertIsNone(await subscription.get(timeout=0.01))
+
+            broker.publish('slots:1:2030-01-01', {'slot': 1})
+            self.assertEqual(await subscription.get(timeout=1), {'slot': 1})
+            subscription.close()
+
+        asyncio.run(main())
+
+
+@skipUnless(fakeredis, 'needs fakeredis')
+@override_settings(LIVE_REDIS_URL='redis://fake:6379/0')
+class RedisBrokerTests(SimpleTestCase):
+    def setUp(self):
+        self.server = fakeredis.FakeServer()
+        self.redis = fakeredis.FakeRedis(server=self.server)
+        # Listeners connect with the async client; failing() ones drop like a lost server
+        self.async_clients = []
+        patchers = [
+            mock.patch('redis.Redis.from_url', lambda url: fakeredis.FakeRedis(server=self.server)),
+            mock.patch('redis.asyncio.Redis.from_url', lambda url: self.async_clients.pop(0)),
+            mock.patch.object(live, 'REDIS_RETRY_SECONDS', 0),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def connects(self):
+        self.async_clients.append(fakeredis.FakeAsyncRedis(server=self.server))
+
+    def fails(self):
+        pubsub = mock.Mock(psubscribe=mock.AsyncMock(side_effect=RedisConnectionError('Connection refused')))
+        self.async_clients.append(mock.Mock(pubsub=mock.Mock(return_value=pubsub)))
+
+    async def listening(self):
+        for _ in range(200):
+            if self.redis.pubsub_numpat():
+                return
+            await asyncio.sleep(0.01)
+        self.fail('The Redis listener never subscribed')
+
+    def test_events_cross_processes(self):
+        self.connects()
+        publisher, subscriber = live.RedisBroker(), live.RedisBroker()
+
+        async def main():
+            subscription = subscriber.subscribe('slots:1:2030-01-01')
+            other = subscriber.subscribe('slots:2:2030-01-01')
+            await self.listening()
+            publisher.publish('slots:1:2030-01-01', {'slot': 7, 'status': 'Booked'})
+            self.assertEqual(await subscription.get(timeout=1), {'slot': 7, 'status': 'Booked'})
+            self.assertIsNone(await other.get(timeout=0.01))
+
+        asyncio.run(main())
+
+    def test_reconnected_listener_resyncs(self):
+        self.fails()
+        self.connects()
+        broker = live.RedisBroker()
+
+        async def main():
+            subscription = broker.subscribe('slots:1:2030-01-01')
+            # Deltas sent while the listener was down are lost, so it asks for a snapshot
+            self.assertIs(await subscription.get(timeout=1), live.RESYNC)
+            await self.listening()
+            broker.publish('slots:1:2030-01-01', {'slot': 7})
+            self.assertEqual(await subscription.get(timeout=1), {'slot': 7})
+
+        asyncio.run(main())
+
+
+class LiveAvailabilityTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('player', password='secret123')
+        self.ground = Ground.objects.create(name='Green Field', location='Downtown', sport_type='Cricket')
+        self.day = timezone.now().date() + timedelta(days=1)
+        self.slots = [
+            Slot.objects.create(
+                ground=self.ground,
+                date=self.day,
+                start_time=dtime(hour, 0),
+                end_time=dtime(hour + 2, 0),
+                price_per_slot=1000
+            )
+            for hour in (16, 18)
+        ]
+        self.channel = live.channel_name(self.ground.id, self.day)
+        self.broker = RecordingBroker()
+        patcher = mock.patch.object(live, 'broker', self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_booking_and_cancellation_publish(self):
+        self.client.force_login(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('book_ground', args=[self.ground.id]),
+                {'slot': self.slots[0].id, 'status': 'Confirmed'}
+            )
+        booking = Booking.objects.get(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('cancel_booking', args=[booking.id]))
+
+        self.assertEqual(self.broker.published, [
+            (self.channel, self.slots[0].id, 'Booked'),
+            (self.channel, self.slots[0].id, 'Available'),
+        ])
+
+    def test_admin_slot_edits_publish(self):
+        slot = self.slots[1]
+        slot_id = slot.id
+        with self.captureOnCommitCallbacks(execute=True):
+            slot.availability_status = 'Maintenance'
+            slot.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            slot.date = self.day + timedelta(days=1)
+            slot.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            slot.delete()
+
+        moved = live.channel_name(self.ground.id, self.day + timedelta(days=1))
+        self.assertEqual(self.broker.published, [
+            (self.channel, slot_id, 'Maintenance'),
+            (moved, slot_id, 'Maintenance'),
+            (self.channel, slot_id, 'Removed'),
+            (moved, slot_id, 'Removed'),
+        ])
+
+    def test_broker_failure_does_not_fail_the_booking(self):
+        self.client.force_login(self.user)
+        with mock.patch.object(self.broker, 'publish', side_effect=ConnectionError('Redis is down')):
+            with self.assertLogs('django', 'ERROR'), self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    reverse('book_ground', args=[self.ground.id]),
+                    {'slot': self.slots[0].id, 'status': 'Confirmed'}
+                )
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Booking.objects.filter(user=self.user).exists())
+
+    def test_nothing_published_on_rollback(self):
+        self.client.force_login(self.user)
+        self.slots[0].availability_status = 'Booked'
+        self.slots[0].save()
+        self.broker.published.clear()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('book_ground', args=[self.ground.id]),
+                {'slot': self.slots[0].id, 'status': 'Confirmed'}
+            )
+        self.assertEqual(self.broker.published, [])
+
+    def test_wsgi_stream_sends_snapshot_and_reconnects(self):
+        response = self.client.get(reverse('slot_stream', args=[self.ground.id]), {'date': f'{self.day:%Y-%m-%d}'})
+
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertIn(f'retry: {live.POLL_RECONNECT_MS}', response.content.decode())
+        ((name, slots),) = parse_events(response.content.decode())
+        self.assertEqual(name, 'snapshot')
+        self.assertEqual([s['slot'] for s in slots], [slot.id for slot in self.slots])
+        self.assertEqual(slots[0]['start_time'], '16:00:00')
+        self.assertEqual(self.client.get(reverse('slot_stream', args=[999])).status_code, 404)
+
+    @override_settings(ROOT_URLCONF='sports_ground_management.asgi_urls')
+    async def test_asgi_stream_pushes_changes(self):
+        url = reverse('slot_stream', args=[self.ground.id])
+        response = await self.async_client.get(url, {'date': f'{self.day:%Y-%m-%d}'})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = aiter(response.streaming_content)
+
+        self.assertTrue((await anext(chunks)).startswith(b'retry:'))
+        ((name, slots),) = parse_events((await anext(chunks)).decode())
+        self.assertEqual((name, len(slots)), ('snapshot', 2))
+        self.assertEqual(self.broker.subscriber_count(self.channel), 1)
+
+        slot = self.slots[0]
+        self.broker.publish(self.channel, live.slot_event(slot, 'Booked'))
+        chunk = await asyncio.wait_for(anext(chunks), 1)
+        self.assertEqual(parse_events(chunk.decode()), [('slot', live.slot_event(slot, 'Booked'))])
+
+        # A client disconnect cancels the pending read, as the ASGI handler does
+        pending = asyncio.ensure_future(anext(chunks))
+        await asyncio.sleep(0.01)
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+        self.assertEqual(self.broker.subscriber_count(), 0)
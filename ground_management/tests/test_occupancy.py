@@ -0,0 +1,138 @@
+from datetime import time as dtime, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..archive import archive_history
+from ..models import ArchivedSlot, Ground, Slot
+from ..occupancy import combined_heatmap, ground_occupancy, occupancy_heatmap
+
+
+@override_settings(ARCHIVE_RETENTION_DAYS=30)
+class OccupancyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', password='secret123', is_staff=True)
+        cls.player = User.objects.create_user('player', password='secret123')
+        cls.green = Ground.objects.create(name='Green Field', location='Downtown', sport_type='Cricket')
+        cls.blue = Ground.objects.create(name='Blue Court', location='Uptown', sport_type='Tennis')
+        today = timezone.localdate()
+        cls.monday = today + timedelta(days=7 - today.weekday())
+        cls.tuesday = cls.monday + timedelta(days=1)
+        for ground, day, hour, status in [
+            (cls.green, cls.monday, 6, 'Booked'),
+            (cls.green, cls.monday, 7, 'Available'),
+            (cls.green, cls.monday, 8, 'Maintenance'),
+            (cls.green, cls.tuesday, 6, 'Booked'),
+            (cls.blue, cls.monday, 6, 'Available'),
+            (cls.blue, cls.tuesday, 18, 'Booked'),
+            # Ten weeks back, so archived; same ground, weekday and hour as the first
+            (cls.green, cls.monday - timedelta(weeks=10), 6, 'Booked'),
+        ]:
+            Slot.objects.create(
+                ground=ground, date=day, start_time=dtime(hour), end_time=dtime(hour + 1),
+                price_per_slot=1000, availability_status=status
+            )
+        archive_history()
+
+    def test_counts_per_ground_include_the_archive(self):
+        self.assertEqual(ArchivedSlot.objects.count(), 1)
+        with self.assertNumQueries(2):
+            occupancy = ground_occupancy()
+        self.assertEqual(
+            [
+                (row['ground'], row['total_slots'], row['booked_slots'], row['maintenance_slots'], row['occupancy_rate'])
+                for row in occupancy
+            ],
+            [(self.green, 5, 3, 1, 60.0), (self.blue, 2, 1, 0, 50.0)]
+        )
+
+    def test_date_window(self):
+        # A window after the archive cutoff reads the hot table alone
+        with self.assertNumQueries(2):
+            occupancy = ground_occupancy(self.monday, self.monday)
+        self.assertEqual(
+            [(row['ground'], row['total_slots'], row['booked_slots'], row['maintenance_slots']) for row in occupancy],
+            [(self.green, 3, 1, 1), (self.blue, 1, 0, 0)]
+        )
+        self.assertAlmostEqual(occupancy[0]['occupancy_rate'], 100 / 3)
+        self.assertEqual(occupancy[1]['occupancy_rate'], 0)
+
+        # Grounds without slots in the window are left out
+        self.assertEqual({row['ground'] for row in ground_occupancy(self.tuesday)}, {self.green, self.blue})
+        self.assertEqual(ground_occupancy(self.tuesday + timedelta(days=1)), [])
+
+    def test_heatmap_cells(self):
+        cells = {
+            (cell['ground_id'], cell['weekday'], cell['hour']): (
+                cell['total_slots'], cell['booked_slots'], cell['maintenance_slots']
+            )
+            for cell in occupancy_heatmap()
+        }
+        self.assertEqual(cells, {
+            # The hot and archived Monday 06:00 slots add up
+            (self.green.id, 1, 6): (2, 2, 0),
+            (self.green.id, 1, 7): (1, 0, 0),
+            (self.green.id, 1, 8): (1, 0, 1),
+            (self.green.id, 2, 6): (1, 1, 0),
+            (self.blue.id, 1, 6): (1, 0, 0),
+            (self.blue.id, 2, 18): (1, 1, 0),
+        })
+        self.assertEqual(len(occupancy_heatmap(self.tuesday, self.tuesday)), 2)
+
+        grid = combined_heatmap(occupancy_heatmap())
+        self.assertEqual(grid['hours'], [6, 7, 8, 18])
+        rows = {row['weekday']: row['rates'] for row in grid['rows']}
+        self.assertEqual(list(rows), ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'])
+        self.assertAlmostEqual(rows['Mon'][0], 200 / 3)
+        self.assertEqual(rows['Mon'][1:], [0.0, 0.0, None])
+        self.assertEqual(rows['Tue'], [100.0, None, None, 100.0])
+        self.assertEqual(rows['Sun'], [None] * 4)
+
+    def test_report_pages(self):
+        self.client.login(username='staff', password='secret123')
+        window = {'start_date': self.monday.isoformat(), 'end_date': self.monday.isoformat()}
+        response = self.client.get(reverse('occupancy_report'), window)
+        self.assertEqual(
+            [(row['ground'], row['total_slots']) for row in response.context['occupancy_data']],
+            [(self.green, 3), (self.blue, 1)]
+        )
+        self.assertEqual(response.context['heatmap']['hours'], [6, 7, 8])
+
+        data = self.client.get(reverse('occupancy_report_json'), window).json()
+        self.assertEqual((data['start_date'], data['end_date']), (self.monday.isoformat(), self.monday.isoformat()))
+        self.assertEqual(data['grounds'], [
+            {
+                'id': self.green.id, 'name': 'Green Field', 'sport_type': 'Cricket', 'location': 'Downtown',
+                'total_slots': 3, 'booked_slots': 1, 'maintenance_slots': 1, 'occupancy_rate': 33.33,
+            },
+            {
+                'id': self.blue.id, 'name': 'Blue Court', 'sport_type': 'Tennis', 'location': 'Uptown',
+                'total_slots': 1, 'booked_slots': 0, 'maintenance_slots': 0, 'occupancy_rate': 0,
+            },
+        ])
+        self.assertEqual(
+            [(cell['ground_id'], cell['weekday'], cell['hour'], cell['booked_slots']) for cell in data['heatmap']],
+            # Sorted by ground, weekday and hour; Green Field was created first
+            [(self.green.id, 1, 6, 1), (self.green.id, 1, 7, 0), (self.green.id, 1, 8, 0), (self.blue.id, 1, 6, 0)]
+        )
+
+        # Without a window the export covers everything, archive included
+        data = self.client.get(reverse('occupancy_report_json')).json()
+        self.assertEqual((data['start_date'], data['end_date']), (None, None))
+        self.assertEqual([row['total_slots'] for row in data['grounds']], [5, 2])
+
+    def test_report_errors_and_access(self):
+        self.client.login(username='staff', password='secret123')
+        response = self.client.get(
+            reverse('occupancy_report_json'),
+            {'start_date': self.tuesday.isoformat(), 'end_date': self.monday.isoformat()}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors']['__all__'], ['Start date must be on or before end date.'])
+
+        self.client.login(username='player', password='secret123')
+        for name in ('occupancy_report', 'occupancy_report_json'):
+            self.assertEqual(self.client.get(reverse(name)).status_code, 302)
@@ -0,0 +1,146 @@
+from datetime import date, time as dtime, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from ..forms import SlotForm
+from ..models import Ground, Slot
+from ..overlaps import check_slots, clashing_slot, find_overlaps
+from ..schedules import Schedule, create_schedule_slots, preview_schedule
+
+
+class FindOverlapsTests(SimpleTestCase):
+    def test_sweep_pairs_each_overlap_with_furthest_earlier_slot(self):
+        day = date(2030, 1, 1)
+        rows = [
+            (1, day, dtime(6), dtime(12), 'long'),
+            (1, day, dtime(7), dtime(8), 'inside'),
+            (1, day, dtime(12), dtime(13), 'adjacent'),
+            (1, day + timedelta(days=1), dtime(6), dtime(8), 'next day'),
+            (2, day, dtime(6), dtime(8), 'other ground'),
+            (2, day, dtime(7, 30), dtime(9), 'partial'),
+        ]
+        pairs = [(earlier[4], later[4]) for earlier, later in find_overlaps(rows)]
+        self.assertEqual(pairs, [('long', 'inside'), ('other ground', 'partial')])
+
+
+class SlotOverlapTests(TestCase):
+    def setUp(self):
+        self.ground = Ground.objects.create(name='Green Field', location='Downtown', sport_type='Cricket')
+        self.day = timezone.now().date() + timedelta(days=1)
+        self.slot = self.make_slot(6, 8)
+
+    def make_slot(self, start, end, day=None):
+        return Slot.objects.create(
+            ground=self.ground,
+            date=day or self.day,
+            start_time=dtime(start),
+            end_time=dtime(end),
+            price_per_slot=1000
+        )
+
+    def form(self, start, end, instance=None):
+        return SlotForm({
+            'ground': self.ground.id,
+            'date': self.day,
+            'start_time': f'{start:02}:00',
+            'end_time': f'{end:02}:00',
+            'price_per_slot': '1000',
+            'availability_status': 'Available',
+        }, instance=instance)
+
+    def test_form_rejects_overlap(self):
+        form = self.form(7, 9)
+        # The ground choice, the overlap check, then unique_ground_slot's own validation
+        with self.assertNumQueries(4):
+            self.assertFalse(form.is_valid())
+        self.assertIn('Overlaps the existing slot 06:00-08:00', form.errors['__all__'][0])
+
+        self.assertTrue(self.form(8, 10).is_valid())
+        self.assertTrue(self.form(5, 7, instance=self.slot).is_valid())
+
+    def test_clashing_slot(self):
+        self.assertEqual(clashing_slot(self.ground.id, self.day, dtime(7), dtime(7, 30)), self.slot)
+        self.assertIsNone(clashing_slot(self.ground.id, self.day, dtime(8), dtime(9)))
+        self.assertIsNone(clashing_slot(self.ground.id, self.day, dtime(7), dtime(9), exclude_pk=self.slot.pk))
+
+    @skipUnless(connection.vendor in ('postgresql', 'sqlite'), 'Needs the slot overlap constraint')
+    def test_database_rejects_overlaps(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.make_slot(7, 9)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Slot.objects.bulk_create([
+                Slot(ground=self.ground, date=self.day, start_time=dtime(10), end_time=dtime(12), price_per_slot=1),
+                Slot(ground=self.ground, date=self.day, start_time=dtime(11), end_time=dtime(13), price_per_slot=1),
+            ])
+        other = self.make_slot(8, 10)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Slot.objects.filter(pk=other.pk).update(start_time=dtime(7))
+
+        # Moving a slot within its own time, or to another day, is fine
+        Slot.objects.filter(pk=other.pk).update(end_time=dtime(9))
+        self.slot.date += timedelta(days=1)
+        self.slot.save()
+        self.assertEqual(Slot.objects.count(), 2)
+
+    @skipUnless(connection.vendor == 'sqlite', 'Only SQLite loses its triggers')
+    def test_rebuild_triggers_after_a_table_rebuild(self):
+        # A table rebuild takes the triggers with it
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER slot_no_overlap_insert')
+            cursor.execute('DROP TRIGGER slot_no_overlap_update')
+        self.make_slot(7, 9)
+
+        out = StringIO()
+        call_command('rebuild_overlap_triggers', stdout=out)
+        self.assertIn('Recreated the slot overlap triggers.', out.getvalue())
+        self.assertIn('1 overlapping slot pairs were stored meanwhile', out.getvalue())
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.make_slot(8, 10)
+        later = self.make_slot(10, 12)
+        later.start_time = dtime(8)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            later.save()
+
+    def test_check_slots_against_stored_and_new(self):
+        new = [
+            Slot(ground=self.ground, date=self.day, start_time=dtime(start), end_time=dtime(end))
+            for start, end in [(5, 7), (8, 10), (9, 11), (10, 12), (11, 12)]
+        ]
+        with self.assertNumQueries(3):
+            clashes = [clash for _, clash in check_slots(new, batch_size=2)]
+        self.assertEqual(clashes, [
+            (dtime(6), dtime(8)),
+            None,
+            (dtime(8), dtime(10)),
+            None,
+            (dtime(10), dtime(12)),
+        ])
+
+    def test_schedules_skip_overlaps(self):
+        schedule = Schedule(
+            grounds=[self.ground],
+            start_date=self.day,
+            end_date=self.day + timedelta(days=1),
+            weekdays=set(range(7)),
+            # Overlapping ranges produce overlapping slots on every day
+            time_ranges=[(dtime(6), dtime(10)), (dtime(9), dtime(11))],
+            slot_minutes=60,
+            price_per_slot=Decimal('800'),
+        )
+        # 6 slots a day: 06-07 and 07-08 clash with 06-08 on the first day;
+        # 09-10 from both ranges clashes once per day
+        preview = preview_schedule(schedule)
+        self.assertEqual((preview['total'], preview['conflicts'], preview['to_create']), (12, 4, 8))
+
+        self.assertEqual(create_schedule_slots(schedule), 8)
+        rows = Slot.objects.order_by('ground_id', 'date', 'start_time').values_list(
+            'ground_id', 'date', 'start_time', 'end_time'
+        )
+        self.assertEqual(list(find_overlaps(rows)), [])
+        self.assertEqual(create_schedule_slots(schedule), 0)
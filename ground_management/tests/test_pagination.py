@@ -0,0 +1,118 @@
+import base64
+import json
+from datetime import datetime, time as dtime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Booking, Ground, Slot
+from ..pagination import InvalidCursor, encode_cursor, keyset_paginate
+
+FIELDS = ['booking_date', 'id']
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', password='secret123', is_staff=True)
+        cls.player = User.objects.create_user('player', password='secret123')
+        cls.green = Ground.objects.create(name='Green Field', location='Downtown', sport_type='Cricket')
+        cls.blue = Ground.objects.create(name='Blue Court', location='Uptown', sport_type='Tennis')
+        day = timezone.localdate() + timedelta(days=1)
+        noon = datetime(2026, 1, 1, 12, tzinfo=dt_timezone.utc)
+        # Booked a minute apart, except the three in the middle, booked at the same instant
+        minutes = [0, 1, 2, 3, 3, 3, 4, 5, 6, 7, 8, 9]
+        for i, minute in enumerate(minutes):
+            slot = Slot.objects.create(
+                ground=cls.green if i % 2 else cls.blue, date=day, start_time=dtime(6 + i),
+                end_time=dtime(7 + i), price_per_slot=500
+            )
+            booking = Booking.objects.create(
+                user=cls.player, slot=slot, status='Confirmed' if i % 4 < 2 else 'Pending'
+            )
+            Booking.objects.filter(pk=booking.pk).update(booking_date=noon + timedelta(minutes=minute))
+        cls.newest_first = list(Booking.objects.order_by('-booking_date', '-id').values_list('id', flat=True))
+
+    def ids(self, page):
+        return [booking.id for booking in page]
+
+    def walk(self, page_size, descending=True):
+        pages = [keyset_paginate(Booking.objects.all(), FIELDS, page_size=page_size, descending=descending)]
+        while pages[-1].next_cursor:
+            pages.append(keyset_paginate(
+                Booking.objects.all(), FIELDS, after=pages[-1].next_cursor, page_size=page_size, descending=descending
+            ))
+        return pages
+
+    def test_after_cursors_visit_every_row_once(self):
+        # Page size 2 splits the three tied bookings across a page boundary
+        pages = self.walk(2)
+        self.assertEqual([len(page) for page in pages], [2] * 6)
+        self.assertEqual([booking_id for page in pages for booking_id in self.ids(page)], self.newest_first)
+        self.assertIsNone(pages[0].previous_cursor)
+        self.assertIsNotNone(pages[1].previous_cursor)
+        self.assertIsNone(pages[-1].next_cursor)
+
+        # Ascending order walks the same rows backwards
+        self.assertEqual(
+            [booking_id for page in self.walk(3, descending=False) for booking_id in self.ids(page)],
+            self.newest_first[::-1]
+        )
+
+    def test_before_cursors_walk_back(self):
+        pages = self.walk(5)
+        self.assertEqual([len(page) for page in pages], [5, 5, 2])
+        back = keyset_paginate(Booking.objects.all(), FIELDS, before=pages[2].previous_cursor, page_size=5)
+        self.assertEqual(self.ids(back), self.ids(pages[1]))
+        self.assertEqual(back.next_cursor, pages[1].next_cursor)
+        first = keyset_paginate(Booking.objects.all(), FIELDS, before=back.previous_cursor, page_size=5)
+        self.assertEqual(self.ids(first), self.ids(pages[0]))
+        # Back at the start, there is nothing newer
+        self.assertIsNone(first.previous_cursor)
+
+    def test_single_page_and_empty_results(self):
+        page = keyset_paginate(Booking.objects.all(), FIELDS, page_size=20)
+        self.assertEqual((len(page), page.next_cursor, page.previous_cursor), (12, None, None))
+        page = keyset_paginate(Booking.objects.none(), FIELDS)
+        self.assertEqual((len(page), page.next_cursor, page.previous_cursor), (0, None, None))
+
+    def test_bad_cursors(self):
+        for cursor in [
+            'not a cursor',
+            encode_cursor(['2026-01-01 12:00:00+00:00']),
+            encode_cursor(['yesterday', 1]),
+            encode_cursor(['2026-01-01 12:00:00+00:00', 'one']),
+            base64.urlsafe_b64encode(json.dumps({'id': 1}).encode()).decode(),
+        ]:
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidCursor):
+                keyset_paginate(Booking.objects.all(), FIELDS, after=cursor)
+
+    @mock.patch('ground_management.views.BOOKINGS_PER_PAGE', 2)
+    def test_admin_list_pages_within_filters(self):
+        self.client.login(username='staff', password='secret123')
+        url = reverse('admin_booking_list')
+        filters = {'status': 'Confirmed', 'ground': self.green.id}
+        expected = list(
+            Booking.objects.filter(status='Confirmed', slot__ground=self.green)
+            .order_by('-booking_date', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(len(expected), 3)
+
+        response = self.client.get(url, filters)
+        page = response.context['page']
+        self.assertEqual(self.ids(page), expected[:2])
+        # The Older link keeps the filters and carries the cursor
+        self.assertContains(response, f'?status=Confirmed&amp;ground={self.green.id}&amp;after={page.next_cursor}')
+
+        response = self.client.get(url, {**filters, 'after': page.next_cursor})
+        last = response.context['page']
+        self.assertEqual((self.ids(last), last.next_cursor), (expected[2:], None))
+        response = self.client.get(url, {**filters, 'before': last.previous_cursor})
+        self.assertEqual(self.ids(response.context['page']), expected[:2])
+
+        # A tampered cursor falls back to the first page
+        response = self.client.get(url, {**filters, 'after': 'tampered'})
+        self.assertEqual(self.ids(response.context['page']), expected[:2])
@@ -0,0 +1,192 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import time as dtime, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import payments
+from ..bookings import claim_slot, expire_holds, hold_deadline
+from ..models import Booking, DailyRevenue, Ground, Payment, Slot
+from ..payments import FakeGateway, GatewayError, process_pending, submit_payment
+
+
+def make_slots(ground, count, day=None):
+    day = day or timezone.now().date() + timedelta(days=1)
+    return Slot.objects.bulk_create(
+        Slot(
+            ground=ground, date=day, start_time=dtime(hour // 4, hour % 4 * 15),
+            end_time=dtime(hour // 4, hour % 4 * 15 + 14), price_per_slot=800
+        )
+        for hour in range(count)
+    )
+
+
+@override_settings(PAYMENT_WORKERS=0)
+class PaymentPipelineTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('player', password='secret123')
+        self.ground = Ground.objects.create(name='Green Field', location='Downtown', sport_type='Cricket')
+        self.slots = make_slots(self.ground, 2)
+        self.booking = claim_slot(self.user, self.slots[0])
+        self.gateway = FakeGateway(decline_methods=['Cash'])
+        patcher = mock.patch.object(payments, 'gateway', self.gateway)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def pay(self, payment_method='UPI', key='key-1'):
+        self.client.force_login(self.user)
+        return self.client.post(
+            reverse('payment', args=[self.booking.id]),
+            {'payment_method': payment_method, 'amount': '800', 'idempotency_key': key}
+        )
+
+    def test_request_only_queues_the_intent(self):
+        response = self.pay()
+        self.assertRedirects(response, reverse('payment_success', args=[self.booking.id]), fetch_redirect_response=False)
+        payment = Payment.objects.get()
+        self.assertEqual((payment.payment_status, payment.idempotency_key), ('Pending', 'key-1'))
+        self.booking.refresh_from_db()
+        # The hold outlasts the charge and a retry of it
+        self.assertEqual(self.booking.status, 'Pending')
+        self.assertGreater(self.booking.expires_at, hold_deadline() + timedelta(minutes=4))
+        self.assertEqual(self.gateway.charges, {})
+
+        response = self.client.get(reverse('payment_success', args=[self.booking.id]))
+        self.assertContains(response, 'Processing Payment')
+        status = self.client.get(reverse('payment_status', args=[self.booking.id])).json()
+        self.assertEqual((status['status'], status['done']), ('Pending', False))
+
+        self.assertEqual(process_pending(), 1)
+        status = self.client.get(reverse('payment_status', args=[self.booking.id])).json()
+        self.assertEqual((status['status'], status['booking_status'], status['done']), ('Paid', 'Confirmed', True))
+        self.assertContains(self.client.get(reverse('payment_success', args=[self.booking.id])), 'Payment Successful')
+        self.assertEqual(DailyRevenue.objects.get().amount, 800)
+
+    def test_resubmitting_makes_one_intent(self):
+        self.pay()
+        self.pay()
+        self.pay(key='key-2')
+        self.assertEqual(Payment.objects.count(), 1)
+        process_pending()
+        process_pending()
+        self.assertEqual(len(self.gateway.charges), 1)
+
+    def test_declined_payment_restarts_the_hold(self):
+        self.pay('Cash')
+        self.assertEqual(process_pending(), 1)
+        payment = Payment.objects.get()
+        self.assertEqual((payment.payment_status, payment.failure_reason), ('Failed', 'Cash payments were declined.'))
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, 'Pending')
+        self.assertGreater(self.booking.expires_at, timezone.now())
+        self.assertContains(self.client.get(reverse('payment_success', args=[self.booking.id])), 'Try Another Payment Method')
+
+        # A new attempt reuses the payment row under a new key
+        self.pay('UPI', key='key-2')
+        process_pending()
+        payment.refresh_from_db()
+        self.assertEqual((payment.payment_status, payment.idempotency_key), ('Paid', 'key-2'))
+
+    def test_gateway_errors_are_retried_under_the_same_key(self):
+        self.pay()
+        with mock.patch.object(self.gateway, 'charge', side_effect=GatewayError('Timed out')):
+            process_pending()
+        self.assertEqual(Payment.objects.get().payment_status, 'Pending')
+        process_pending()
+        self.assertEqual(Payment.objects.get().payment_status, 'Paid')
+
+    def test_cancelled_booking_is_refunded(self):
+        payment = submit_payment(self.booking, 'UPI', 800, 'key-1')
+        Booking.objects.filter(pk=self.booking.pk).update(status='Cancelled')
+        depths = []
+        refund = self.gateway.refund
+
+        def record_depth(*args):
+            depths.append(len(connection.atomic_blocks))
+            return refund(*args)
+
+        with mock.patch.object(self.gateway, 'refund', side_effect=record_depth):
+            payments.process_payment(payment.pk)
+        payment.refresh_from_db()
+        self.assertEqual(payment.payment_status, 'Refunded')
+        # The refund round trip holds no transaction beyond the test's own
+        self.assertEqual(depths, [len(connection.atomic_blocks)])
+
+    def test_abandoned_processing_is_taken_over(self):
+        payment = submit_payment(self.booking, 'UPI', 800, 'key-1')
+        Payment.objects.filter(pk=payment.pk).update(payment_status='Processing', attempted_at=timezone.now())
+        self.assertEqual(process_pending(), 0)
+        Payment.objects.filter(pk=payment.pk).update(attempted_at=timezone.now() - timedelta(minutes=10))
+        self.assertEqual(process_pending(), 1)
+
+    def test_lost_intent_still_lets_the_hold_lapse(self):
+        # Submitted, but no worker ever picks it up
+        submit_payment(self.booking, 'UPI', 800, 'key-1')
+        self.assertEqual(expire_holds(), 0)
+        self.assertEqual(expire_holds(now=hold_deadline() + timedelta(minutes=6)), 1)
+        self.booking.refresh_from_db()
+        self.slots[0].refresh_from_db()
+        self.assertEqual((self.booking.status, self.slots[0].availability_status), ('Cancelled', 'Available'))
+
+        # A worker that turns up late refunds the charge
+        self.assertEqual(process_pending(), 1)
+        self.assertEqual(Payment.objects.get().payment_status, 'Refunded')
+
+
+class BlockingGateway(FakeGateway):
+    """Holds every charge until released, counting how many wait at once."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.in_flight = self.most_in_flight = 0
+        self._counted = threading.Condition()
+
+    def wait_for_in_flight(self, count):
+        with self._counted:
+            return self._counted.wait_for(lambda: self.in_flight >= count, timeout=10)
+
+    def charge(self, *args, **kwargs):
+        with self._counted:
+            self.in_flight += 1
+            self.most_in_flight = max(self.most_in_flight, self.in_flight)
+            self._counted.notify_all()
+        try:
+            self.release.wait(timeout=10)
+            return super().charge(*args, **kwargs)
+        finally:
+            with self._counted:
+                self.in_flight -= 1
+
+
+class PaymentThroughputTest(TransactionTestCase):
+    """Charge many intents through the pool; workers must overlap the gateway round trips."""
+
+    INTENTS = 40
+    WORKERS = 8
+
+    def setUp(self):
+        ground = Ground.objects.create(name='Stress Arena', location='Test', sport_type='Football')
+        users = User.objects.bulk_create(User(username=f'payer{i}') for i in range(self.INTENTS))
+        self.bookings = [claim_slot(user, slot) for user, slot in zip(users, make_slots(ground, self.INTENTS))]
+
+    def test_workers_overlap_gateway_calls(self):
+        pool = ThreadPoolExecutor(max_workers=self.WORKERS)
+        gateway = BlockingGateway()
+        with mock.patch.object(payments, 'pool', pool), mock.patch.object(payments, 'gateway', gateway):
+            for booking in self.bookings:
+                submit_payment(booking, 'UPI', 800, f'key-{booking.pk}')
+            # Every submission returned while the gateway was still holding its charges
+            self.assertEqual(Payment.objects.filter(payment_status='Paid').count(), 0)
+            self.assertTrue(gateway.wait_for_in_flight(self.WORKERS))
+            gateway.release.set()
+            pool.shutdown(wait=True)
+
+        self.assertEqual(Payment.objects.filter(payment_status='Paid').count(), self.INTENTS)
+        self.assertEqual(Booking.objects.filter(status='Confirmed').count(), self.INTENTS)
+        self.assertEqual(gateway.most_in_flight, self.WORKERS)
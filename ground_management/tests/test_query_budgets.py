@@ -0,0 +1,218 @@
+"""
+Query and wall-clock budgets for every URL in ground_management/urls.py.
+
+Each view is requested anonymously and as a staff user against a fixture with
+dozens of grounds and thousands of slots and bookings. A view that issues
+queries per row (N+1) blows through its budget here, and the growth test
+re-measures every view after adding more rows and requires identical counts.
+"""
+
+import random
+import time
+from datetime import time as dtime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+
+from .. import urls
+from ..models import Booking, CustomUser, Ground, Payment, Slot, SPORT_TYPES, PAYMENT_METHODS
+from ..counters import reconcile
+from ..revenue import rebuild_daily_revenue
+
+# Maximum queries per view: (anonymous, staff). Session and user lookups count.
+QUERY_BUDGETS = {
+    'home': (1, 3),
+    'ground_list': (2, 4),
+    'ground_search_json': (0, 2),
+    'ground_detail': (2, 4),
+    'slot_stream': (2, 4),
+    'login': (0, 2),
+    'logout': (0, 2),
+    'register': (0, 2),
+    'user_dashboard': (0, 5),
+    'user_profile': (0, 3),
+    'edit_profile': (0, 3),
+    'user_bookings': (0, 5),
+    'cancel_booking': (0, 3),
+    'book_ground': (0, 5),
+    'payment': (0, 3),
+    'payment_success': (0, 3),
+    'payment_status': (0, 3),
+    'admin_dashboard': (0, 4),
+    'admin_ground_add': (0, 2),
+    'admin_ground_edit': (0, 3),
+    'admin_ground_delete': (0, 3),
+    'admin_import': (0, 2),
+    'admin_slot_list': (0, 4),
+    'admin_slot_add': (0, 3),
+    'admin_slot_schedule': (0, 3),
+    'admin_slot_edit': (0, 4),
+    'admin_slot_delete': (0, 3),
+    'admin_booking_list': (0, 4),
+    'admin_booking_detail': (0, 3),
+    'admin_export_bookings': (0, 2),
+    'admin_export_payments': (0, 2),
+    'revenue_report': (0, 5),
+    'occupancy_report': (0, 5),
+    'occupancy_report_json': (0, 5),
+    'analytics_report': (0, 6),
+    'analytics_report_json': (0, 6),
+    'api_ground_list': (1, 3),
+    'api_ground_detail': (1, 3),
+    'api_ground_slots': (2, 4),
+    'api_free_windows': (0, 2),
+    'api_booking_list': (0, 3),
+}
+
+# Generous enough for a slow CI box, tight enough to catch per-row work
+WALL_CLOCK_BUDGET = 1.0
+
+GROUNDS = 30
+DAYS = 14
+SLOT_HOURS = [6, 8, 10, 12, 14, 16, 18, 20]
+
+
+def build_dataset(grounds, days, users, booking_ratio=0.5, seed=42, name_prefix='Ground'):
+    """Bulk-create grounds, slots, users, bookings and payments."""
+    rng = random.Random(seed)
+    start = timezone.now().date() - timedelta(days=days // 2)
+
+    ground_rows = Ground.objects.bulk_create(
+        Ground(
+            name=f'{name_prefix} {i}',
+            location=f'Sports City {i % 5}',
+            sport_type=SPORT_TYPES[i % len(SPORT_TYPES)][0],
+            rating=round(rng.uniform(2.5, 5.0), 1),
+            description='Floodlit ground with changing rooms.'
+        )
+        for i in range(grounds)
+    )
+    slot_rows = Slot.objects.bulk_create(
+        Slot(
+            ground=ground,
+            date=start + timedelta(days=day),
+            start_time=dtime(hour, 0),
+            end_time=dtime(hour + 2, 0),
+            price_per_slot=Decimal(500 + hour * 25)
+        )
+        for ground in ground_rows
+        for day in range(days)
+        for hour in SLOT_HOURS
+    )
+    user_rows = User.objects.bulk_create(
+        User(username=f'{name_prefix.lower()}-player{i}', email=f'player{i}@example.com')
+        for i in range(users)
+    )
+
+    booked = [slot for slot in slot_rows if rng.random() < booking_ratio]
+    Slot.objects.filter(pk__in=[slot.pk for slot in booked]).update(availability_status='Booked')
+    booking_rows = Booking.objects.bulk_create(
+        Booking(user=rng.choice(user_rows), slot=slot, status='Confirmed')
+        for slot in booked
+    )
+    Payment.objects.bulk_create(
+        Payment(
+            booking=booking,
+            amount=booking.slot.price_per_slot,
+            payment_method=rng.choice(PAYMENT_METHODS)[0],
+            payment_status='Paid'
+        )
+        for booking in booking_rows
+        if rng.random() < 0.8
+    )
+    rebuild_daily_revenue()
+    reconcile()
+    return ground_rows, slot_rows, booking_rows
+
+
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        grounds, slots, bookings = build_dataset(GROUNDS, DAYS, users=200)
+        cls.ground = grounds[0]
+        cls.slot = slots[0]
+
+        cls.staff = User.objects.create_user('staff', password='secret123', is_staff=True)
+        CustomUser.objects.create(user=cls.staff, phone_number='9876543210', address='Admin Office')
+
+        # The staff user also owns bookings so the user-facing pages have rows
+        cls.booking = Booking.objects.create(user=cls.staff, slot=slots[-1])
+        Payment.objects.create(
+            booking=cls.booking,
+            amount=slots[-1].price_per_slot,
+            payment_method='UPI',
+            payment_status='Paid'
+        )
+        Booking.objects.filter(pk__in=[b.pk for b in bookings[:40]]).update(user=cls.staff)
+
+    def url_for(self, pattern):
+        kwargs = {}
+        for name in pattern.pattern.converters:
+            kwargs[name] = {
+                'ground_id': self.ground.id,
+                'slot_id': self.slot.id,
+                'booking_id': self.booking.id,
+            }[name]
+        return reverse(pattern.name, kwargs=kwargs)
+
+    def patterns(self):
+        return [p for p in urls.urlpatterns if isinstance(p, URLPattern)]
+
+    def measure(self, url):
+        # Budgets are for the cold path, not whatever an earlier request cached
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            began = time.perf_counter()
+            response = self.client.get(url)
+            elapsed = time.perf_counter() - began
+        self.assertLess(response.status_code, 500, url)
+        return len(queries), elapsed, queries
+
+    def measure_all(self):
+        counts = {}
+        for pattern in self.patterns():
+            url = self.url_for(pattern)
+            self.client.logout()
+            anonymous, _, _ = self.measure(url)
+            self.client.force_login(self.staff)
+            staff, _, _ = self.measure(url)
+            counts[pattern.name] = (anonymous, staff)
+        return counts
+
+    def test_every_url_has_a_budget(self):
+        missing = {p.name for p in self.patterns()} - set(QUERY_BUDGETS)
+        self.assertFalse(missing, f'Add query budgets for: {", ".join(sorted(missing))}')
+
+    def test_anonymous_budgets(self):
+        for pattern in self.patterns():
+            with self.subTest(url=pattern.name):
+                count, elapsed, queries = self.measure(self.url_for(pattern))
+                budget = QUERY_BUDGETS[pattern.name][0]
+                self.assertLessEqual(count, budget, self.describe(queries))
+                self.assertLess(elapsed, WALL_CLOCK_BUDGET)
+
+    def test_staff_budgets(self):
+        self.client.force_login(self.staff)
+        for pattern in self.patterns():
+            with self.subTest(url=pattern.name):
+                count, elapsed, queries = self.measure(self.url_for(pattern))
+                budget = QUERY_BUDGETS[pattern.name][1]
+                self.assertLessEqual(count, budget, self.describe(queries))
+                self.assertLess(elapsed, WALL_CLOCK_BUDGET)
+
+    def test_query_counts_do_not_grow_with_data(self):
+        before = self.measure_all()
+
+        build_dataset(5, DAYS, users=20, booking_ratio=0.9, seed=7, name_prefix='Extra')
+        Booking.objects.filter(user__username__startswith='extra-').update(user=self.staff)
+
+        self.assertEqual(self.measure_all(), before)
+
+    def describe(self, queries):
+        return '\n'.join(f'{i}. {query["sql"]}' for i, query in enumerate(queries.captured_queries, 1))
@@ -0,0 +1,128 @@
+import io
+from datetime import datetime, time as dtime, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.models import QuerySet
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import Booking, DailyRevenue, Ground, Payment, Slot
+from ..revenue import apply_delta, rebuild_daily_revenue, revenue_summary
+
+
+class RevenueRollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.player = User.objects.create_user('player', password='secret123')
+        cls.grounds = [
+            Ground.objects.create(name=name, location='Downtown', sport_type='Cricket')
+            for name in ('Green Field', 'Blue Court')
+        ]
+        cls.today = timezone.localdate()
+
+    def pay(self, ground, amount=1000, method='UPI', status='Paid', days_ago=0):
+        slot = Slot.objects.create(
+            ground=ground, date=self.today + timedelta(days=1), start_time=dtime(6 + Slot.objects.count()),
+            end_time=dtime(7 + Slot.objects.count()), price_per_slot=amount
+        )
+        booking = Booking.objects.create(user=self.player, slot=slot)
+        payment = Payment.objects.create(booking=booking, amount=amount, payment_method=method, payment_status=status)
+        if days_ago:
+            payment.payment_date = timezone.make_aware(datetime.combine(self.today - timedelta(days=days_ago), dtime(12)))
+            payment.save()
+        return payment
+
+    def rollup(self):
+        # Rows emptied by refunds stay behind at zero; compare what they hold
+        return {
+            (ground_id, day, method): (amount, count)
+            for ground_id, day, method, amount, count in DailyRevenue.objects.values_list(
+                'ground_id', 'date', 'payment_method', 'amount', 'payment_count'
+            )
+            if count
+        }
+
+    def test_changes_move_amounts_between_rows(self):
+        ground = self.grounds[0].id
+        payment = self.pay(self.grounds[0], status='Pending')
+        self.assertEqual(self.rollup(), {})
+
+        payment.payment_status = 'Paid'
+        payment.save()
+        self.assertEqual(self.rollup(), {(ground, self.today, 'UPI'): (1000, 1)})
+
+        payment.payment_method = 'Cash'
+        payment.save()
+        self.assertEqual(self.rollup(), {(ground, self.today, 'Cash'): (1000, 1)})
+
+        yesterday = self.today - timedelta(days=1)
+        payment.payment_date = timezone.make_aware(datetime.combine(yesterday, dtime(12)))
+        payment.save()
+        self.assertEqual(self.rollup(), {(ground, yesterday, 'Cash'): (1000, 1)})
+
+        payment.payment_status = 'Refunded'
+        payment.save()
+        self.assertEqual(self.rollup(), {})
+
+        payment.payment_status = 'Paid'
+        payment.save()
+        payment.delete()
+        self.assertEqual(self.rollup(), {})
+
+    def test_rebuild_matches_incremental_totals(self):
+        self.pay(self.grounds[0])
+        self.pay(self.grounds[0], 500)
+        self.pay(self.grounds[0], 800, 'Cash', days_ago=3)
+        self.pay(self.grounds[1], 1200, days_ago=40)
+        self.pay(self.grounds[1], 700, status='Failed')
+        refunded = self.pay(self.grounds[1], 900)
+        refunded.payment_status = 'Refunded'
+        refunded.save()
+
+        incremental = self.rollup()
+        self.assertEqual(incremental[self.grounds[0].id, self.today, 'UPI'], (1500, 2))
+        self.assertEqual(rebuild_daily_revenue(), 3)
+        self.assertEqual(self.rollup(), incremental)
+
+        # A ranged rebuild leaves the days outside it alone
+        DailyRevenue.objects.update(amount=1)
+        self.assertEqual(rebuild_daily_revenue(self.today - timedelta(days=7), self.today), 2)
+        self.assertEqual(self.rollup()[self.grounds[1].id, self.today - timedelta(days=40), 'UPI'], (1, 1))
+
+        out = io.StringIO()
+        call_command('rebuild_revenue_rollup', stdout=out)
+        self.assertIn('3 rows written', out.getvalue())
+        self.assertEqual(self.rollup(), incremental)
+
+    def test_apply_delta_retries_when_another_writer_creates_the_row(self):
+        key = (self.grounds[0].id, self.today, 'UPI')
+        DailyRevenue.objects.create(ground_id=key[0], date=key[1], payment_method=key[2], amount=500, payment_count=1)
+        update = QuerySet.update
+        calls = []
+
+        def before_the_other_writer(queryset, **fields):
+            # Our first UPDATE ran before the other writer's row was committed
+            calls.append(fields)
+            return 0 if len(calls) == 1 else update(queryset, **fields)
+
+        with mock.patch.object(QuerySet, 'update', before_the_other_writer):
+            apply_delta(key, 1000, 1)
+        # The INSERT hit the unique constraint and the retried UPDATE added to the row
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(self.rollup(), {key: (1500, 2)})
+
+        # Removals never create a row
+        DailyRevenue.objects.all().delete()
+        apply_delta(key, -1000, -1)
+        self.assertFalse(DailyRevenue.objects.exists())
+
+    def test_summary_reads_the_rollup(self):
+        self.pay(self.grounds[0], 1000)
+        self.pay(self.grounds[1], 1500, days_ago=40)
+        with self.assertNumQueries(3):
+            summary = revenue_summary(self.today - timedelta(days=7), self.today, 'day')
+        self.assertEqual(summary['total_revenue'], 1000)
+        self.assertEqual([row['ground'] for row in summary['revenue_data']], [self.grounds[0]])
+        self.assertEqual([row['payment_count'] for row in summary['period_data']], [1])
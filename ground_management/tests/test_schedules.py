@@ -0,0 +1,129 @@
+from datetime import time as dtime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Ground, Slot
+from ..schedules import (
+    PriceRule, Schedule, create_schedule_slots, expand_schedule, parse_price_rules, parse_time_ranges,
+    preview_schedule
+)
+
+
+class ScheduleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', password='secret123', is_staff=True)
+        cls.grounds = [
+            Ground.objects.create(name=name, location='Downtown', sport_type='Cricket')
+            for name in ('Green Field', 'Blue Court')
+        ]
+        # A Monday far enough ahead that the form accepts it
+        today = timezone.localdate()
+        cls.monday = today + timedelta(days=7 - today.weekday())
+
+    def schedule(self, **overrides):
+        options = {
+            'grounds': self.grounds,
+            'start_date': self.monday,
+            'end_date': self.monday + timedelta(days=13),
+            'weekdays': {0, 2, 5},
+            'time_ranges': [(dtime(6), dtime(9)), (dtime(18), dtime(20))],
+            'slot_minutes': 60,
+            'price_per_slot': Decimal('1000'),
+            **overrides,
+        }
+        return Schedule(**options)
+
+    def test_expands_only_the_chosen_weekdays(self):
+        schedule = self.schedule()
+        self.assertEqual(
+            schedule.daily_slots(),
+            [(dtime(6), dtime(7)), (dtime(7), dtime(8)), (dtime(8), dtime(9)), (dtime(18), dtime(19)), (dtime(19), dtime(20))]
+        )
+        slots = list(expand_schedule(schedule))
+        # Two grounds, Mon/Wed/Sat over two weeks, five slots a day
+        self.assertEqual(len(slots), schedule.slot_count())
+        self.assertEqual(len(slots), 2 * 6 * 5)
+        self.assertEqual({slot.date.weekday() for slot in slots}, {0, 2, 5})
+        # A range shorter than a slot yields nothing
+        self.assertEqual(self.schedule(time_ranges=[(dtime(6), dtime(6, 45))]).daily_slots(), [])
+
+    def test_first_matching_price_rule_wins(self):
+        schedule = self.schedule(price_rules=parse_price_rules(
+            'Sat,Sun 06:00-22:00 = 1500\n'
+            '18:00-22:00 = 1200\n'
+            'Sat 18:00-19:00 = 9999'
+        ))
+        self.assertEqual(schedule.price_rules[0], PriceRule(dtime(6), dtime(22), Decimal('1500'), frozenset({5, 6})))
+        prices = {
+            (slot.date.weekday(), slot.start_time): slot.price_per_slot
+            for slot in expand_schedule(schedule)
+        }
+        self.assertEqual(prices[0, dtime(6)], Decimal('1000'))
+        self.assertEqual(prices[0, dtime(18)], Decimal('1200'))
+        self.assertEqual(prices[5, dtime(6)], Decimal('1500'))
+        # Shadowed by the weekend rule above it
+        self.assertEqual(prices[5, dtime(18)], Decimal('1500'))
+        # Rules cover [start, end): 19:00-20:00 on a weekday starts inside 18:00-22:00
+        self.assertEqual(prices[2, dtime(19)], Decimal('1200'))
+
+    def test_parse_errors(self):
+        self.assertEqual(parse_time_ranges('06:00-10:00,\n16:00-22:00'), [(dtime(6), dtime(10)), (dtime(16), dtime(22))])
+        for text in ('', '10:00-06:00', '6am-10am'):
+            with self.assertRaises(ValueError):
+                parse_time_ranges(text)
+        for text in ('18:00-22:00', 'Funday 18:00-22:00 = 10', '18:00-22:00 = -5', '18:00-22:00 = lots'):
+            with self.assertRaises(ValueError):
+                parse_price_rules(text)
+
+    def test_preview_matches_create(self):
+        # An existing slot overlapping 07:30-08:30 blocks two of the generated ones
+        Slot.objects.create(
+            ground=self.grounds[0], date=self.monday, start_time=dtime(7, 30), end_time=dtime(8, 30), price_per_slot=500
+        )
+        schedule = self.schedule()
+        with self.assertNumQueries(1):
+            preview = preview_schedule(schedule, limit=5)
+        self.assertEqual((preview['total'], preview['conflicts']), (60, 2))
+        self.assertEqual(len(preview['sample']), 5)
+        self.assertFalse(Slot.objects.exclude(start_time=dtime(7, 30)).exists())
+
+        self.assertEqual(create_schedule_slots(schedule, batch_size=7), preview['to_create'])
+        self.assertEqual(Slot.objects.count(), 1 + preview['to_create'])
+        # Running it again creates nothing
+        self.assertEqual(preview_schedule(schedule)['to_create'], 0)
+        self.assertEqual(create_schedule_slots(schedule), 0)
+
+    def test_admin_page(self):
+        self.client.login(username='staff', password='secret123')
+        data = {
+            'grounds': [self.grounds[0].id],
+            'start_date': self.monday.isoformat(),
+            'end_date': (self.monday + timedelta(days=6)).isoformat(),
+            'weekdays': ['0', '6'],
+            'time_ranges': '06:00-08:00',
+            'slot_minutes': 60,
+            'price_per_slot': '800',
+            'price_rules': 'Sun 06:00-07:00 = 1000',
+        }
+        response = self.client.post(reverse('admin_slot_schedule'), {**data, 'preview': '1'})
+        self.assertEqual(response.context['preview']['to_create'], 4)
+        self.assertFalse(Slot.objects.exists())
+
+        response = self.client.post(reverse('admin_slot_schedule'), {**data, 'generate': '1'})
+        self.assertRedirects(response, reverse('admin_slot_list'), fetch_redirect_response=False)
+        self.assertEqual(
+            sorted(Slot.objects.values_list('date', 'start_time', 'price_per_slot')),
+            [
+                (self.monday, dtime(6), Decimal('800')), (self.monday, dtime(7), Decimal('800')),
+                (self.monday + timedelta(days=6), dtime(6), Decimal('1000')),
+                (self.monday + timedelta(days=6), dtime(7), Decimal('800')),
+            ]
+        )
+
+        response = self.client.post(reverse('admin_slot_schedule'), {**data, 'time_ranges': '08:00-06:00'})
+        self.assertFormError(response.context['form'], 'time_ranges', '"08:00-06:00": start time must be before end time.')
@@ -0,0 +1,73 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Ground
+from ..search import edit_distance, search_grounds
+
+
+class GroundSearchTests(TestCase):
+    def setUp(self):
+        self.cricket = Ground.objects.create(
+            name='Green Field Cricket Ground', location='Downtown Sports Complex', sport_type='Cricket',
+            description='Lush outfield and a professional pitch.'
+        )
+        self.football = Ground.objects.create(
+            name='Victory Football Stadium', location='North Sports City', sport_type='Football',
+            description='Artificial turf with floodlights. Cricket nets behind the stands.'
+        )
+        self.tennis = Ground.objects.create(
+            name='Ace Tennis Center', location='East End Sports Club', sport_type='Tennis',
+            description='Clay and hard courts.'
+        )
+
+    def names(self, query, **filters):
+        return [ground.name for ground in search_grounds(query, **filters)]
+
+    def test_name_matches_rank_above_description(self):
+        self.assertEqual(self.names('cricket'), [self.cricket.name, self.football.name])
+
+    def test_prefix_and_accents(self):
+        self.assertEqual(self.names('stad'), [self.football.name])
+        self.assertEqual(self.names('Ténnis'), [self.tennis.name])
+
+    def test_typos_are_tolerated(self):
+        self.assertEqual(self.names('tenis centre'), [self.tennis.name])
+        self.assertEqual(self.names('flodlights'), [self.football.name])
+
+    def test_filters_apply_to_results(self):
+        self.assertEqual(self.names('cricket', sport_type='Football'), [self.football.name])
+        self.assertEqual(self.names('sports', location='East End Sports Club'), [self.tennis.name])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.tennis.name = 'Ace Badminton Hall'
+        self.tennis.save()
+        self.assertEqual(self.names('badminton'), [self.tennis.name])
+        self.assertEqual(self.names('tennis'), [self.tennis.name])  # still in the sport type
+
+        self.tennis.delete()
+        self.assertEqual(self.names('badminton'), [])
+
+    def test_rebuild_command(self):
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute("INSERT INTO ground_search(ground_search) VALUES ('delete-all')")
+            self.assertEqual(self.names('cricket'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.names('cricket'), [self.cricket.name, self.football.name])
+
+    def test_ground_list_and_json(self):
+        response = self.client.get(reverse('ground_list'), {'q': 'footbal'})
+        self.assertEqual(list(response.context['grounds']), [self.football])
+
+        response = self.client.get(reverse('ground_search_json'), {'q': 'green'})
+        self.assertEqual(response.json()['results'][0]['id'], self.cricket.id)
+        self.assertEqual(self.client.get(reverse('ground_search_json')).json()['results'], [])
+
+    def test_edit_distance(self):
+        self.assertEqual(edit_distance('tenis', 'tennis', 2), 1)
+        self.assertEqual(edit_distance('cricket', 'crikcet', 2), 2)
+        self.assertEqual(edit_distance('pool', 'football', 2), 3)
@@ -0,0 +1,87 @@
+import time
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.template import engines
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Ground
+from ..timing import TimedDjangoTemplates, measure
+
+
+@override_settings(SERVER_TIMING_SAMPLE_RATE=1, SERVER_TIMING_SLOW_MS=60000)
+class ServerTimingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.player = User.objects.create_user('player', password='secret123')
+        cls.ground = Ground.objects.create(name='Green Field', location='Downtown', sport_type='Cricket')
+
+    def test_header_and_log_line(self):
+        self.client.login(username='player', password='secret123')
+        with self.assertLogs('ground_management.timing', 'INFO') as logs:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse('ground_detail', args=[self.ground.id]))
+
+        header = response['Server-Timing']
+        self.assertRegex(header, r'^total;dur=[\d.]+, sql;dur=[\d.]+;desc="\d+ queries, 0 duplicates", tpl;dur=[\d.]+$')
+        self.assertIn(f'desc="{len(queries)} queries', header)
+
+        [record] = logs.records
+        self.assertEqual(record.levelname, 'INFO')
+        self.assertIn('path=/grounds/', record.getMessage())
+        self.assertEqual(record.timing['view'], 'ground_detail')
+        self.assertEqual((record.timing['status'], record.timing['queries']), (200, len(queries)))
+        self.assertGreater(record.timing['template_ms'], 0)
+
+    def test_duplicate_queries(self):
+        with measure() as timing:
+            for _ in range(3):
+                Ground.objects.get(pk=self.ground.pk)
+            Ground.objects.get(name='Green Field')
+        self.assertEqual((timing.queries, timing.duplicates), (4, 2))
+        self.assertIn('"ground_management_ground"."id" = %s', timing.most_repeated()[0])
+        self.assertEqual(timing.most_repeated()[1], 3)
+        self.assertGreater(timing.total, timing.sql_time)
+
+    def test_nested_renders_count_once(self):
+        engine = engines['django']
+
+        class Form:
+            # Renders its own template mid-page, the way crispy forms does
+            def __str__(self):
+                return engine.from_string('{{ nap }}').render({'nap': lambda: time.sleep(0.05)})
+
+        with measure() as timing:
+            engine.from_string('<form>{{ form }}</form>').render({'form': Form()})
+        self.assertGreaterEqual(timing.template_time, 0.05)
+        self.assertLessEqual(timing.template_time, timing.total)
+
+    def test_engine_keeps_its_alias(self):
+        self.assertIsInstance(engines['django'], TimedDjangoTemplates)
+
+    def test_slow_requests_log_warnings(self):
+        with self.settings(SERVER_TIMING_SLOW_MS=0):
+            with self.assertLogs('ground_management.timing', 'WARNING'):
+                self.client.get(reverse('ground_list'))
+
+    def test_unsampled_requests_are_not_measured(self):
+        with self.settings(SERVER_TIMING_SAMPLE_RATE=0):
+            with self.assertNoLogs('ground_management.timing'):
+                response = self.client.get(reverse('ground_list'))
+        self.assertFalse(response.has_header('Server-Timing'))
+        # Queries outside a measured request are left alone
+        with measure() as timing:
+            pass
+        Ground.objects.count()
+        self.assertEqual(timing.queries, 0)
+
+    @override_settings(ROOT_URLCONF='sports_ground_management.asgi_urls')
+    async def test_async_views(self):
+        # Their queries run in other threads and still count
+        with self.assertLogs('ground_management.timing', 'INFO') as logs:
+            response = await self.async_client.get(reverse('ground_detail', args=[self.ground.id]))
+        self.assertIn('sql;dur=', response['Server-Timing'])
+        self.assertGreater(logs.records[0].timing['queries'], 0)
+        self.assertGreater(logs.records[0].timing['template_ms'], 0)
@@ -0,0 +1,215 @@
+"""
+Per-request performance timing.
+
+``ServerTimingMiddleware`` measures a sample of requests: total time, the
+number and duration of SQL queries, how many of them repeated an earlier
+query with the same parameters, and template render time. Each sampled
+response gets a ``Server-Timing`` header, which browser developer tools
+show under the request's timing tab. The same numbers are logged as one
+key=value line to the ``ground_management.timing`` logger, at WARNING when
+the request took longer than SERVER_TIMING_SLOW_MS.
+
+Measurements live in a context variable, so they follow a request into the
+threads its async views run queries in. Outside a sampled request the query
+and template hooks only find that variable empty: an unsampled request pays
+for one random number and one lookup per query.
+
+Queries and templates count until the view returns; a streaming response
+runs its queries later and they are not measured. Template time includes
+any queries run while rendering.
+"""
+
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_timing', default=None)
+
+# Longest statement quoted in a log line
+LOGGED_SQL_CHARS = 200
+
+
+class RequestTiming:
+    """What one request spent, in seconds, and the queries it ran."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        # Templates rendered inside another render (includes, crispy forms) count once, in the outermost
+        self.template_depth = 0
+        self.statements = Counter()
+
+    @property
+    def duplicates(self):
+        # Executions that repeated an earlier query and parameters
+        return sum(count - 1 for count in self.statements.values())
+
+    def most_repeated(self):
+        """The query run most often, with its count, or None without duplicates."""
+        if not self.duplicates:
+            return None
+        (sql, params), count = self.statements.most_common(1)[0]
+        return sql, count
+
+    def record_query(self, sql, params, many, elapsed):
+        self.queries += 1
+        self.sql_time += elapsed
+        # Bulk statements carry every row's parameters; count them without comparing
+        if not many:
+            self.statements[sql, repr(params)] += 1
+
+
+@contextmanager
+def measure():
+    """Measure the queries and templates run inside the block."""
+    timing = RequestTiming()
+    token = _current.set(timing)
+    try:
+        yield timing
+    finally:
+        _current.reset(token)
+        timing.total = time.perf_counter() - timing.started
+
+
+# Hooks
+def time_query(execute, sql, params, many, context):
+    timing = _current.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.record_query(sql, params, many, time.perf_counter() - start)
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """connection_created receiver adding time_query to each new connection."""
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timing = _current.get()
+        if timing is None or timing.template_depth:
+            return super().render(context, request)
+        timing.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timing.template_time += time.perf_counter() - start
+            timing.template_depth -= 1
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, with render time counted by ServerTimingMiddleware."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+# Reporting
+def _ms(seconds):
+    return round(seconds * 1000, 1)
+
+
+def server_timing(timing):
+    """The Server-Timing header value for a measured request."""
+    duplicates = timing.duplicates
+    return (
+        f'total;dur={_ms(timing.total)}, '
+        f'sql;dur={_ms(timing.sql_time)};desc="{timing.queries} queries, {duplicates} duplicates", '
+        f'tpl;dur={_ms(timing.template_time)}'
+    )
+
+
+def log_timing(request, response, timing):
+    match = getattr(request, 'resolver_match', None)
+    fields = {
+        'method': request.method,
+        'path': request.path,
+        'view': match.view_name if match else '',
+        'status': response.status_code,
+        'total_ms': _ms(timing.total),
+        'sql_ms': _ms(timing.sql_time),
+        'queries': timing.queries,
+        'duplicates': timing.duplicates,
+        'template_ms': _ms(timing.template_time),
+    }
+    repeated = timing.most_repeated()
+    if repeated:
+        fields['repeated_sql'] = ' '.join(repeated[0].split())[:LOGGED_SQL_CHARS]
+        fields['repeated_count'] = repeated[1]
+    slow = fields['total_ms'] > settings.SERVER_TIMING_SLOW_MS
+    line = ' '.join(
+        f'{key}="{value}"' if isinstance(value, str) and (' ' in value or not value) else f'{key}={value}'
+        for key, value in fields.items()
+    )
+    logger.log(logging.WARNING if slow else logging.INFO, line, extra={'timing': fields})
+
+
+def _add_header(response, timing):
+    value = server_timing(timing)
+    if response.has_header('Server-Timing'):
+        value = f"{response['Server-Timing']}, {value}"
+    response['Server-Timing'] = value
+
+
+# Middleware
+class ServerTimingMiddleware:
+    """Time a sample of requests; see the module docstring.
+
+    SERVER_TIMING_SAMPLE_RATE is the fraction of requests measured: 0 turns
+    timing off, 1 measures every request.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def sampled(self):
+        rate = settings.SERVER_TIMING_SAMPLE_RATE
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        with measure() as timing:
+            response = self.get_response(request)
+        self.report(request, response, timing)
+        return response
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        with measure() as timing:
+            response = await self.get_response(request)
+        self.report(request, response, timing)
+        return response
+
+    def report(self, request, response, timing):
+        _add_header(response, timing)
+        log_timing(request, response, timing)
@@ -1,12 +1,14 @@
 from django.urls import path
 from django.contrib.auth import views as auth_views
-from . import views
+from . import api, views
 
 urlpatterns = [
     # Public pages
     path('', views.home, name='home'),
     path('grounds/', views.ground_list, name='ground_list'),
+    path('grounds/search/', views.ground_search_json, name='ground_search_json'),
     path('grounds/<int:ground_id>/', views.ground_detail, name='ground_detail'),
+    path('grounds/<int:ground_id>/live/', views.slot_stream, name='slot_stream'),
     
     # Authentication
     path('accounts/login/', auth_views.LoginView.as_view(template_name='ground_management/login.html'), name='login'),
@@ -24,6 +26,7 @@ urlpatterns = [
     path('book/<int:ground_id>/', views.book_ground, name='book_ground'),
     path('payment/<int:booking_id>/', views.payment, name='payment'),
     path('payment/success/<int:booking_id>/', views.payment_success, name='payment_success'),
+    path('payment/status/<int:booking_id>/', views.payment_status, name='payment_status'),
     
     # Admin dashboard
     path('admin-dashboard/', views.admin_dashboard, name='admin_dashboard'),
@@ -33,17 +36,33 @@ urlpatterns = [
     path('manage/grounds/edit/<int:ground_id>/', views.admin_ground_edit, name='admin_ground_edit'),
     path('manage/grounds/delete/<int:ground_id>/', views.admin_ground_delete, name='admin_ground_delete'),
     
+    # Admin bulk import
+    path('manage/import/', views.admin_import, name='admin_import'),
+    
     # Admin slot management
     path('manage/slots/', views.admin_slot_list, name='admin_slot_list'),
     path('manage/slots/add/', views.admin_slot_add, name='admin_slot_add'),
+    path('manage/slots/schedule/', views.admin_slot_schedule, name='admin_slot_schedule'),
     path('manage/slots/edit/<int:slot_id>/', views.admin_slot_edit, name='admin_slot_edit'),
     path('manage/slots/delete/<int:slot_id>/', views.admin_slot_delete, name='admin_slot_delete'),
     
     # Admin booking management
     path('manage/bookings/', views.admin_booking_list, name='admin_booking_list'),
     path('manage/bookings/<int:booking_id>/', views.admin_booking_detail, name='admin_booking_detail'),
+    path('manage/export/bookings/', views.admin_export, {'dataset': 'bookings'}, name='admin_export_bookings'),
+    path('manage/export/payments/', views.admin_export, {'dataset': 'payments'}, name='admin_export_payments'),
     
     # Reports
     path('manage/reports/revenue/', views.revenue_report, name='revenue_report'),
     path('manage/reports/occupancy/', views.occupancy_report, name='occupancy_report'),
+    path('manage/reports/occupancy/json/', views.occupancy_report_json, name='occupancy_report_json'),
+    path('manage/reports/analytics/', views.analytics_report, name='analytics_report'),
+    path('manage/reports/analytics/json/', views.analytics_report_json, name='analytics_report_json'),
+    
+    # REST API
+    path('api/grounds/', api.api_ground_list, name='api_ground_list'),
+    path('api/grounds/<int:ground_id>/', api.api_ground_detail, name='api_ground_detail'),
+    path('api/grounds/<int:ground_id>/slots/', api.api_ground_slots, name='api_ground_slots'),
+    path('api/free-windows/', api.api_free_windows, name='api_free_windows'),
+    path('api/bookings/', api.api_booking_list, name='api_booking_list'),
 ]
\ No newline at end of file
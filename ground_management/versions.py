@@ -0,0 +1,62 @@
+"""
+Change versions.
+
+A version records when a scope last changed, as nanoseconds since the epoch:
+``('grounds',)`` for the set of grounds, ``('ground', id)`` for one ground and
+its slots, ``('bookings', user_id)`` for one user's bookings. Versions live in
+the cache, so reading one never touches the database. A missing version
+(first use, eviction, restart) starts at the current time. That can only make
+a reader think something changed when it did not, never the reverse.
+"""
+
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+def _cache():
+    return caches[getattr(settings, 'VERSION_CACHE_ALIAS', 'default')]
+
+
+def _key(scope, pk):
+    return f'version:{scope}' if pk is None else f'version:{scope}:{pk}'
+
+
+def current(scope, pk=None):
+    """Return the version of a scope."""
+    cache = _cache()
+    key = _key(scope, pk)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def acurrent(scope, pk=None):
+    """Async version of current()."""
+    cache = _cache()
+    key = _key(scope, pk)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def touch(scope, pk=None):
+    """Move a scope to a new version once the current transaction commits."""
+    def bump():
+        cache = _cache()
+        key = _key(scope, pk)
+        # Always move forward, even if clocks disagree between processes
+        cache.set(key, max(time.time_ns(), (cache.get(key) or 0) + 1), timeout=None)
+    transaction.on_commit(bump)
+
+
+def as_datetime(version):
+    """Return a version as an aware UTC datetime (for Last-Modified)."""
+    return datetime.fromtimestamp(version / 1e9, tz=timezone.utc)
@@ -3,53 +3,106 @@ from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.db.models import Sum, Count, Q
+from django.conf import settings
+from django.db.models import F, Sum, Count, Q
 from django.utils import timezone
-from django.http import HttpResponseForbidden
-from .models import Ground, Slot, CustomUser, Booking, Payment, BOOKING_STATUSES
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.urls import reverse
+from .models import (
+    Ground, Slot, CustomUser, Booking, Payment, BOOKING_STATUSES,
+    ACTIVE_BOOKING_STATUSES
+)
 from .forms import (
     GroundForm, SlotForm, CustomUserForm, ExtendedUserCreationForm,
-    BookingForm, PaymentForm, DateFilterForm, BookingStatusUpdateForm
+    BookingForm, PaymentForm, DateFilterForm, BookingStatusUpdateForm,
+    DateRangeForm, RevenueReportForm, BookingFilterForm, SlotScheduleForm, ImportForm,
+    BookingExportForm
 )
+from . import archive, availability, counters, facets, live
+from .analytics import analytics_summary
+from .bookings import BookingNotActive, HoldExpired, SlotUnavailable, claim_slot, is_active, release_booking
+from .exports import export_response, stream_export
+from .imports import ImportFileError, import_file
+from .occupancy import combined_heatmap, ground_occupancy, occupancy_heatmap
+from .pagination import InvalidCursor, keyset_paginate
+from .payments import IN_FLIGHT_STATUSES, submit_payment
+from .revenue import revenue_summary
+from .schedules import create_schedule_slots, preview_schedule
+from .search import search_grounds
 from datetime import datetime, timedelta
 import decimal
 
+BOOKINGS_PER_PAGE = 50
+SLOTS_PER_PAGE = 100
+
 # Helper function to check if user is admin
 def is_admin(user):
     return user.is_staff
 
+# Helper function to read the date window from a report filter form
+def _report_window(form):
+    if form.is_valid():
+        return form.cleaned_data['start_date'], form.cleaned_data['end_date']
+    return None, None
+
 # Public views
 def home(request):
-    # Get few featured grounds (highest rated or recently added)
-    featured_grounds = Ground.objects.all().order_by('-rating')[:3]
+    # Get few featured grounds (highest rated, cached until a ground changes)
     return render(request, 'ground_management/home.html', {
-        'featured_grounds': featured_grounds
+        'featured_grounds': facets.featured_grounds()
     })
 
 def ground_list(request):
     # Get filter parameters
+    query = request.GET.get('q', '').strip()
     sport_type = request.GET.get('sport_type', '')
     location = request.GET.get('location', '')
     
-    # Filter grounds
-    grounds = Ground.objects.all()
-    
-    if sport_type:
-        grounds = grounds.filter(sport_type=sport_type)
-    
-    if location:
-        grounds = grounds.filter(location__icontains=location)
+    # Search results come back ranked; otherwise filter the full list
+    if query:
+        grounds = search_grounds(query, sport_type=sport_type, location=location)
+    else:
+        grounds = Ground.objects.all()
+        
+        if sport_type:
+            grounds = grounds.filter(sport_type=sport_type)
+        
+        if location:
+            grounds = grounds.filter(location=location)
     
-    # Get all sport types and locations for filter dropdowns
-    sport_types = Ground.objects.values_list('sport_type', flat=True).distinct()
-    locations = Ground.objects.values_list('location', flat=True).distinct()
+    # Sport types and locations (with ground counts) for filter dropdowns
+    ground_facets = facets.ground_facets()
     
     return render(request, 'ground_management/ground_list.html', {
         'grounds': grounds,
-        'sport_types': sport_types,
-        'locations': locations,
+        'sport_types': ground_facets['sport_types'],
+        'locations': ground_facets['locations'],
         'selected_sport': sport_type,
-        'selected_location': location
+        'selected_location': location,
+        'query': query
+    })
+
+def ground_search_json(request):
+    query = request.GET.get('q', '').strip()
+    grounds = search_grounds(
+        query,
+        sport_type=request.GET.get('sport_type', ''),
+        location=request.GET.get('location', '')
+    )
+    
+    return JsonResponse({
+        'query': query,
+        'results': [
+            {
+                'id': ground.id,
+                'name': ground.name,
+                'sport_type': ground.sport_type,
+                'location': ground.location,
+                'rating': ground.rating,
+                'url': reverse('ground_detail', args=[ground.id]),
+            }
+            for ground in grounds
+        ]
     })
 
 def ground_detail(request, ground_id):
@@ -67,11 +120,7 @@ def ground_detail(request, ground_id):
         selected_date = today
     
     # Get available slots for the selected date
-    available_slots = Slot.objects.filter(
-        ground=ground,
-        date=selected_date,
-        availability_status='Available'
-    ).order_by('start_time')
+    available_slots = availability.available_slots(ground.id, selected_date)
     
     return render(request, 'ground_management/ground_detail.html', {
         'ground': ground,
@@ -80,6 +129,22 @@ def ground_detail(request, ground_id):
         'available_slots': available_slots
     })
 
+def slot_stream(request, ground_id):
+    """Slot availability snapshot as a one-message event stream.
+
+    Holding the stream open would tie up a WSGI worker thread per browser, so
+    here the browser gets the current slots and reconnects a little later.
+    Under ASGI ``async_views.slot_stream`` pushes every change as it happens.
+    """
+    ground = get_object_or_404(Ground, pk=ground_id)
+    try:
+        day = datetime.strptime(request.GET.get('date', ''), '%Y-%m-%d').date()
+    except ValueError:
+        day = timezone.now().date()
+
+    body = live.retry(live.POLL_RECONNECT_MS) + live.snapshot(availability.available_slots(ground.id, day))
+    return HttpResponse(body, content_type='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
 def register(request):
     if request.method == 'POST':
         user_form = ExtendedUserCreationForm(request.POST)
@@ -123,26 +188,30 @@ def user_profile(request):
 def book_ground(request, ground_id):
     ground = get_object_or_404(Ground, pk=ground_id)
     
+    date_filter = DateFilterForm(request.GET)
+    selected_date = timezone.now().date()
+    
     if request.method == 'POST':
-        form = BookingForm(request.POST)
+        form = BookingForm(request.POST, ground_id=ground_id)
         
         if form.is_valid():
-            booking = form.save(commit=False)
-            booking.user = request.user
-            booking.save()
+            slot = form.cleaned_data['slot']
+            selected_date = slot.date
             
-            # Update slot availability
-            slot = booking.slot
-            slot.availability_status = 'Booked'
-            slot.save()
-            
-            messages.success(request, 'Booking successful! Please proceed to payment.')
-            return redirect('payment', booking_id=booking.id)
+            try:
+                # Claim the slot and create the booking in one atomic step
+                booking = claim_slot(request.user, slot)
+            except SlotUnavailable:
+                form.add_error('slot', 'Sorry, this slot was just booked by someone else. Please choose another slot.')
+                form.fields['slot'].queryset = form.fields['slot'].queryset.filter(date=selected_date)
+            else:
+                messages.success(
+                    request,
+                    f'Slot held for {settings.BOOKING_HOLD_MINUTES} minutes. Please complete payment to confirm it.'
+                )
+                return redirect('payment', booking_id=booking.id)
     else:
         # Get date filter
-        date_filter = DateFilterForm(request.GET)
-        selected_date = timezone.now().date()
-        
         if date_filter.is_valid():
             selected_date = date_filter.cleaned_data['date']
         
@@ -152,7 +221,7 @@ def book_ground(request, ground_id):
     return render(request, 'ground_management/book_ground.html', {
         'form': form,
         'ground': ground,
-        'date_filter': date_filter if 'date_filter' in locals() else DateFilterForm(),
+        'date_filter': date_filter,
         'selected_date': selected_date
     })
 
@@ -161,38 +230,32 @@ def admin_dashboard(request):
     if not is_admin(request.user):
         return HttpResponseForbidden("You don't have permission to access this page.")
     
-    # Get counts for dashboard
-    grounds_count = Ground.objects.count()
-    slots_count = Slot.objects.count()
-    bookings_count = Booking.objects.count()
-    users_count = User.objects.filter(is_staff=False).count()
+    # Get counts and revenue for dashboard from the maintained counters,
+    # archived history included
+    totals = counters.read('grounds', 'slots', 'bookings', 'players', 'revenue')
     
     # Get recent bookings
-    recent_bookings = Booking.objects.all().order_by('-booking_date')[:5]
-    
-    # Get revenue data
-    total_revenue = Payment.objects.filter(payment_status='Paid').aggregate(Sum('amount'))['amount__sum'] or 0
+    recent_bookings = Booking.objects.select_related('user', 'slot__ground', 'payment').order_by('-booking_date')[:5]
     
     return render(request, 'ground_management/admin_dashboard.html', {
-        'grounds_count': grounds_count,
-        'slots_count': slots_count,
-        'bookings_count': bookings_count,
-        'users_count': users_count,
+        'grounds_count': totals['grounds'],
+        'slots_count': totals['slots'],
+        'bookings_count': totals['bookings'],
+        'users_count': totals['players'],
         'recent_bookings': recent_bookings,
-        'total_revenue': total_revenue
+        'total_revenue': totals['revenue']
     })
 
 @login_required
 def user_dashboard(request):
     # Get user's upcoming bookings
-    upcoming_bookings = Booking.objects.filter(
+    upcoming_bookings = Booking.objects.select_related('slot__ground').filter(
         user=request.user,
-        slot__date__gte=timezone.now().date(),
-        status__in=['Confirmed', 'Pending']
+        status__in=ACTIVE_BOOKING_STATUSES
     ).order_by('slot__date', 'slot__start_time')[:3]
     
-    # Get total bookings count
-    total_bookings = Booking.objects.filter(user=request.user).count()
+    # Get total bookings count, including archived ones
+    total_bookings = archive.booking_count(user=request.user)
     
     return render(request, 'ground_management/user_dashboard.html', {
         'upcoming_bookings': upcoming_bookings,
@@ -264,7 +327,7 @@ def admin_slot_list(request):
     date = request.GET.get('date', '')
     
     # Filter slots
-    slots = Slot.objects.all().order_by('date', 'start_time')
+    slots = Slot.objects.select_related('ground')
     
     if ground_id:
         slots = slots.filter(ground_id=ground_id)
@@ -272,11 +335,25 @@ def admin_slot_list(request):
     if date:
         slots = slots.filter(date=date)
     
+    # Keyset pagination on (date, start_time, id)
+    try:
+        page = keyset_paginate(
+            slots,
+            ['date', 'start_time', 'id'],
+            after=request.GET.get('after'),
+            before=request.GET.get('before'),
+            page_size=SLOTS_PER_PAGE,
+            descending=False
+        )
+    except InvalidCursor:
+        page = keyset_paginate(slots, ['date', 'start_time', 'id'], page_size=SLOTS_PER_PAGE, descending=False)
+    
     # Get all grounds for filter dropdown
     grounds = Ground.objects.all()
     
     return render(request, 'ground_management/admin_slot_list.html', {
-        'slots': slots,
+        'slots': page,
+        'page': page,
         'grounds': grounds,
         'selected_ground_id': int(ground_id) if ground_id.isdigit() else None,
         'selected_date': date
@@ -300,6 +377,56 @@ def admin_slot_add(request):
         'title': 'Add New Slot'
     })
 
+@login_required
+@user_passes_test(is_admin)
+def admin_slot_schedule(request):
+    preview = None
+    
+    if request.method == 'POST':
+        form = SlotScheduleForm(request.POST)
+        
+        if form.is_valid():
+            schedule = form.schedule()
+            
+            if 'generate' in request.POST:
+                created = create_schedule_slots(schedule)
+                skipped = schedule.slot_count() - created
+                messages.success(request, f'Created {created} slots ({skipped} already existed and were skipped).')
+                return redirect('admin_slot_list')
+            
+            preview = preview_schedule(schedule)
+    else:
+        form = SlotScheduleForm()
+    
+    return render(request, 'ground_management/admin_slot_schedule.html', {
+        'form': form,
+        'preview': preview
+    })
+
+@login_required
+@user_passes_test(is_admin)
+def admin_import(request):
+    result = None
+    
+    if request.method == 'POST':
+        form = ImportForm(request.POST, request.FILES)
+        
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            try:
+                result = import_file(
+                    form.cleaned_data['kind'], upload, upload.name, dry_run=form.cleaned_data['dry_run']
+                )
+            except ImportFileError as e:
+                form.add_error('file', str(e))
+    else:
+        form = ImportForm()
+    
+    return render(request, 'ground_management/admin_import.html', {
+        'form': form,
+        'result': result
+    })
+
 @login_required
 @user_passes_test(is_admin)
 def admin_slot_edit(request, slot_id):
@@ -324,7 +451,7 @@ def admin_slot_edit(request, slot_id):
 @login_required
 @user_passes_test(is_admin)
 def admin_slot_delete(request, slot_id):
-    slot = get_object_or_404(Slot, pk=slot_id)
+    slot = get_object_or_404(Slot.objects.select_related('ground'), pk=slot_id)
     
     if request.method == 'POST':
         slot.delete()
@@ -364,19 +491,14 @@ def edit_profile(request):
 # Booking management
 @login_required
 def user_bookings(request):
-    today = timezone.now().date()
-    
-    # Get upcoming bookings (today or future date)
-    upcoming_bookings = Booking.objects.filter(
+    # Get upcoming bookings; the lifecycle sweeper finishes them once their day has passed
+    upcoming_bookings = Booking.objects.select_related('slot__ground').filter(
         user=request.user,
-        slot__date__gte=today
+        status__in=ACTIVE_BOOKING_STATUSES
     ).order_by('slot__date', 'slot__start_time')
     
-    # Get past bookings
-    past_bookings = Booking.objects.filter(
-        user=request.user,
-        slot__date__lt=today
-    ).order_by('-slot__date')
+    # Get past and cancelled bookings, including archived ones
+    past_bookings = archive.past_bookings(request.user)
     
     return render(request, 'ground_management/user_bookings.html', {
         'upcoming_bookings': upcoming_bookings,
@@ -385,23 +507,24 @@ def user_bookings(request):
 
 @login_required
 def cancel_booking(request, booking_id):
-    booking = get_object_or_404(Booking, pk=booking_id)
+    booking = get_object_or_404(Booking.objects.select_related('user', 'slot__ground', 'payment'), pk=booking_id)
     
     # Ensure user owns the booking
-    if booking.user != request.user:
+    if booking.user_id != request.user.id:
         return HttpResponseForbidden("You don't have permission to cancel this booking.")
     
+    if not is_active(booking):
+        messages.error(request, 'This booking is already cancelled, finished or expired.')
+        return redirect('user_bookings')
+    
     if request.method == 'POST':
-        # Update booking status
-        booking.status = 'Cancelled'
-        booking.save()
-        
-        # Update slot availability
-        slot = booking.slot
-        slot.availability_status = 'Available'
-        slot.save()
-        
-        messages.success(request, 'Booking cancelled successfully!')
+        # Cancel the booking and free its slot together
+        try:
+            release_booking(booking)
+        except BookingNotActive:
+            messages.error(request, 'This booking is already cancelled, finished or expired.')
+        else:
+            messages.success(request, 'Booking cancelled successfully!')
         return redirect('user_bookings')
     
     return render(request, 'ground_management/confirm_cancel_booking.html', {
@@ -411,25 +534,36 @@ def cancel_booking(request, booking_id):
 @login_required
 @user_passes_test(is_admin)
 def admin_booking_list(request):
-    # Get filter parameters
-    status = request.GET.get('status', '')
+    filter_form = BookingFilterForm(request.GET or None)
+    
+    # User, slot, ground and payment come back in the same query as the booking
+    bookings = Booking.objects.select_related('user', 'slot__ground', 'payment')
     
-    # Filter bookings
-    bookings = Booking.objects.all().order_by('-booking_date')
+    if filter_form.is_valid():
+        bookings = filter_form.apply(bookings)
     
-    if status:
-        bookings = bookings.filter(status=status)
+    # Keyset pagination on (booking_date, id), newest first
+    try:
+        page = keyset_paginate(
+            bookings,
+            ['booking_date', 'id'],
+            after=request.GET.get('after'),
+            before=request.GET.get('before'),
+            page_size=BOOKINGS_PER_PAGE
+        )
+    except InvalidCursor:
+        page = keyset_paginate(bookings, ['booking_date', 'id'], page_size=BOOKINGS_PER_PAGE)
     
     return render(request, 'ground_management/admin_booking_list.html', {
-        'bookings': bookings,
-        'booking_statuses': BOOKING_STATUSES,
-        'selected_status': status
+        'bookings': page,
+        'page': page,
+        'filter_form': filter_form
     })
 
 @login_required
 @user_passes_test(is_admin)
 def admin_booking_detail(request, booking_id):
-    booking = get_object_or_404(Booking, pk=booking_id)
+    booking = get_object_or_404(Booking.objects.select_related('user', 'slot__ground', 'payment'), pk=booking_id)
     
     try:
         payment = booking.payment
@@ -437,16 +571,23 @@ def admin_booking_detail(request, booking_id):
         payment = None
     
     if request.method == 'POST':
+        was_active = is_active(booking)
         form = BookingStatusUpdateForm(request.POST, instance=booking)
         
         if form.is_valid():
-            updated_booking = form.save()
+            updated_booking = form.save(commit=False)
             
             # Update slot availability if booking is cancelled
             if updated_booking.status == 'Cancelled':
-                slot = updated_booking.slot
-                slot.availability_status = 'Available'
-                slot.save()
+                try:
+                    if not was_active:
+                        raise BookingNotActive
+                    release_booking(updated_booking)
+                except BookingNotActive:
+                    messages.error(request, 'Only an active booking can be cancelled; its slot may have been booked again.')
+                    return redirect('admin_booking_detail', booking_id=booking.id)
+            else:
+                updated_booking.save()
             
             messages.success(request, 'Booking status updated successfully!')
             return redirect('admin_booking_detail', booking_id=booking.id)
@@ -459,25 +600,49 @@ def admin_booking_detail(request, booking_id):
         'form': form
     })
 
+@login_required
+@user_passes_test(is_admin)
+def admin_export(request, dataset):
+    """Stream bookings or payments, filtered like the booking list, as CSV or JSON Lines."""
+    form = BookingExportForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    export_format = form.cleaned_data['format'] or 'csv'
+    return export_response(stream_export(dataset, export_format, form), dataset, export_format)
+
 # Payment
 @login_required
 def payment(request, booking_id):
-    booking = get_object_or_404(Booking, pk=booking_id)
+    booking = get_object_or_404(Booking.objects.select_related('user', 'slot__ground', 'payment'), pk=booking_id)
     
     # Ensure user owns the booking
-    if booking.user != request.user:
+    if booking.user_id != request.user.id:
         return HttpResponseForbidden("You don't have permission to access this page.")
     
+    if booking.status == 'Cancelled':
+        messages.error(request, 'This booking was cancelled or its hold expired. Please book the slot again.')
+        return redirect('book_ground', ground_id=booking.slot.ground_id)
+    
+    # Paid or being paid already
+    if getattr(booking, 'payment', None) and booking.payment.payment_status != 'Failed':
+        return redirect('payment_success', booking_id=booking.id)
+    
     if request.method == 'POST':
         form = PaymentForm(request.POST, booking=booking)
         
         if form.is_valid():
-            payment = form.save(commit=False)
-            payment.booking = booking
-            payment.payment_status = 'Paid'  # In a real app, this would depend on payment gateway response
-            payment.save()
+            try:
+                # Queue the charge; the payment workers confirm the booking
+                submit_payment(
+                    booking,
+                    form.cleaned_data['payment_method'],
+                    form.cleaned_data['amount'],
+                    form.cleaned_data['idempotency_key']
+                )
+            except HoldExpired:
+                messages.error(request, 'Your hold on this slot expired before payment. Please book it again.')
+                return redirect('book_ground', ground_id=booking.slot.ground_id)
             
-            messages.success(request, 'Payment successful!')
             return redirect('payment_success', booking_id=booking.id)
     else:
         form = PaymentForm(booking=booking)
@@ -489,10 +654,10 @@ def payment(request, booking_id):
 
 @login_required
 def payment_success(request, booking_id):
-    booking = get_object_or_404(Booking, pk=booking_id)
+    booking = get_object_or_404(Booking.objects.select_related('user', 'slot__ground', 'payment'), pk=booking_id)
     
     # Ensure user owns the booking
-    if booking.user != request.user:
+    if booking.user_id != request.user.id:
         return HttpResponseForbidden("You don't have permission to access this page.")
     
     try:
@@ -502,71 +667,119 @@ def payment_success(request, booking_id):
     
     return render(request, 'ground_management/payment_success.html', {
         'booking': booking,
-        'payment': payment
+        'payment': payment,
+        'in_flight': payment.payment_status in IN_FLIGHT_STATUSES
+    })
+
+@login_required
+def payment_status(request, booking_id):
+    """The payment's current outcome, polled by payment_success while it is processed."""
+    status = Payment.objects.filter(booking_id=booking_id, booking__user=request.user).values(
+        'payment_status', 'failure_reason', booking_status=F('booking__status')
+    ).first()
+    if status is None:
+        return JsonResponse({'error': 'No payment for this booking.'}, status=404)
+    response = JsonResponse({
+        'status': status['payment_status'],
+        'booking_status': status['booking_status'],
+        'message': status['failure_reason'],
+        'done': status['payment_status'] not in IN_FLIGHT_STATUSES,
     })
+    response['Cache-Control'] = 'no-store'
+    return response
 
 # Reports
 @login_required
 @user_passes_test(is_admin)
 def revenue_report(request):
-    # Calculate total revenue
-    total_revenue = Payment.objects.filter(payment_status='Paid').aggregate(Sum('amount'))['amount__sum'] or 0
-    
-    # Get revenue by ground
-    revenue_data = []
-    grounds = Ground.objects.all()
+    form = RevenueReportForm(request.GET or None)
+    start_date = end_date = None
+    group_by = 'month'
     
-    for ground in grounds:
-        ground_revenue = Payment.objects.filter(
-            booking__slot__ground=ground,
-            payment_status='Paid'
-        ).aggregate(Sum('amount'))['amount__sum'] or 0
-        
-        if ground_revenue > 0:
-            revenue_data.append({
-                'ground': ground,
-                'total_revenue': ground_revenue
-            })
+    if form.is_valid():
+        start_date = form.cleaned_data['start_date']
+        end_date = form.cleaned_data['end_date']
+        group_by = form.cleaned_data['group_by'] or group_by
     
-    # Sort by revenue (highest first)
-    revenue_data.sort(key=lambda x: x['total_revenue'], reverse=True)
+    # Served from the daily rollup in a fixed number of queries
+    summary = revenue_summary(start_date, end_date, group_by)
     
     return render(request, 'ground_management/revenue_report.html', {
-        'total_revenue': total_revenue,
-        'revenue_data': revenue_data
+        'form': form,
+        'group_by': group_by,
+        **summary
     })
 
 @login_required
 @user_passes_test(is_admin)
 def occupancy_report(request):
-    # Get occupancy data by ground
-    occupancy_data = []
-    grounds = Ground.objects.all()
+    form = DateRangeForm(request.GET or None)
+    start_date, end_date = _report_window(form)
     
-    for ground in grounds:
-        # Total number of slots
-        total_slots = Slot.objects.filter(ground=ground).count()
-        
-        if total_slots > 0:
-            # Number of booked slots
-            booked_slots = Slot.objects.filter(
-                ground=ground,
-                availability_status='Booked'
-            ).count()
-            
-            # Calculate occupancy rate
-            occupancy_rate = (booked_slots / total_slots) * 100
-            
-            occupancy_data.append({
-                'ground': ground,
-                'total_slots': total_slots,
-                'booked_slots': booked_slots,
-                'occupancy_rate': occupancy_rate
-            })
-    
-    # Sort by occupancy rate (highest first)
-    occupancy_data.sort(key=lambda x: x['occupancy_rate'], reverse=True)
+    occupancy_data = ground_occupancy(start_date, end_date)
+    heatmap = combined_heatmap(occupancy_heatmap(start_date, end_date))
     
     return render(request, 'ground_management/occupancy_report.html', {
-        'occupancy_data': occupancy_data
-    })
\ No newline at end of file
+        'form': form,
+        'occupancy_data': occupancy_data,
+        'heatmap': heatmap
+    })
+
+@login_required
+@user_passes_test(is_admin)
+def occupancy_report_json(request):
+    form = DateRangeForm(request.GET or None)
+    if form.is_bound and not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    start_date, end_date = _report_window(form)
+    
+    grounds = [
+        {
+            'id': item['ground'].id,
+            'name': item['ground'].name,
+            'sport_type': item['ground'].sport_type,
+            'location': item['ground'].location,
+            'total_slots': item['total_slots'],
+            'booked_slots': item['booked_slots'],
+            'maintenance_slots': item['maintenance_slots'],
+            'occupancy_rate': round(item['occupancy_rate'], 2),
+        }
+        for item in ground_occupancy(start_date, end_date)
+    ]
+    
+    return JsonResponse({
+        'start_date': start_date,
+        'end_date': end_date,
+        'grounds': grounds,
+        'heatmap': occupancy_heatmap(start_date, end_date)
+    })
+
+def _analytics(form):
+    start_date, end_date = _report_window(form)
+    group_by = (form.is_valid() and form.cleaned_data['group_by']) or 'month'
+    return analytics_summary(start_date, end_date, group_by)
+
+@login_required
+@user_passes_test(is_admin)
+def analytics_report(request):
+    form = RevenueReportForm(request.GET or None)
+    
+    # Time series computed from the rollups, in a fixed number of queries
+    summary = _analytics(form)
+    
+    periods = summary['periods']
+    
+    return render(request, 'ground_management/analytics_report.html', {
+        'form': form,
+        'summary': summary,
+        'period_rows': [dict(zip(periods, values)) for values in zip(*periods.values())]
+    })
+
+@login_required
+@user_passes_test(is_admin)
+def analytics_report_json(request):
+    form = RevenueReportForm(request.GET or None)
+    if form.is_bound and not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    
+    return JsonResponse(_analytics(form))
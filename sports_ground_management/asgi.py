@@ -5,12 +5,37 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Run it with uvicorn; see "Deployment" in README.md for the recommended
+profile.
 """
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler, ASGIRequest
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sports_ground_management.settings')
 
-application = get_asgi_application()
+
+class AsyncViewsRequest(ASGIRequest):
+    """A request routed through ASGI_ROOT_URLCONF, which serves the public
+    read paths with their async views (see asgi_urls.py).
+
+    Setting the URL configuration on the request rather than in settings
+    leaves ROOT_URLCONF alone for anything else running in the process.
+    """
+
+    def __init__(self, scope, body_file):
+        super().__init__(scope, body_file)
+        self.urlconf = settings.ASGI_ROOT_URLCONF
+
+
+class AsyncViewsHandler(ASGIHandler):
+    request_class = AsyncViewsRequest
+
+
+# As django.core.asgi.get_asgi_application(), with the request class above
+django.setup(set_prefix=False)
+application = AsyncViewsHandler()
@@ -0,0 +1,23 @@
+"""
+URL configuration for the ASGI entry point.
+
+The public read paths, the live availability stream and the booking and
+payment exports are routed to the async views in
+ground_management/async_views.py; everything else falls through to the regular
+URL configuration.
+"""
+from django.urls import path
+
+from ground_management import async_views
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path('', async_views.home, name='home'),
+    path('grounds/', async_views.ground_list, name='ground_list'),
+    path('grounds/<int:ground_id>/', async_views.ground_detail, name='ground_detail'),
+    path('grounds/<int:ground_id>/live/', async_views.slot_stream, name='slot_stream'),
+    path('api/grounds/<int:ground_id>/slots/', async_views.api_ground_slots, name='api_ground_slots'),
+    path('manage/export/bookings/', async_views.admin_export, {'dataset': 'bookings'}, name='admin_export_bookings'),
+    path('manage/export/payments/', async_views.admin_export, {'dataset': 'payments'}, name='admin_export_payments'),
+] + sync_urlpatterns
@@ -52,6 +52,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its total covers the rest of the stack
+    'ground_management.timing.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -63,9 +65,16 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'sports_ground_management.urls'
 
+# asgi.py routes its requests through the URL configuration that serves async
+# read views
+ASGI_ROOT_URLCONF = 'sports_ground_management.asgi_urls'
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates, with render time reported by ServerTimingMiddleware;
+        # NAME keeps the engine's usual 'django' alias
+        'BACKEND': 'ground_management.timing.TimedDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -104,10 +113,82 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                # Wait for competing writers instead of failing straight away
+                'timeout': 20,
+            },
+            # File-backed test database so threaded tests get real locking
+            # (the shared in-memory database fails with "table is locked")
+            'TEST': {
+                'NAME': BASE_DIR / 'test_db.sqlite3',
+            },
         }
     }
 
 
+# Cache
+# Local memory by default; set CACHE_BACKEND (e.g.
+# django.core.cache.backends.redis.RedisCache) and CACHE_LOCATION to share the
+# cache between processes.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'sports-ground'),
+    }
+}
+
+# Cache alias and lifetime (seconds) for per-ground, per-date slot availability
+AVAILABILITY_CACHE_ALIAS = 'default'
+AVAILABILITY_CACHE_TIMEOUT = 300
+
+# Cache alias and lifetime (seconds) for ground filter facets and featured grounds
+GROUND_CACHE_ALIAS = 'default'
+GROUND_CACHE_TIMEOUT = 3600
+
+# Broker for live slot availability; in-process by default. With several
+# ASGI workers use ground_management.live.RedisBroker and set LIVE_REDIS_URL.
+LIVE_BROKER = os.environ.get('LIVE_BROKER', 'ground_management.live.InMemoryBroker')
+LIVE_REDIS_URL = os.environ.get('LIVE_REDIS_URL', 'redis://localhost:6379/0')
+
+# Slots older than this many days, with their bookings and payments, are moved
+# to the archive tables by manage.py archive_history
+ARCHIVE_RETENTION_DAYS = int(os.environ.get('ARCHIVE_RETENTION_DAYS', 365))
+
+# Minutes a new booking holds its slot while unpaid; lapsed holds are released
+# by manage.py expire_holds
+BOOKING_HOLD_MINUTES = int(os.environ.get('BOOKING_HOLD_MINUTES', 15))
+
+# Payment gateway adapter (see ground_management/payments.py) and the keyword
+# arguments it is built with. PAYMENT_WORKERS threads per process charge
+# submitted payments; with 0, run manage.py process_payments --every 1 instead.
+PAYMENT_GATEWAY = os.environ.get('PAYMENT_GATEWAY', 'ground_management.payments.FakeGateway')
+PAYMENT_GATEWAY_OPTIONS = {}
+PAYMENT_WORKERS = int(os.environ.get('PAYMENT_WORKERS', 4))
+
+# Fraction of requests ServerTimingMiddleware measures (0 to 1). Sampled
+# responses get a Server-Timing header and a line in the
+# ground_management.timing log, at WARNING above SERVER_TIMING_SLOW_MS; set
+# SERVER_TIMING_LOG_LEVEL=INFO to log every sampled request.
+SERVER_TIMING_SAMPLE_RATE = float(os.environ.get('SERVER_TIMING_SAMPLE_RATE', 0.05))
+SERVER_TIMING_SLOW_MS = float(os.environ.get('SERVER_TIMING_SLOW_MS', 500))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'ground_management.timing': {
+            'handlers': ['console'],
+            'level': os.environ.get('SERVER_TIMING_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 